@@ -18,11 +18,8 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 ##
 
-import csv
-import io
-
-from django.db import models
-from django.contrib import messages
+from django.apps import apps
+from django.db import models, transaction
 from django.http import HttpResponseRedirect
 from django.shortcuts import render, redirect
 from django.urls import path
@@ -35,6 +32,7 @@ from .room_type import RoomType
 from ..forms import RoomChangeBedTypeForm, RoomChangeBuildingForm
 
 from utility.forms import CSVImportForm
+from utility.misc import CSVForeignKey, CSVImporter, report_cache
 from utility.models import BaseModel, BaseModelAdmin
 
 
@@ -100,64 +98,33 @@ class RoomAdmin(BaseModelAdmin):
         return urls
 
     def import_csv(self, request):
-        def append_error(type_name, item):
-            """Append an error message to the messages list"""
-            error_message = pgettext_lazy('Room',
-                                          'Unexpected {TYPE} "{ITEM}"'.format(
-                                              TYPE=type_name,
-                                              ITEM=item))
-            if error_message not in error_messages:
-                error_messages.append(error_message)
-                self.message_user(request, error_message, messages.ERROR)
-
         if request.method == 'POST':
-            # Preload buildings
-            buildings = {}
-            for item in Building.objects.all():
-                buildings[item.name] = item
-            # Preload room types
-            room_types = {}
-            for item in RoomType.objects.all():
-                room_types[item.name] = item
-            # Preload bed types
-            bed_types = {}
-            for item in BedType.objects.all():
-                bed_types[item.name] = item
-            # Load CSV file content
-            csv_file = io.TextIOWrapper(
-                request.FILES['csv_file'].file,
-                encoding=request.POST['encoding'])
-            reader = csv.DictReader(
-                csv_file,
-                delimiter=request.POST['delimiter'])
+            # Resolve buildings, room types and bed types
+            buildings = CSVForeignKey(queryset=Building.objects.all(),
+                                      type_name='building',
+                                      field='name')
+            room_types = CSVForeignKey(queryset=RoomType.objects.all(),
+                                       type_name='room type',
+                                       field='name')
+            bed_types = CSVForeignKey(queryset=BedType.objects.all(),
+                                      type_name='bed type',
+                                      field='name')
             # Load data from CSV
-            error_messages = []
-            rooms = []
-            for row in reader:
-                if row['BUILDING'] not in buildings:
-                    append_error('building', row['BUILDING'])
-                elif row['ROOM TYPE'] not in room_types:
-                    append_error('room type', row['ROOM TYPE'])
-                elif row['BED TYPE'] not in bed_types:
-                    append_error('bed type', row['BED TYPE'])
-                else:
-                    # If no error create a new Room object
-                    rooms.append(Room(building=buildings[row['BUILDING']],
-                                      name=row['NAME'],
-                                      description=row['DESCRIPTION'],
-                                      room_type=room_types[row['ROOM TYPE']],
-                                      bed_type=bed_types[row['BED TYPE']],
-                                      phone1=row['PHONE1'],
-                                      seats_base=row['SEATS BASE'],
-                                      seats_additional=row['SEATS ADDITIONAL']
-                                      ))
-            # Save data only if there were not errors
-            if not error_messages:
-                Room.objects.bulk_create(rooms)
-                self.message_user(
-                    request,
-                    pgettext_lazy('Room',
-                                  'Your CSV file has been imported'))
+            importer = CSVImporter(model=Room)
+            importer.import_file(
+                file=request.FILES['csv_file'].file,
+                encoding=request.POST['encoding'],
+                delimiter=request.POST['delimiter'],
+                create_object=lambda row: Room(
+                    building=buildings.get(row['BUILDING']),
+                    name=row['NAME'],
+                    description=row['DESCRIPTION'],
+                    room_type=room_types.get(row['ROOM TYPE']),
+                    bed_type=bed_types.get(row['BED TYPE']),
+                    phone1=row['PHONE1'],
+                    seats_base=row['SEATS BASE'],
+                    seats_additional=row['SEATS ADDITIONAL']))
+            importer.message_user(self, request)
             return redirect('..')
         return render(request,
                       'utility/import_csv/form.html',
@@ -169,7 +136,14 @@ class RoomAdmin(BaseModelAdmin):
         if 'action_change_building' in request.POST:
             if form.is_valid():
                 building = form.cleaned_data['building']
-                queryset.update(building=building)
+                with transaction.atomic():
+                    # Compute again the statistics of the moved rooms
+                    apps.get_model('work', 'ActivityStat').objects.\
+                        refresh_rooms_on_commit(room__in=list(
+                            queryset.values_list('pk', flat=True)))
+                    queryset.update(building=building)
+                # The bulk updates don't send the signals
+                report_cache.invalidate(Room._meta.label)
 
                 self.message_user(
                     request,
@@ -206,6 +180,8 @@ class RoomAdmin(BaseModelAdmin):
             if form.is_valid():
                 bed_type = form.cleaned_data['bed_type']
                 queryset.update(bed_type=bed_type)
+                # The bulk updates don't send the signals
+                report_cache.invalidate(Room._meta.label)
 
                 self.message_user(
                     request,
@@ -0,0 +1,129 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import io
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from hotels.models import (BedType, Brand, Building, Company, Room, RoomType,
+                           Structure)
+
+from locations.models import Continent, Country, Location, Position, Region
+
+from utility.misc import CSVForeignKey, CSVImporter, CSVImportError
+
+ROOMS_CSV = ('BUILDING;NAME;DESCRIPTION;ROOM TYPE;BED TYPE;PHONE1;'
+             'SEATS BASE;SEATS ADDITIONAL\n'
+             'Building;Room 1;;Single;Single;;1;0\n'
+             'Missing;Room 2;;Single;Single;;1;0\n'
+             'Building;Room 1;;Single;Single;;1;0\n'
+             'Building;Room 3;;Single;Single;;1;0\n')
+
+
+class RoomImportTest(TestCase):
+    def setUp(self):
+        continent = Continent.objects.create(name='Europe')
+        country = Country.objects.create(name='Italy', continent=continent)
+        position = Position.objects.create(name='Rome')
+        region = Region.objects.create(name='Lazio',
+                                       country=country,
+                                       position=position)
+        location = Location.objects.create(name='Rome',
+                                           region=region,
+                                           province='RM')
+        structure = Structure.objects.create(
+            name='Structure',
+            company=Company.objects.create(name='Company'),
+            brand=Brand.objects.create(name='Brand'),
+            location=location)
+        self.building = Building.objects.create(name='Building',
+                                                structure=structure,
+                                                location=location)
+        RoomType.objects.create(name='Single')
+        BedType.objects.create(name='Single')
+
+    def create_room(self, row):
+        """Create a new room from a CSV row"""
+        return Room(building=Building.objects.get(name=row['BUILDING']),
+                    name=row['NAME'],
+                    room_type=RoomType.objects.get(name=row['ROOM TYPE']),
+                    bed_type=BedType.objects.get(name=row['BED TYPE']),
+                    seats_base=row['SEATS BASE'],
+                    seats_additional=row['SEATS ADDITIONAL'])
+
+    def test_import_csv(self):
+        self.client.force_login(User.objects.create_superuser(
+            username='admin', email='admin@localhost', password='admin'))
+        response = self.client.post(
+            reverse('admin:hotels_room_changelist') + 'import/',
+            {'csv_file': SimpleUploadedFile('rooms.csv',
+                                            ROOMS_CSV.encode('utf-8')),
+             'encoding': 'utf-8',
+             'delimiter': ';'},
+            follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(Room.objects.values_list('name', flat=True)),
+                         ['Room 1', 'Room 3'])
+        # The wrong rows are reported with their line number
+        messages = [str(message) for message in response.context['messages']]
+        self.assertEqual(len(messages), 3)
+        self.assertEqual(messages[0], 'Line 3: Unexpected building "Missing"')
+        self.assertTrue(messages[1].startswith('Line 4: '))
+        self.assertEqual(messages[2],
+                         'Your CSV file has been imported: 2 of 4 rows')
+
+    def test_import_ignore_conflicts(self):
+        Room.objects.create(name='Room 1',
+                            building=self.building,
+                            room_type=RoomType.objects.get(),
+                            bed_type=BedType.objects.get())
+        importer = CSVImporter(model=Room, batch_size=2, ignore_conflicts=True)
+        importer.import_file(
+            file=io.BytesIO(ROOMS_CSV.replace('Missing', 'Building').encode(
+                'utf-8')),
+            encoding='utf-8',
+            delimiter=';',
+            create_object=self.create_room)
+        self.assertEqual((importer.rows, importer.imported, importer.skipped),
+                         (4, 2, 2))
+        self.assertEqual(importer.errors, [])
+        self.assertEqual(sorted(Room.objects.values_list('name', flat=True)),
+                         ['Room 1', 'Room 2', 'Room 3'])
+
+    def test_foreign_key_cache(self):
+        buildings = CSVForeignKey(queryset=Building.objects.all(),
+                                  type_name='building',
+                                  field='name')
+        # The missing objects are cached too
+        with self.assertNumQueries(2):
+            for _ in range(2):
+                self.assertEqual(buildings.get('Building'), self.building)
+                with self.assertRaises(CSVImportError):
+                    buildings.get('Missing')
+        # The least recently used values are discarded
+        buildings.cache_size = 2
+        with self.assertNumQueries(1):
+            buildings.get('Building')
+            with self.assertRaises(CSVImportError):
+                buildings.get('Other')
+        self.assertEqual(list(buildings.cache.keys()), ['Building', 'Other'])
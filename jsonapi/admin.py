@@ -20,13 +20,15 @@
 
 from django.contrib import admin
 
-from .models import (ApiCommand, ApiCommandAdmin,
+from .models import (ApiChange, ApiChangeAdmin,
+                     ApiCommand, ApiCommandAdmin,
                      ApiCommandType, ApiCommandTypeAdmin,
                      ApiContextType, ApiContextTypeAdmin,
                      ApiLog, ApiLogAdmin)
 
 
 # Register your models here.
+admin.site.register(ApiChange, ApiChangeAdmin)
 admin.site.register(ApiCommand, ApiCommandAdmin)
 admin.site.register(ApiCommandType, ApiCommandTypeAdmin)
 admin.site.register(ApiContextType, ApiContextTypeAdmin)
@@ -25,3 +25,7 @@ from django.utils.translation import pgettext_lazy
 class JsonapiConfig(AppConfig):
     name = 'jsonapi'
     verbose_name = pgettext_lazy('JsonapiConfig', 'JSON API')
+
+    def ready(self):
+        # Connect signals
+        from . import signals  # noqa: F401
@@ -0,0 +1,31 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+from django.core.management.base import BaseCommand
+
+from jsonapi.models import ApiChange
+
+
+class Command(BaseCommand):
+    help = 'Delete the changes journal entries older than API_CHANGES_MAX_AGE'
+
+    def handle(self, *args, **options):
+        count = ApiChange.objects.prune()
+        self.stdout.write('Deleted {COUNT} changes'.format(COUNT=count))
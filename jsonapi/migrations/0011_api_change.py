@@ -0,0 +1,28 @@
+# Generated by Django 2.2.10 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jsonapi', '0010_translations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('command', 'Command'), ('contract', 'Contract'), ('reset', 'Reset'), ('service', 'Service'), ('structure', 'Structure'), ('tablet', 'Tablet'), ('timestamp_direction', 'Timestamp direction')], max_length=30, verbose_name='kind')),
+                ('object_id', models.PositiveIntegerField(verbose_name='object id')),
+                ('datetime', models.DateTimeField(auto_now_add=True, verbose_name='datetime')),
+            ],
+            options={
+                'verbose_name': 'Api change',
+                'verbose_name_plural': 'Api changes',
+                'db_table': 'api_changes',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+from .api_command_cache import (ApiCommandCache,                  # noqa: F401
+                                ApiCommandUsesCounter,            # noqa: F401
+                                api_command_cache,                # noqa: F401
+                                api_command_uses_counter)         # noqa: F401
+from .api_log_writer import ApiLogWriter, api_log_writer           # noqa: F401
+from .cache_timeout import get_cache_timeout                      # noqa: F401
+from .serializers import (compress,                               # noqa: F401
+                          get_content_encoding,                   # noqa: F401
+                          get_encoding,                           # noqa: F401
+                          get_serializer,                         # noqa: F401
+                          prepare_data)                           # noqa: F401
+from .snapshot_cache import SnapshotCache, get_snapshot_cache      # noqa: F401
+from .tablet_auth_cache import TabletAuthCache, tablet_auth_cache  # noqa: F401
@@ -0,0 +1,171 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import atexit
+import json
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+from .cache_timeout import get_cache_timeout
+
+from jsonapi.models import ApiCommand
+
+
+class ApiCommandCache(object):
+    """Keep the enabled commands in memory with their arguments merged"""
+    version_key = 'jsonapi.commands.version'
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.version = None
+        self.loaded = 0
+        # Commands for every tablet
+        self.common_commands = []
+        # Commands for each tablet
+        self.tablets_commands = {}
+        self.lock = threading.Lock()
+
+    def get_version(self):
+        """Return the current commands version"""
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, uuid.uuid4().hex, None)
+            version = cache.get(self.version_key)
+        return version
+
+    def invalidate(self):
+        """Force the commands reload by changing the version"""
+        cache.set(self.version_key, uuid.uuid4().hex, None)
+
+    def load(self):
+        """Load the enabled commands if they were changed or expired"""
+        version = self.get_version()
+        if (version == self.version and
+                time.monotonic() - self.loaded < self.timeout):
+            return
+        common_commands = []
+        tablets_commands = {}
+        for command in ApiCommand.objects.filter(
+                enabled=True).select_related(
+                    'command_type',
+                    'context_type').prefetch_related('tablets'):
+            # Prepare Command arguments
+            command_arguments = json.loads(command.command_type.command)
+            if command.command:
+                command_arguments.update(json.loads(command.command))
+            item = {'starting': command.starting,
+                    'ending': command.ending,
+                    'data': {
+                        'id': command.id,
+                        'name': command.name,
+                        'command_type': '{COMMAND} - '.format(
+                            COMMAND=command.command_type.name).split(' -')[0],
+                        'context': command.context_type.name,
+                        'uses': command.uses,
+                        'command': command_arguments
+                    }}
+            tablets = command.tablets.all()
+            if tablets:
+                for tablet in tablets:
+                    tablets_commands.setdefault(tablet.pk, []).append(item)
+            else:
+                common_commands.append(item)
+        with self.lock:
+            self.common_commands = common_commands
+            self.tablets_commands = tablets_commands
+            self.version = version
+            self.loaded = time.monotonic()
+
+    def get_items(self, tablet_id):
+        """Return the commands for the tablet, ordered by id"""
+        self.load()
+        with self.lock:
+            return sorted(self.common_commands +
+                          self.tablets_commands.get(tablet_id, []),
+                          key=lambda item: item['data']['id'])
+
+    def get_commands(self, tablet_id, now):
+        """Return the active commands data for the tablet"""
+        return [item['data']
+                for item in self.get_items(tablet_id)
+                if ((item['starting'] is None or item['starting'] <= now) and
+                    (item['ending'] is None or item['ending'] >= now))]
+
+    def get_next_change(self, tablet_id, now):
+        """Return the next datetime when the active commands will change"""
+        results = []
+        for item in self.get_items(tablet_id):
+            if item['starting'] is not None and item['starting'] > now:
+                results.append(item['starting'])
+            if item['ending'] is not None and item['ending'] >= now:
+                results.append(item['ending'])
+        return min(results) if results else None
+
+    def get_changed_commands(self, tablet_id, since, now):
+        """Return the ids of the commands started or ended in the period"""
+        return {item['data']['id']
+                for item in self.get_items(tablet_id)
+                if ((item['starting'] is not None and
+                     since < item['starting'] <= now) or
+                    (item['ending'] is not None and
+                     since <= item['ending'] < now))}
+
+
+class ApiCommandUsesCounter(object):
+    """Count the commands uses and save them in batches"""
+    def __init__(self, flush_interval):
+        self.flush_interval = flush_interval
+        self.uses = {}
+        self.flushed = time.monotonic()
+        self.lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def add(self, command_ids):
+        """Add a use for each command and save them if needed"""
+        with self.lock:
+            for command_id in command_ids:
+                self.uses[command_id] = self.uses.get(command_id, 0) + 1
+        if time.monotonic() - self.flushed >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Save the pending uses using atomic increments"""
+        with self.lock:
+            uses = self.uses
+            self.uses = {}
+            self.flushed = time.monotonic()
+        # Group the commands with the same increment in a single query
+        increments = {}
+        for command_id, count in uses.items():
+            increments.setdefault(count, []).append(command_id)
+        for count, command_ids in increments.items():
+            ApiCommand.objects.filter(pk__in=command_ids).update(
+                uses=models.F('uses') + count)
+
+
+api_command_cache = ApiCommandCache(
+    timeout=get_cache_timeout(settings.API_COMMANDS_CACHE_TIMEOUT))
+api_command_uses_counter = ApiCommandUsesCounter(
+    flush_interval=settings.API_COMMANDS_USES_FLUSH_INTERVAL)
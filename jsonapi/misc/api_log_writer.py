@@ -0,0 +1,171 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from jsonapi.models import ApiLog
+
+
+logger = logging.getLogger(__name__)
+
+
+class ApiLogWriter(object):
+    """Write ApiLog records in batches from a background thread"""
+    OVERFLOW_BLOCK = 'block'
+    OVERFLOW_DROP_NEWEST = 'drop_newest'
+    OVERFLOW_DROP_OLDEST = 'drop_oldest'
+    OVERFLOW_SYNC = 'sync'
+    OVERFLOW_POLICIES = (OVERFLOW_BLOCK,
+                         OVERFLOW_DROP_NEWEST,
+                         OVERFLOW_DROP_OLDEST,
+                         OVERFLOW_SYNC)
+
+    def __init__(self, enabled, buffer_size, batch_size, flush_interval,
+                 overflow_policy):
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError('Invalid overflow policy: {POLICY}'.format(
+                POLICY=overflow_policy))
+        self.enabled = enabled
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.dropped = 0
+        self.queue = None
+        self.thread = None
+        self.pid = None
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        atexit.register(self.stop)
+
+    def add(self, record):
+        """Add an unsaved ApiLog record to the writing queue"""
+        if not self.enabled:
+            self.write([record])
+            return
+        self.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow_policy == self.OVERFLOW_BLOCK:
+                self.queue.put(record)
+            elif self.overflow_policy == self.OVERFLOW_SYNC:
+                self.write([record])
+            elif self.overflow_policy == self.OVERFLOW_DROP_NEWEST:
+                self.dropped += 1
+            elif self.overflow_policy == self.OVERFLOW_DROP_OLDEST:
+                # Discard the oldest records until the new one fits
+                while True:
+                    try:
+                        self.queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+                    try:
+                        self.queue.put_nowait(record)
+                        break
+                    except queue.Full:
+                        pass
+
+    def start(self):
+        """Start the writer thread if it's not running in this process"""
+        pid = os.getpid()
+        if (self.pid == pid and self.thread is not None and
+                self.thread.is_alive()):
+            return
+        with self.lock:
+            if self.pid != pid:
+                # New process (after fork), the old queue is not shared
+                self.queue = queue.Queue(maxsize=self.buffer_size)
+                self.pid = pid
+            if self.thread is None or not self.thread.is_alive():
+                self.stopping.clear()
+                self.thread = threading.Thread(target=self.run,
+                                               name='ApiLogWriter',
+                                               daemon=True)
+                self.thread.start()
+
+    def stop(self):
+        """Stop the writer thread and flush any pending record"""
+        if self.thread is not None and self.pid == os.getpid():
+            self.stopping.set()
+            self.thread.join(timeout=max(self.flush_interval, 1) * 2)
+        self.flush()
+
+    def run(self):
+        """Collect records from the queue and write them in batches"""
+        try:
+            while not self.stopping.is_set():
+                self.write(self.collect())
+        finally:
+            connections.close_all()
+
+    def collect(self):
+        """Wait until a batch is full or the flush interval is elapsed"""
+        records = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(records) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                records.append(self.queue.get(timeout=min(timeout, 0.5)))
+            except queue.Empty:
+                if self.stopping.is_set():
+                    break
+        return records
+
+    def flush(self):
+        """Write every queued record immediately"""
+        if self.queue is None or self.pid != os.getpid():
+            return
+        records = []
+        while True:
+            try:
+                records.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        self.write(records)
+
+    def write(self, records):
+        """Save the records using a bulk insert"""
+        if records:
+            try:
+                ApiLog.objects.bulk_create(records,
+                                           batch_size=self.batch_size)
+            except DatabaseError:
+                logger.exception('Unable to write %d ApiLog records',
+                                 len(records))
+
+
+api_log_writer = ApiLogWriter(
+    enabled=settings.API_LOG_ASYNC,
+    buffer_size=settings.API_LOG_BUFFER_SIZE,
+    batch_size=settings.API_LOG_BATCH_SIZE,
+    flush_interval=settings.API_LOG_FLUSH_INTERVAL,
+    overflow_policy=settings.API_LOG_OVERFLOW_POLICY)
@@ -0,0 +1,35 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+from django.conf import settings
+
+# Cache backends whose data is not shared between the processes
+LOCAL_CACHE_BACKENDS = ('django.core.cache.backends.dummy.DummyCache',
+                        'django.core.cache.backends.locmem.LocMemCache')
+
+
+def get_cache_timeout(timeout):
+    """
+    Return the timeout for the cached data, limited to API_LOCAL_CACHE_TIMEOUT
+    when the invalidations are not seen by the other processes
+    """
+    if settings.CACHES['default']['BACKEND'] in LOCAL_CACHE_BACKENDS:
+        return min(timeout, settings.API_LOCAL_CACHE_TIMEOUT)
+    return timeout
@@ -0,0 +1,141 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import gzip
+import json
+import zlib
+
+from django.conf import settings
+from django.utils.encoding import force_text
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class JSONSerializer(object):
+    """Serialize the data using the standard JSON encoder"""
+    name = 'json'
+    media_types = ('application/json', )
+    content_type = 'application/json; charset=utf-8'
+
+    def dumps(self, data):
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+class OrjsonSerializer(JSONSerializer):
+    """Serialize the data using the faster orjson encoder"""
+
+    def dumps(self, data):
+        return orjson.dumps(data)
+
+
+class MsgpackSerializer(object):
+    """Serialize the data using the MessagePack binary format"""
+    name = 'msgpack'
+    media_types = ('application/msgpack', 'application/x-msgpack')
+    content_type = 'application/msgpack'
+
+    def dumps(self, data):
+        return msgpack.packb(data, use_bin_type=True)
+
+
+# Available serializers, the first one is the default
+serializers = [OrjsonSerializer() if orjson else JSONSerializer()]
+if msgpack:
+    serializers.append(MsgpackSerializer())
+# Available compression functions
+compressors = {
+    'gzip': lambda content: gzip.compress(content,
+                                          compresslevel=6,
+                                          mtime=0),
+    'deflate': lambda content: zlib.compress(content, 6),
+}
+
+
+def prepare_data(data):
+    """Convert the data to primitive types for the serializers"""
+    if data is None or isinstance(data, (str, bool, int, float)):
+        return data
+    elif isinstance(data, dict):
+        return {str(key): prepare_data(value) for key, value in data.items()}
+    elif isinstance(data, (list, tuple)):
+        return [prepare_data(item) for item in data]
+    try:
+        # QuerySets and other iterable types
+        return [prepare_data(item) for item in iter(data)]
+    except TypeError:
+        # Dates, decimals, UUIDs and other types
+        return force_text(data)
+
+
+def parse_accept_header(value):
+    """Return the accepted values from an Accept header, in order"""
+    results = []
+    for item in value.lower().split(','):
+        media_type, *parameters = [part.strip() for part in item.split(';')]
+        quality = 1.0
+        for parameter in parameters:
+            if parameter.startswith('q='):
+                try:
+                    quality = float(parameter[2:])
+                except ValueError:
+                    quality = 0.0
+        # Skip the explicitly refused values
+        if media_type and quality > 0:
+            results.append(media_type)
+    return results
+
+
+def get_serializer(accept):
+    """Return the serializer for the Accept header"""
+    accepted = parse_accept_header(accept)
+    for serializer in serializers:
+        if any(media_type in accepted
+               for media_type in serializer.media_types):
+            return serializer
+    return serializers[0]
+
+
+def get_encoding(accept_encoding):
+    """Return the compression for the Accept-Encoding header"""
+    accepted = parse_accept_header(accept_encoding)
+    for encoding in compressors:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def get_content_encoding(accept_encoding, content):
+    """Return the compression for the Accept-Encoding header and content"""
+    if len(content) >= settings.API_COMPRESSION_MIN_SIZE:
+        return get_encoding(accept_encoding)
+    return None
+
+
+def compress(content, encoding):
+    """Compress the content using the requested encoding"""
+    return compressors[encoding](content) if encoding else content
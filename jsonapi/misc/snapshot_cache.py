@@ -0,0 +1,86 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache_timeout import get_cache_timeout
+
+
+class SnapshotCache(object):
+    """Cache the serialized responses until the source data is changed"""
+    def __init__(self, name, timeout):
+        self.name = name
+        self.timeout = timeout
+
+    def get_version_key(self):
+        """Return the cache key for the data version"""
+        return 'jsonapi.{NAME}.version'.format(NAME=self.name)
+
+    def get_version(self):
+        """Return the current data version"""
+        version = cache.get(self.get_version_key())
+        if version is None:
+            cache.add(self.get_version_key(), uuid.uuid4().hex, None)
+            version = cache.get(self.get_version_key())
+        return version
+
+    def get_key(self, key):
+        """Return the cache key for the snapshot of the current version"""
+        return 'jsonapi.{NAME}.{VERSION}.{KEY}'.format(
+            NAME=self.name,
+            VERSION=self.get_version(),
+            KEY=key)
+
+    def get(self, key):
+        """Return the snapshot dictionary or None if missing or expired"""
+        snapshot = cache.get(self.get_key(key))
+        if snapshot is not None and snapshot['expires'] > time.time():
+            return snapshot
+        return None
+
+    def set(self, key, content, content_type, content_encoding,
+            expires=None, **kwargs):
+        """Save a new snapshot with its ETag and any other data"""
+        now = time.time()
+        expires = min(expires or now + self.timeout, now + self.timeout)
+        snapshot = {'content': content,
+                    'content_type': content_type,
+                    'content_encoding': content_encoding,
+                    'etag': '"{HASH}"'.format(
+                        HASH=hashlib.sha1(content).hexdigest()),
+                    'expires': expires}
+        snapshot.update(kwargs)
+        if expires > now:
+            cache.set(self.get_key(key), snapshot, int(expires - now) + 1)
+        return snapshot
+
+    def invalidate(self):
+        """Discard every snapshot by changing the data version"""
+        cache.set(self.get_version_key(), uuid.uuid4().hex, None)
+
+
+get_snapshot_cache = SnapshotCache(
+    name='get',
+    timeout=get_cache_timeout(settings.API_GET_CACHE_TIMEOUT))
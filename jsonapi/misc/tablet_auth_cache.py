@@ -0,0 +1,87 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import time
+
+import pyotp
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache_timeout import get_cache_timeout
+
+from work.models import Tablet
+
+
+class TabletAuthCache(object):
+    """Cache the tablets status and the verified TOTP passwords"""
+    # TOTP time step in seconds
+    interval = 30
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+
+    def get_tablet_key(self, tablet_id):
+        """Return the cache key for the tablet data"""
+        return 'jsonapi.tablet.{ID}'.format(ID=tablet_id)
+
+    def get_password_key(self, tablet_id, password, step):
+        """Return the cache key for the password verification"""
+        return 'jsonapi.tablet.{ID}.{PASSWORD}.{STEP}'.format(
+            ID=tablet_id,
+            PASSWORD=password,
+            STEP=step)
+
+    def get_tablet_data(self, tablet_id):
+        """Return the tablet status and TOTP key, loading it if needed"""
+        cache_key = self.get_tablet_key(tablet_id)
+        data = cache.get(cache_key)
+        if data is None:
+            # Raise Tablet.DoesNotExist for invalid tablet id
+            tablet = Tablet.objects.get(id=tablet_id)
+            data = {'status': tablet.status,
+                    'key': tablet.get_totp_key()}
+            cache.set(cache_key, data, self.timeout)
+        return data
+
+    def authenticate(self, tablet_id, password):
+        """
+        Return a tuple with a Tablet instance and the password verification
+        result, the Tablet instance contains only the id and the status
+        """
+        data = self.get_tablet_data(tablet_id)
+        step = int(time.time() / self.interval)
+        cache_key = self.get_password_key(tablet_id, password, step)
+        verification = cache.get(cache_key)
+        if verification is None or verification[0] != data['key']:
+            # Verify the password only once for each TOTP step
+            totp = pyotp.TOTP(data['key'], interval=self.interval)
+            verification = (data['key'], totp.verify(password,
+                                                     valid_window=1))
+            cache.set(cache_key, verification, self.interval * 2)
+        return Tablet(id=tablet_id, status=data['status']), verification[1]
+
+    def invalidate(self, tablet_id):
+        """Remove the cached tablet data"""
+        cache.delete(self.get_tablet_key(tablet_id))
+
+
+tablet_auth_cache = TabletAuthCache(
+    timeout=get_cache_timeout(settings.API_TABLET_AUTH_CACHE_TIMEOUT))
@@ -18,6 +18,7 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 ##
 
+from .api_change import ApiChange, ApiChangeAdmin                # noqa: F401
 from .api_command import ApiCommand, ApiCommandAdmin              # noqa: F401
 from .api_command_type import (ApiCommandType,                    # noqa: F401
                                ApiCommandTypeAdmin)               # noqa: F401
@@ -0,0 +1,97 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import datetime
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import pgettext_lazy
+
+from utility.models import BaseModel, BaseModelAdmin
+
+
+class ApiChangeManager(models.Manager):
+    def add_changes(self, kind, object_ids):
+        """Add a journal entry for each changed object"""
+        self.bulk_create([self.model(kind=kind, object_id=object_id)
+                          for object_id in set(object_ids)])
+
+    def get_last_id(self):
+        """Return the id of the last journal entry"""
+        return self.aggregate(last_id=models.Max('id'))['last_id'] or 0
+
+    def prune(self):
+        """Delete the journal entries older than the cursors maximum age"""
+        # The last entry is kept to preserve the current cursor position
+        count, _ = self.filter(
+            datetime__lt=timezone.now() - datetime.timedelta(
+                days=settings.API_CHANGES_MAX_AGE)).exclude(
+                    id=self.get_last_id()).delete()
+        return count
+
+
+class ApiChange(BaseModel):
+    KIND_COMMAND = 'command'
+    KIND_CONTRACT = 'contract'
+    KIND_RESET = 'reset'
+    KIND_SERVICE = 'service'
+    KIND_STRUCTURE = 'structure'
+    KIND_TABLET = 'tablet'
+    KIND_TIMESTAMP_DIRECTION = 'timestamp_direction'
+
+    kind = models.CharField(max_length=30,
+                            choices=((KIND_COMMAND,
+                                      pgettext_lazy('ApiChange', 'Command')),
+                                     (KIND_CONTRACT,
+                                      pgettext_lazy('ApiChange', 'Contract')),
+                                     (KIND_RESET,
+                                      pgettext_lazy('ApiChange', 'Reset')),
+                                     (KIND_SERVICE,
+                                      pgettext_lazy('ApiChange', 'Service')),
+                                     (KIND_STRUCTURE,
+                                      pgettext_lazy('ApiChange', 'Structure')),
+                                     (KIND_TABLET,
+                                      pgettext_lazy('ApiChange', 'Tablet')),
+                                     (KIND_TIMESTAMP_DIRECTION,
+                                      pgettext_lazy('ApiChange',
+                                                    'Timestamp direction'))),
+                            verbose_name=pgettext_lazy('ApiChange', 'kind'))
+    object_id = models.PositiveIntegerField(
+        verbose_name=pgettext_lazy('ApiChange', 'object id'))
+    datetime = models.DateTimeField(auto_now_add=True,
+                                    verbose_name=pgettext_lazy('ApiChange',
+                                                               'datetime'))
+    objects = ApiChangeManager()
+
+    class Meta:
+        # Define the database table
+        db_table = 'api_changes'
+        ordering = ['id']
+        verbose_name = pgettext_lazy('ApiChange', 'Api change')
+        verbose_name_plural = pgettext_lazy('ApiChange', 'Api changes')
+
+    def __str__(self):
+        return '{KIND} {OBJECT_ID}'.format(KIND=self.kind,
+                                           OBJECT_ID=self.object_id)
+
+
+class ApiChangeAdmin(BaseModelAdmin):
+    readonly_fields = ('id', 'datetime')
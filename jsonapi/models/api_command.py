@@ -88,4 +88,5 @@ class ApiCommandNameFilter(AdminTextInputFilter):
 
 
 class ApiCommandAdmin(BaseModelAdmin):
-    pass
+    # The uses are updated by the API using atomic increments
+    readonly_fields = ('uses', )
@@ -0,0 +1,184 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from hotels.models import (BedType, Brand, Building, Company, Room, RoomType,
+                           Service, ServiceExtra, Structure)
+
+from jsonapi.misc import (api_command_cache, get_snapshot_cache,
+                          tablet_auth_cache)
+from jsonapi.models import (ApiChange, ApiCommand, ApiCommandType,
+                            ApiContextType)
+
+from locations.models import Country, Location, Region
+
+from work.models import (Contract, ContractType, Employee, JobType, Tablet,
+                         TimestampDirection)
+
+# Models whose data is included in the v1/get responses
+GET_SNAPSHOT_MODELS = (ApiCommand, ApiCommandType, ApiContextType,
+                       BedType, Brand, Building, Company, Contract,
+                       ContractType, Country, Employee, JobType, Location,
+                       Region, Room, RoomType, Service, ServiceExtra,
+                       Structure, Tablet, TimestampDirection)
+# Models whose changes require the tablets to reload all the data
+RESET_JOURNAL_MODELS = (ApiCommandType, ApiContextType, BedType, Brand,
+                        Company, ContractType, Country, JobType, Location,
+                        Region, RoomType)
+
+
+@receiver(post_save, sender=Tablet)
+@receiver(post_delete, sender=Tablet)
+def invalidate_tablet_auth(sender, instance, **kwargs):
+    """Remove the cached authentication data for the changed tablet"""
+    tablet_auth_cache.invalidate(instance.pk)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_get_snapshot(sender, **kwargs):
+    """Discard the cached v1/get responses when their data is changed"""
+    if sender in GET_SNAPSHOT_MODELS:
+        get_snapshot_cache.invalidate()
+
+
+@receiver(m2m_changed, sender=ApiCommand.tablets.through)
+@receiver(m2m_changed, sender=Contract.buildings.through)
+@receiver(m2m_changed, sender=Tablet.buildings.through)
+def invalidate_get_snapshot_relations(sender, action, **kwargs):
+    """Discard the cached v1/get responses when the relations are changed"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        get_snapshot_cache.invalidate()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def add_changes_journal(sender, instance, **kwargs):
+    """Add the changed objects to the changes journal"""
+    if sender is Structure:
+        ApiChange.objects.add_changes(kind=ApiChange.KIND_STRUCTURE,
+                                      object_ids=[instance.pk])
+    elif sender in (Building, ServiceExtra):
+        ApiChange.objects.add_changes(kind=ApiChange.KIND_STRUCTURE,
+                                      object_ids=[instance.structure_id])
+    elif sender is Room:
+        ApiChange.objects.add_changes(
+            kind=ApiChange.KIND_STRUCTURE,
+            object_ids=Building.objects.filter(
+                pk=instance.building_id).values_list('structure_id',
+                                                     flat=True))
+    elif sender is Contract:
+        ApiChange.objects.add_changes(kind=ApiChange.KIND_CONTRACT,
+                                      object_ids=[instance.pk])
+    elif sender is Employee:
+        ApiChange.objects.add_changes(
+            kind=ApiChange.KIND_CONTRACT,
+            object_ids=Contract.objects.filter(
+                employee_id=instance.pk).values_list('id', flat=True))
+    elif sender is Service:
+        ApiChange.objects.add_changes(kind=ApiChange.KIND_SERVICE,
+                                      object_ids=[instance.pk])
+    elif sender is TimestampDirection:
+        ApiChange.objects.add_changes(
+            kind=ApiChange.KIND_TIMESTAMP_DIRECTION,
+            object_ids=[instance.pk])
+    elif sender is ApiCommand:
+        ApiChange.objects.add_changes(kind=ApiChange.KIND_COMMAND,
+                                      object_ids=[instance.pk])
+    elif sender is Tablet:
+        ApiChange.objects.add_changes(kind=ApiChange.KIND_TABLET,
+                                      object_ids=[instance.pk])
+    elif sender in RESET_JOURNAL_MODELS:
+        ApiChange.objects.add_changes(kind=ApiChange.KIND_RESET,
+                                      object_ids=[0])
+
+
+@receiver(m2m_changed, sender=ApiCommand.tablets.through)
+@receiver(m2m_changed, sender=Contract.buildings.through)
+@receiver(m2m_changed, sender=Tablet.buildings.through)
+def add_changes_journal_relations(sender, instance, action, reverse, pk_set,
+                                  **kwargs):
+    """Add the objects with changed relations to the changes journal"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        kind = {ApiCommand.tablets.through: ApiChange.KIND_COMMAND,
+                Contract.buildings.through: ApiChange.KIND_CONTRACT,
+                Tablet.buildings.through: ApiChange.KIND_TABLET}[sender]
+        if not reverse:
+            ApiChange.objects.add_changes(kind=kind,
+                                          object_ids=[instance.pk])
+        elif pk_set:
+            ApiChange.objects.add_changes(kind=kind, object_ids=pk_set)
+        else:
+            # The cleared objects are unknown
+            ApiChange.objects.add_changes(kind=ApiChange.KIND_RESET,
+                                          object_ids=[0])
+
+
+@receiver(pre_save, sender=Building)
+def add_changes_journal_buildings_moved(sender, instance, **kwargs):
+    """Reload the tablets data when their buildings are moved"""
+    if instance.pk and Building.objects.filter(pk=instance.pk).exclude(
+            structure_id=instance.structure_id).exists():
+        add_changes_journal_buildings_deleted(sender, instance)
+
+
+@receiver(pre_delete, sender=Building)
+def add_changes_journal_buildings_deleted(sender, instance, **kwargs):
+    """Reload the tablets data when their buildings are deleted"""
+    ApiChange.objects.add_changes(
+        kind=ApiChange.KIND_TABLET,
+        object_ids=Tablet.objects.filter(
+            buildings=instance.pk).values_list('id', flat=True))
+
+
+@receiver(m2m_changed, sender=Contract.buildings.through)
+def add_changes_journal_contracts_buildings(sender, instance, action, reverse,
+                                            pk_set, **kwargs):
+    """Reload the tablets data when the contracts buildings are removed"""
+    if action == 'post_remove' and not reverse:
+        building_ids = pk_set
+    elif action == 'pre_clear' and not reverse:
+        building_ids = instance.buildings.values('id')
+    elif action in ('post_remove', 'pre_clear'):
+        building_ids = [instance.pk]
+    else:
+        return
+    ApiChange.objects.add_changes(
+        kind=ApiChange.KIND_TABLET,
+        object_ids=Tablet.objects.filter(
+            buildings__in=building_ids).values_list('id', flat=True))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_api_commands(sender, **kwargs):
+    """Reload the API commands when they are changed"""
+    if sender in (ApiCommand, ApiCommandType, ApiContextType):
+        api_command_cache.invalidate()
+
+
+@receiver(m2m_changed, sender=ApiCommand.tablets.through)
+def invalidate_api_commands_tablets(sender, action, **kwargs):
+    """Reload the API commands when their tablets are changed"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        api_command_cache.invalidate()
@@ -0,0 +1,445 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import datetime
+import gzip
+import io
+import json
+import os
+import queue
+
+import pyotp
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from hotels.models import (BedType, Brand, Building, Company, Room, RoomType,
+                           Service, ServiceExtra, ServiceType, Structure)
+
+from jsonapi.misc import ApiLogWriter, api_command_uses_counter
+from jsonapi.models import (ApiChange, ApiCommand, ApiCommandType,
+                            ApiContextType, ApiLog)
+
+from locations.models import Continent, Country, Location, Position, Region
+
+from website.models import AdminOption
+
+from work.models import (ActivityRoom, Contract, ContractType, Employee,
+                         JobType, Tablet, Timestamp, TimestampDirection)
+
+
+class JsonApiTestData(object):
+    def create_data(self):
+        """Create the shared objects and a tablet without buildings"""
+        # Discard the cached data of the previous tests
+        cache.clear()
+        continent = Continent.objects.create(name='Europe')
+        country = Country.objects.create(name='Italy', continent=continent)
+        position = Position.objects.create(name='Rome')
+        region = Region.objects.create(name='Lazio',
+                                       country=country,
+                                       position=position)
+        self.location = Location.objects.create(name='Rome',
+                                                region=region,
+                                                province='RM')
+        self.brand = Brand.objects.create(name='Brand')
+        self.company = Company.objects.create(name='Company')
+        self.room_type = RoomType.objects.create(name='Single')
+        self.bed_type = BedType.objects.create(name='Single')
+        service_type = ServiceType.objects.create(name='Extra', order=1)
+        self.service = Service.objects.create(name='Extra',
+                                              extra_service=True,
+                                              service_type=service_type)
+        self.contract_type = ContractType.objects.create(name='Full time',
+                                                         daily_hours=8,
+                                                         weekly_hours=40)
+        self.job_type = JobType.objects.create(name='Maid')
+        command_type = ApiCommandType.objects.create(name='notify - Notify',
+                                                     command='{}')
+        context_type = ApiContextType.objects.create(name='Main')
+        self.command = ApiCommand.objects.create(name='Command',
+                                                 command_type=command_type,
+                                                 context_type=context_type)
+        self.tablet = Tablet.objects.create()
+        self.structures = 0
+        self.contracts = 0
+
+    def add_chain(self, structures, buildings, rooms, contracts):
+        """Add some structures with their buildings, rooms and contracts"""
+        new_buildings = []
+        for _ in range(structures):
+            self.structures += 1
+            structure = Structure.objects.create(
+                name='Structure {INDEX}'.format(INDEX=self.structures),
+                company=self.company,
+                brand=self.brand,
+                location=self.location)
+            ServiceExtra.objects.create(structure=structure,
+                                        service=self.service,
+                                        price=1)
+            for index in range(buildings):
+                building = Building.objects.create(
+                    name='Building {STRUCTURE}.{INDEX}'.format(
+                        STRUCTURE=self.structures,
+                        INDEX=index),
+                    structure=structure,
+                    location=self.location,
+                    extras=index == buildings - 1)
+                new_buildings.append(building)
+                for room in range(rooms):
+                    Room.objects.create(
+                        name='Room {INDEX}'.format(INDEX=room),
+                        building=building,
+                        room_type=self.room_type,
+                        bed_type=self.bed_type)
+        self.tablet.buildings.add(*new_buildings)
+        for _ in range(contracts):
+            self.contracts += 1
+            employee = Employee.objects.create(
+                first_name='Employee',
+                last_name=str(self.contracts),
+                birth_date=datetime.date(1980, 1, 1),
+                birth_location=self.location,
+                location=self.location,
+                permit_location=self.location,
+                tax_code=str(self.contracts))
+            contract = Contract.objects.create(
+                employee=employee,
+                company=self.company,
+                contract_type=self.contract_type,
+                job_type=self.job_type,
+                roll_number=str(self.contracts),
+                start_date=datetime.date(2020, 1, 1),
+                level=1,
+                associated=False)
+            contract.buildings.set(new_buildings)
+
+    def get_url(self, name, **kwargs):
+        """Return the URL for the tablet with the current password"""
+        kwargs.update(tablet_id=self.tablet.pk,
+                      password=pyotp.TOTP(self.tablet.get_totp_key()).now())
+        return reverse(name, kwargs=kwargs)
+
+
+class APIv1GetQueriesTest(JsonApiTestData, TestCase):
+    databases = {'default', 'api_logs'}
+
+    def setUp(self):
+        self.create_data()
+
+    def get_data(self):
+        """Request the tablet data without any cached response"""
+        cache.clear()
+        response = self.client.get(self.get_url('api/v1/get'))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_constant_queries(self):
+        """The queries don't grow with contracts, buildings and rooms"""
+        self.add_chain(structures=1, buildings=2, rooms=1, contracts=1)
+        with CaptureQueriesContext(connection) as queries:
+            self.get_data()
+        self.add_chain(structures=5, buildings=4, rooms=10, contracts=20)
+        with self.assertNumQueries(len(queries)):
+            response = self.get_data()
+        self.assertContains(response, 'Structure 6')
+
+
+class APIv1AuthenticationTest(JsonApiTestData, TestCase):
+    databases = {'default', 'api_logs'}
+
+    def setUp(self):
+        self.create_data()
+
+    def test_invalid_password(self):
+        password = pyotp.TOTP(self.tablet.get_totp_key()).now()
+        response = self.client.get(reverse('api/v1/get', kwargs={
+            'tablet_id': self.tablet.pk,
+            'password': '{PASSWORD:06d}'.format(
+                PASSWORD=(int(password) + 500000) % 1000000)}))
+        self.assertEqual(response.status_code, 403)
+
+    def test_disabled_tablet(self):
+        response = self.client.get(self.get_url('api/v1/get'))
+        self.assertEqual(response.status_code, 200)
+        # The cached tablet status is discarded after the changes
+        self.tablet.status = False
+        self.tablet.save()
+        response = self.client.get(self.get_url('api/v1/get'))
+        self.assertEqual(response.status_code, 403)
+
+
+class APIv1GetSnapshotTest(JsonApiTestData, TestCase):
+    databases = {'default', 'api_logs'}
+
+    def setUp(self):
+        # Save the uses of the previous tests before adding the commands
+        api_command_uses_counter.flush()
+        self.create_data()
+        self.add_chain(structures=1, buildings=1, rooms=1, contracts=1)
+
+    def test_not_modified(self):
+        response = self.client.get(self.get_url('api/v1/get'))
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.client.get(self.get_url('api/v1/get'),
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # The cached snapshot is discarded after the changes
+        Room.objects.create(name='New room',
+                            building=Building.objects.get(),
+                            room_type=self.room_type,
+                            bed_type=self.bed_type)
+        response = self.client.get(self.get_url('api/v1/get'),
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, 'New room')
+
+    @override_settings(API_COMPRESSION_MIN_SIZE=0)
+    def test_compression(self):
+        response = self.client.get(self.get_url('api/v1/get'),
+                                   HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            json.loads(gzip.decompress(response.content))['status'], 'OK')
+
+    def test_command_uses(self):
+        for _ in range(2):
+            self.client.get(self.get_url('api/v1/get'))
+        api_command_uses_counter.flush()
+        self.command.refresh_from_db()
+        self.assertEqual(self.command.uses, 2)
+
+
+class APIv1ChangesTest(JsonApiTestData, TestCase):
+    databases = {'default', 'api_logs'}
+
+    def setUp(self):
+        self.create_data()
+        self.add_chain(structures=1, buildings=1, rooms=1, contracts=1)
+        response = self.client.get(self.get_url('api/v1/get'))
+        self.cursor = response.json()['cursor']
+
+    def get_changes(self, cursor):
+        """Request the changes since the cursor"""
+        response = self.client.get(self.get_url('api/v1/changes',
+                                                cursor=cursor))
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_changes(self):
+        data = self.get_changes(self.cursor)
+        self.assertEqual(data['status'], 'OK')
+        self.assertEqual(data['structures'], {})
+        self.assertEqual(data['contracts'], [])
+        building = Building.objects.get()
+        Room.objects.create(name='New room',
+                            building=building,
+                            room_type=self.room_type,
+                            bed_type=self.bed_type)
+        data = self.get_changes(self.cursor)
+        self.assertEqual(data['status'], 'OK')
+        self.assertEqual(
+            [structure['structure']['id']
+             for structure in data['structures'].values()],
+            [building.structure_id])
+        self.assertIn('New room', json.dumps(data['structures']))
+        # The next cursor doesn't include the previous changes
+        self.assertEqual(self.get_changes(data['cursor'])['structures'], {})
+
+    def test_removed_contract(self):
+        contract_id = Contract.objects.get().pk
+        Contract.objects.get().delete()
+        data = self.get_changes(self.cursor)
+        self.assertEqual(data['status'], 'OK')
+        self.assertEqual(data['contracts'], [])
+        self.assertEqual(data['removed']['contracts'], [contract_id])
+
+    def test_reset(self):
+        self.brand.name = 'New brand'
+        self.brand.save()
+        self.assertEqual(self.get_changes(self.cursor)['status'], 'RESET')
+
+    def test_expired_cursor(self):
+        self.assertEqual(self.get_changes('0-0')['status'], 'RESET')
+
+    def test_prune(self):
+        ApiChange.objects.add_changes(kind=ApiChange.KIND_SERVICE,
+                                      object_ids=[1, 2])
+        last_id = ApiChange.objects.get_last_id()
+        ApiChange.objects.update(
+            datetime=timezone.now() - datetime.timedelta(days=30))
+        ApiChange.objects.add_changes(kind=ApiChange.KIND_SERVICE,
+                                      object_ids=[3])
+        call_command('api_changes_prune', stdout=io.StringIO())
+        # The recent changes are kept
+        self.assertEqual(
+            list(ApiChange.objects.values_list('object_id', flat=True)),
+            [3])
+        self.assertGreater(ApiChange.objects.get_last_id(), last_id)
+
+
+class APIv1PutTest(JsonApiTestData, TestCase):
+    databases = {'default', 'api_logs'}
+
+    def setUp(self):
+        self.create_data()
+        # The last building contains the extras rooms
+        self.add_chain(structures=1, buildings=2, rooms=2, contracts=1)
+        self.contract = Contract.objects.get()
+        self.structure = Structure.objects.get()
+        self.room = Room.objects.filter(building__extras=False).first()
+        self.direction = TimestampDirection.objects.create(name='Enter',
+                                                           short_code='E',
+                                                           type_enter=True,
+                                                           type_exit=False)
+        AdminOption.objects.create(section='APIv1PutExtra',
+                                   group='get_context_data',
+                                   name='extras_service_id',
+                                   value=str(self.service.pk))
+        self.datetime = int(datetime.datetime(2020, 3, 2, 8).timestamp())
+
+    def put_batch(self, records):
+        """Send the records to the batch endpoint and return the results"""
+        response = self.client.post(self.get_url('api/v1/put/batch'),
+                                    data=json.dumps(records),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_put_timestamp(self):
+        results = []
+        for _ in range(2):
+            response = self.client.get(self.get_url(
+                'api/v1/put/timestamp',
+                contract_id=self.contract.pk,
+                structure_id=self.structure.pk,
+                direction_id=self.direction.pk,
+                datetime=self.datetime))
+            self.assertEqual(response.status_code, 200)
+            results.append(response.json())
+        self.assertEqual([result['status'] for result in results],
+                         ['OK', 'EXISTING'])
+        self.assertEqual(results[0]['timestamp_id'],
+                         results[1]['timestamp_id'])
+        self.assertEqual(Timestamp.objects.count(), 1)
+
+    def test_put_batch(self):
+        timestamp = {'type': 'timestamp',
+                     'contract_id': self.contract.pk,
+                     'structure_id': self.structure.pk,
+                     'direction_id': self.direction.pk,
+                     'datetime': self.datetime}
+        activity = {'type': 'activity',
+                    'contract_id': self.contract.pk,
+                    'room_id': self.room.pk,
+                    'service_id': self.service.pk,
+                    'service_qty': 1,
+                    'datetime': self.datetime}
+        extra = {'type': 'extra',
+                 'contract_id': self.contract.pk,
+                 'structure_id': self.structure.pk,
+                 'service_qty': 1,
+                 'datetime': self.datetime}
+        results = self.put_batch([
+            timestamp,
+            timestamp,
+            activity,
+            dict(activity, service_qty=2),
+            dict(activity, service_qty=-1),
+            dict(activity, room_id=0),
+            {'type': 'unknown'},
+            extra,
+            extra,
+            extra])
+        self.assertEqual([result.get('status') for result in results],
+                         ['OK', 'EXISTING', 'OK', 'QUANTITY', 'INVALID',
+                          'INVALID', 'INVALID', 'OK', 'OK', 'NO ROOMS'])
+        self.assertEqual(results[0]['timestamp_id'],
+                         Timestamp.objects.get().pk)
+        # The extras use every extra room once
+        self.assertEqual(
+            sorted(ActivityRoom.objects.filter(
+                room__building__extras=True).values_list('room', flat=True)),
+            sorted(Room.objects.filter(building__extras=True).values_list(
+                'pk', flat=True)))
+        # The records sent again are not duplicated
+        results = self.put_batch([timestamp, activity])
+        self.assertEqual([result['status'] for result in results],
+                         ['EXISTING', 'EXISTING'])
+        self.assertEqual(ActivityRoom.objects.count(), 3)
+
+
+class ApiLogWriterTest(TransactionTestCase):
+    databases = {'default', 'api_logs'}
+
+    def get_record(self, index):
+        """Return an unsaved ApiLog record"""
+        return ApiLog(date=datetime.date.today(),
+                      time=datetime.datetime.now().replace(microsecond=0),
+                      message_level=0,
+                      method='GET',
+                      path='/api/v1/status/',
+                      raw_uri='/api/v1/status/',
+                      url_name='api/v1/status',
+                      func_name='APIv1StatusView',
+                      tablet_id=0,
+                      extra=str(index),
+                      api_version=1)
+
+    def test_write(self):
+        writer = ApiLogWriter(enabled=True,
+                              buffer_size=100,
+                              batch_size=10,
+                              flush_interval=0.1,
+                              overflow_policy=ApiLogWriter.OVERFLOW_BLOCK)
+        for index in range(25):
+            writer.add(self.get_record(index))
+        writer.stop()
+        self.assertEqual(
+            sorted(ApiLog.objects.filter(
+                url_name='api/v1/status').values_list('extra', flat=True)),
+            sorted(str(index) for index in range(25)))
+
+    def test_drop_oldest(self):
+        writer = ApiLogWriter(
+            enabled=True,
+            buffer_size=5,
+            batch_size=10,
+            flush_interval=0.1,
+            overflow_policy=ApiLogWriter.OVERFLOW_DROP_OLDEST)
+        # Fill the queue without the writer thread
+        writer.start = lambda: None
+        writer.pid = os.getpid()
+        writer.queue = queue.Queue(maxsize=writer.buffer_size)
+        for index in range(8):
+            writer.add(self.get_record(index))
+        writer.flush()
+        self.assertEqual(writer.dropped, 3)
+        self.assertEqual(
+            sorted(ApiLog.objects.filter(
+                url_name='api/v1/status').values_list('extra', flat=True)),
+            [str(index) for index in range(3, 8)])
@@ -22,11 +22,13 @@ import django.urls as urls
 
 from . import views
 
-from utility.converters import (IsoDateStrConverter,
+from utility.converters import (CursorConverter,
+                                IsoDateStrConverter,
                                 IsoTimeStrConverter,
                                 OTPKeyConverter)
 
 
+urls.register_converter(CursorConverter, CursorConverter.name)
 urls.register_converter(IsoDateStrConverter, IsoDateStrConverter.name)
 urls.register_converter(IsoTimeStrConverter, IsoTimeStrConverter.name)
 urls.register_converter(OTPKeyConverter, OTPKeyConverter.name)
@@ -75,6 +77,13 @@ urlpatterns.append(urls.path('v1/get/'
                              '<otpkey:password>/',
                              views.APIv1GetView.as_view(),
                              name='api/v1/get'))
+# Changes page
+urlpatterns.append(urls.path('v1/changes/'
+                             '<int:tablet_id>/'
+                             '<otpkey:password>/'
+                             '<cursor:cursor>/',
+                             views.APIv1ChangesView.as_view(),
+                             name='api/v1/changes'))
 # Put activity page
 urlpatterns.append(urls.path('v1/put/activity/'
                              '<int:tablet_id>/'
@@ -174,3 +183,9 @@ urlpatterns.append(urls.path('v1/put/timestamp/'
                              '<int:datetime>/',
                              views.APIv1PutTimestamp.as_view(),
                              name='api/v1/put/timestamp'))
+# Put batch page
+urlpatterns.append(urls.path('v1/put/batch/'
+                             '<int:tablet_id>/'
+                             '<otpkey:password>/',
+                             views.APIv1PutBatch.as_view(),
+                             name='api/v1/put/batch'))
@@ -18,9 +18,11 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 ##
 
-from .v1 import (APIv1DatesView,                                  # noqa: F401
+from .v1 import (APIv1ChangesView,                                # noqa: F401
+                 APIv1DatesView,                                  # noqa: F401
                  APIv1GetView,                                    # noqa: F401
                  APIv1PutActivity,                                # noqa: F401
+                 APIv1PutBatch,                                   # noqa: F401
                  APIv1PutExtra,                                   # noqa: F401
                  APIv1PutTimestamp,                               # noqa: F401
                  APIv1StatusView,                                 # noqa: F401
@@ -18,9 +18,11 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 ##
 
+from .api_changes import APIv1ChangesView                         # noqa: F401
 from .api_dates import APIv1DatesView                             # noqa: F401
 from .api_get import APIv1GetView                                 # noqa: F401
 from .api_put_activity import APIv1PutActivity                    # noqa: F401
+from .api_put_batch import APIv1PutBatch                          # noqa: F401
 from .api_put_extra import APIv1PutExtra                          # noqa: F401
 from .api_put_timestamp import APIv1PutTimestamp                  # noqa: F401
 from .api_status import APIv1StatusView                           # noqa: F401
@@ -22,9 +22,13 @@ import datetime
 import json
 
 from django.core.exceptions import ObjectDoesNotExist, PermissionDenied
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
 
 import json_views.views
 
+from jsonapi.misc import (api_log_writer, compress, get_content_encoding,
+                          get_serializer, prepare_data, tablet_auth_cache)
 from jsonapi.models import ApiLog
 
 from work.models import Tablet
@@ -41,8 +45,10 @@ class APIv1BaseView(json_views.views.JSONDataView):
                      extra=None)
         if self.login_with_tablet_id:
             try:
-                self.tablet = Tablet.objects.get(id=kwargs['tablet_id'])
-                if not self.tablet.check_password(password=kwargs['password']):
+                self.tablet, verified = tablet_auth_cache.authenticate(
+                    tablet_id=kwargs['tablet_id'],
+                    password=kwargs['password'])
+                if not verified:
                     # Raise error 403 for invalid password
                     self.add_log(message_level=20,
                                  tablet_id=kwargs.get('tablet_id', 0),
@@ -68,13 +74,37 @@ class APIv1BaseView(json_views.views.JSONDataView):
 
         return context
 
+    def render_to_response(self, context, *args, **kwargs):
+        """Serialize the context using the requested format and encoding"""
+        content, content_type, content_encoding = self.serialize(context)
+        response = HttpResponse(content=content, content_type=content_type)
+        self.add_headers(response, content_encoding)
+        return response
+
+    def serialize(self, context):
+        """Return the serialized context with its content type and encoding"""
+        serializer = get_serializer(self.request.META.get('HTTP_ACCEPT', ''))
+        content = serializer.dumps(prepare_data(context))
+        content_encoding = get_content_encoding(
+            self.request.META.get('HTTP_ACCEPT_ENCODING', ''), content)
+        return (compress(content, content_encoding),
+                serializer.content_type,
+                content_encoding)
+
+    def add_headers(self, response, content_encoding):
+        """Add the caching and content negotiation headers"""
+        response['Cache-Control'] = 'max-age=0,no-cache,no-store'
+        if content_encoding:
+            response['Content-Encoding'] = content_encoding
+        patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+
     def add_status(self, context):
         """Add context status response with OK"""
         context['status'] = 'OK'
 
     def add_log(self, message_level, tablet_id, extra):
         """Add an entry to the ApiLog"""
-        ApiLog.objects.create(
+        api_log_writer.add(ApiLog(
             date=datetime.date.today(),
             time=datetime.datetime.now().replace(microsecond=0),
             message_level=message_level,
@@ -88,12 +118,12 @@ class APIv1BaseView(json_views.views.JSONDataView):
             user_agent=self.request.META.get('HTTP_USER_AGENT', ''),
             client_agent=self.request.META.get('HTTP_CLIENT_AGENT', ''),
             client_version=self.request.META.get('HTTP_CLIENT_VERSION', ''),
-            user=self.request.user,
+            user=str(self.request.user),
             tablet_id=tablet_id,
             kwargs=self.json_prettify(self.request.resolver_match.kwargs),
             args=self.json_prettify(self.request.resolver_match.args),
             extra=extra if extra is not None else '',
-            api_version=1)
+            api_version=1))
 
     def json_prettify(self, arguments):
         """Format the arguments in JSON formatted style"""
@@ -0,0 +1,139 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import datetime
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from hotels.models import Structure
+
+from jsonapi.misc import api_command_cache, api_command_uses_counter
+from jsonapi.models import ApiChange
+
+from work.models import Contract
+
+from .api_tablet_data import APIv1TabletDataView
+
+
+class APIv1ChangesView(APIv1TabletDataView):
+    login_with_tablet_id = True
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        last_id, last_time = map(int, kwargs['cursor'].split('-'))
+        last_datetime = datetime.datetime.fromtimestamp(last_time,
+                                                        tz=timezone.utc)
+        # Save the changes journal position before reading the data
+        cursor = self.get_cursor()
+        current_id = int(cursor.split('-')[0])
+        context['cursor'] = cursor
+        changes = {}
+        for kind, object_id in ApiChange.objects.filter(
+                id__gt=last_id,
+                id__lte=current_id).values_list('kind', 'object_id'):
+            changes.setdefault(kind, set()).add(object_id)
+        if (last_id > current_id or
+                last_datetime < timezone.now() - datetime.timedelta(
+                    days=settings.API_CHANGES_MAX_AGE) or
+                ApiChange.KIND_RESET in changes or
+                self.tablet.pk in changes.get(ApiChange.KIND_TABLET, ())):
+            # The tablet must reload all the data using v1/get
+            context['status'] = 'RESET'
+            return context
+        removed = {}
+        # Add changed structures
+        structure_ids = changes.get(ApiChange.KIND_STRUCTURE, set())
+        contract_ids = changes.get(ApiChange.KIND_CONTRACT, set())
+        if structure_ids:
+            structures, buildings_set = self.get_structures(
+                self.get_buildings(structure_ids=structure_ids))
+            # The contracts buildings could be changed
+            contract_ids |= set(Contract.buildings.through.objects.filter(
+                building__structure_id__in=structure_ids).values_list(
+                    'contract_id', flat=True))
+        else:
+            structures = {}
+        context['structures'] = structures
+        # Remove the deleted structures, excluding the other tablets ones
+        missing_ids = structure_ids - {structure['structure']['id']
+                                       for structure in structures.values()}
+        if missing_ids:
+            missing_ids -= set(Structure.objects.filter(
+                pk__in=missing_ids).values_list('id', flat=True))
+        removed['structures'] = sorted(missing_ids)
+        # Add contracts started or expired since the last cursor
+        last_date = datetime.date.fromtimestamp(last_time)
+        today = datetime.date.today()
+        if last_date < today:
+            contract_ids |= set(Contract.objects.filter(
+                models.Q(start_date__gt=last_date, start_date__lte=today) |
+                models.Q(end_date__gte=last_date, end_date__lt=today)
+                ).values_list('id', flat=True))
+        # Add changed contracts
+        contracts = (self.get_contracts(
+            building_ids=self.tablet.buildings.all(),
+            buildings_set=self.get_buildings_set(),
+            contract_ids=contract_ids) if contract_ids else [])
+        context['contracts'] = contracts
+        # Remove the deleted or inactive contracts of the tablet buildings
+        missing_ids = contract_ids - {contract['contract']['id']
+                                      for contract in contracts}
+        if missing_ids:
+            missing_ids -= set(Contract.objects.filter(
+                pk__in=missing_ids).exclude(
+                    buildings__in=self.tablet.buildings.all()).values_list(
+                        'id', flat=True))
+        removed['contracts'] = sorted(missing_ids)
+        # Add changed services
+        service_ids = changes.get(ApiChange.KIND_SERVICE, set())
+        services = (list(self.get_services(service_ids=service_ids))
+                    if service_ids else [])
+        context['services'] = services
+        removed['services'] = sorted(
+            service_ids - {service['id'] for service in services})
+        # Add changed timestamp directions
+        direction_ids = changes.get(ApiChange.KIND_TIMESTAMP_DIRECTION,
+                                    set())
+        directions = (list(self.get_timestamp_directions(
+                            direction_ids=direction_ids))
+                      if direction_ids else [])
+        context['timestamp_directions'] = directions
+        removed['timestamp_directions'] = sorted(
+            direction_ids - {direction['id'] for direction in directions})
+        # Add commands started or ended since the last cursor
+        now = timezone.now()
+        command_ids = changes.get(ApiChange.KIND_COMMAND, set())
+        command_ids |= api_command_cache.get_changed_commands(
+            tablet_id=self.tablet.pk,
+            since=last_datetime,
+            now=now)
+        # Add changed commands
+        commands = (self.get_commands(command_ids=command_ids)
+                    if command_ids else [])
+        context['commands'] = commands
+        api_command_uses_counter.add([command['id'] for command in commands])
+        removed['commands'] = sorted(
+            command_ids - {command['id'] for command in commands})
+        context['removed'] = removed
+        # Add closing status (to check for transmission errors)
+        self.add_status(context)
+        return context
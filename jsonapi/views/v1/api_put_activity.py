@@ -21,6 +21,8 @@
 import datetime
 import urllib.parse
 
+from utility.misc import insert_or_get
+
 from work.models import Activity
 from work.models import ActivityRoom
 
@@ -40,45 +42,31 @@ class APIv1PutActivity(APIv1BaseView):
                                               minute=0,
                                               second=0,
                                               microsecond=0))
-        activity_query = Activity.objects.filter(
+        activity, _ = Activity.objects.get_or_create(
             contract_id=int(context['contract_id']),
             date=activity_date)
-        if activity_query:
-            # Look for existing activity
-            activity = activity_query[0]
-        else:
-            # No existing activity, create a new one
-            activity = Activity.objects.create(
-                contract_id=int(context['contract_id']),
-                date=activity_date)
         # Add Activity room to activity
-        activity_query = ActivityRoom.objects.filter(
+        activity, created = insert_or_get(
+            model=ActivityRoom,
             activity_id=activity.pk,
             room_id=int(context['room_id']),
-            service_id=int(context['service_id']))
-        if activity_query:
-            activity = activity_query[0]
-            if activity.service_qty != int(context['service_qty']):
-                # Existing activity but with a different quantity
-                context['status'] = 'QUANTITY'
-            elif activity.description != urllib.parse.unquote_plus(
-                    context['description'].replace('\\n', '\n')):
-                # Existing activity but with a different description
-                context['status'] = 'DESCRIPTION'
-            else:
-                # Existing matching activity
-                context['status'] = 'EXISTING'
-        else:
-            # No existing timestamp
-            activity = ActivityRoom.objects.create(
-                activity_id=activity.pk,
-                room_id=int(context['room_id']),
-                service_id=int(context['service_id']),
-                service_qty=int(context['service_qty']),
-                description=urllib.parse.unquote_plus(
-                    context['description'].replace('\\n', '\n')))
+            service_id=int(context['service_id']),
+            defaults={'service_qty': int(context['service_qty']),
+                      'description': urllib.parse.unquote_plus(
+                          context['description'].replace('\\n', '\n'))})
+        if created:
             # Add closing status (to check for transmission errors)
             self.add_status(context)
+        elif activity.service_qty != int(context['service_qty']):
+            # Existing activity but with a different quantity
+            context['status'] = 'QUANTITY'
+        elif activity.description != urllib.parse.unquote_plus(
+                context['description'].replace('\\n', '\n')):
+            # Existing activity but with a different description
+            context['status'] = 'DESCRIPTION'
+        else:
+            # Existing matching activity
+            context['status'] = 'EXISTING'
         # Return timestamp id
         context['activity_id'] = activity.pk
         return context
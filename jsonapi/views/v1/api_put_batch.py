@@ -0,0 +1,273 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import datetime
+import json
+
+from django.core.exceptions import SuspiciousOperation
+from django.db import transaction
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+
+from hotels.models import Room
+from hotels.models import Service
+from hotels.models import Structure
+
+from utility.misc import bulk_insert_or_ignore, get_admin_options
+
+from work.models import Activity
+from work.models import ActivityRoom
+from work.models import ActivityStat
+from work.models import Contract
+from work.models import Timestamp, TimestampDay
+from work.models import TimestampDirection
+
+from .api_base import APIv1BaseView
+from .api_put_extra import APIv1PutExtra
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class APIv1PutBatch(APIv1BaseView):
+    login_with_tablet_id = True
+    http_method_names = ['post']
+    # Required fields for each record type
+    records_fields = {
+        'timestamp': ('contract_id', 'structure_id', 'direction_id',
+                      'datetime'),
+        'activity': ('contract_id', 'room_id', 'service_id', 'service_qty',
+                     'datetime'),
+        'extra': ('contract_id', 'structure_id', 'service_qty', 'datetime'),
+    }
+    # Models referenced by each field
+    references = {
+        'contract_id': Contract,
+        'structure_id': Structure,
+        'direction_id': TimestampDirection,
+        'room_id': Room,
+        'service_id': Service,
+    }
+
+    def post(self, request, *args, **kwargs):
+        context = self.get_context_data(**kwargs)
+        return self.render_to_response(context)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            records = json.loads(self.request.body.decode('utf-8'))
+        except ValueError:
+            raise SuspiciousOperation('Invalid JSON data')
+        if not isinstance(records, list):
+            raise SuspiciousOperation('A list of records was expected')
+        # Each result is updated in place while processing the records
+        results = [{} for _ in records]
+        items = self.parse_records(records, results)
+        with transaction.atomic():
+            self.put_timestamps(
+                [item for item in items if item['type'] == 'timestamp'])
+            self.put_activities(
+                [item for item in items if item['type'] != 'timestamp'])
+        context['results'] = results
+        # Add closing status (to check for transmission errors)
+        self.add_status(context)
+        return context
+
+    def parse_records(self, records, results):
+        """Return the valid records, setting INVALID status for the others"""
+        items = []
+        for record, result in zip(records, results):
+            try:
+                fields = self.records_fields[record['type']]
+                item = {field: int(record[field]) for field in fields}
+                if item.get('service_qty', 0) < 0:
+                    raise ValueError('Invalid service quantity')
+                item['datetime'] = datetime.datetime.fromtimestamp(
+                    item['datetime'])
+                item['description'] = str(record.get('description', ''))
+                item['type'] = record['type']
+                item['result'] = result
+                items.append(item)
+            except (AttributeError, KeyError, OverflowError, OSError,
+                    TypeError, ValueError):
+                result['status'] = 'INVALID'
+        # Check the referenced objects using a query for each model
+        for field, model in self.references.items():
+            values = {item[field] for item in items if field in item}
+            if values:
+                existing = set(model.objects.filter(
+                    pk__in=values).values_list('pk', flat=True))
+                for item in items:
+                    if field in item and item[field] not in existing:
+                        item['result']['status'] = 'INVALID'
+        return [item for item in items if not item['result']]
+
+    def put_timestamps(self, items):
+        """Add the new timestamps and set the results status"""
+        if not items:
+            return
+        queryset = Timestamp.objects.filter(
+            contract_id__in={item['contract_id'] for item in items},
+            date__in={item['datetime'].date() for item in items})
+        fields = ('contract_id', 'structure_id', 'direction_id', 'date',
+                  'time')
+        existing = {values[1:]: values[0]
+                    for values in queryset.values_list('id', *fields)}
+        new_timestamps = {}
+        for item in items:
+            key = (item['contract_id'],
+                   item['structure_id'],
+                   item['direction_id'],
+                   item['datetime'].date(),
+                   item['datetime'].time())
+            item['key'] = key
+            if key in existing or key in new_timestamps:
+                # If the timestamp already exists reply with an EXISTING status
+                item['result']['status'] = 'EXISTING'
+            else:
+                # No existing timestamp
+                new_timestamps[key] = Timestamp(
+                    contract_id=item['contract_id'],
+                    structure_id=item['structure_id'],
+                    direction_id=item['direction_id'],
+                    date=item['datetime'].date(),
+                    time=item['datetime'].time(),
+                    description=item['description'])
+                item['result']['status'] = 'OK'
+        if new_timestamps:
+            bulk_insert_or_ignore(Timestamp, new_timestamps.values())
+            # Compute again the days of the new timestamps
+            TimestampDay.objects.refresh_on_commit(
+                (obj.contract_id, obj.date) for obj in new_timestamps.values())
+            existing = {values[1:]: values[0]
+                        for values in queryset.values_list('id', *fields)}
+        # Return timestamp id
+        for item in items:
+            item['result']['timestamp_id'] = existing.get(item['key'])
+            if item['result']['timestamp_id'] is None:
+                # The timestamp was not inserted
+                item['result']['status'] = 'ERROR'
+
+    def put_activities(self, items):
+        """Add the new activities and extras and set the results status"""
+        if not items:
+            return
+        activities = self.get_activities(items)
+        # Get the existing activities rooms
+        queryset = ActivityRoom.objects.filter(
+            activity_id__in=set(activities.values()))
+        existing = {values[:3]: values[3:]
+                    for values in queryset.values_list('activity_id',
+                                                       'room_id',
+                                                       'service_id',
+                                                       'service_qty',
+                                                       'description')}
+        new_activity_rooms = {}
+        for item in items:
+            if item['type'] != 'activity':
+                continue
+            key = (activities[(item['contract_id'], item['datetime'].date())],
+                   item['room_id'],
+                   item['service_id'])
+            item['key'] = key
+            if key in existing or key in new_activity_rooms:
+                if key in existing:
+                    service_qty, description = existing[key]
+                else:
+                    service_qty = new_activity_rooms[key].service_qty
+                    description = new_activity_rooms[key].description
+                if service_qty != item['service_qty']:
+                    # Existing activity but with a different quantity
+                    item['result']['status'] = 'QUANTITY'
+                elif description != item['description']:
+                    # Existing activity but with a different description
+                    item['result']['status'] = 'DESCRIPTION'
+                else:
+                    # Existing matching activity
+                    item['result']['status'] = 'EXISTING'
+            else:
+                new_activity_rooms[key] = ActivityRoom(
+                    activity_id=key[0],
+                    room_id=key[1],
+                    service_id=key[2],
+                    service_qty=item['service_qty'],
+                    description=item['description'])
+                item['result']['status'] = 'OK'
+        if new_activity_rooms:
+            bulk_insert_or_ignore(ActivityRoom,
+                                  new_activity_rooms.values())
+            # Compute again the statistics of the new activities rooms
+            ActivityStat.objects.refresh_activities_on_commit(
+                key[0] for key in new_activity_rooms)
+        if existing or new_activity_rooms:
+            existing = {values[1:]: values[0]
+                        for values in queryset.values_list(
+                            'id', 'activity_id', 'room_id', 'service_id')}
+            # Return activity id
+            for item in items:
+                if 'key' in item:
+                    item['result']['activity_id'] = existing.get(item['key'])
+                    if item['result']['activity_id'] is None:
+                        # The activity room was not inserted
+                        item['result']['status'] = 'ERROR'
+        # Add the extras after the activities
+        extras = [item for item in items if item['type'] == 'extra']
+        if extras:
+            extras_service_id = int(get_admin_options(
+                APIv1PutExtra.__name__, 'get_context_data')[
+                    'extras_service_id'])
+            for item in extras:
+                activity_id = activities[(item['contract_id'],
+                                          item['datetime'].date())]
+                # Assign the ActivityRoom to the first available extra room
+                activity_room = ActivityRoom.objects.add_extra(
+                    activity_id=activity_id,
+                    structure_id=item['structure_id'],
+                    service_id=extras_service_id,
+                    service_qty=item['service_qty'],
+                    description=item['description'])
+                if activity_room:
+                    item['result']['status'] = 'OK'
+                    item['result']['activity_id'] = activity_room.pk
+                else:
+                    # No available extra rooms to work with
+                    item['result']['status'] = 'NO ROOMS'
+                    item['result']['activity_id'] = activity_id
+
+    def get_activities(self, items):
+        """Return the activities for each contract and date, adding them"""
+        queryset = Activity.objects.filter(
+            contract_id__in={item['contract_id'] for item in items},
+            date__in={item['datetime'].date() for item in items})
+        activities = {values[1:]: values[0]
+                      for values in queryset.values_list('id',
+                                                         'contract_id',
+                                                         'date')}
+        new_activities = {(item['contract_id'], item['datetime'].date())
+                          for item in items} - set(activities.keys())
+        if new_activities:
+            # No existing activity, create a new one
+            bulk_insert_or_ignore(Activity, [
+                Activity(contract_id=contract_id, date=date)
+                for contract_id, date in new_activities])
+            activities = {values[1:]: values[0]
+                          for values in queryset.values_list('id',
+                                                             'contract_id',
+                                                             'date')}
+        return activities
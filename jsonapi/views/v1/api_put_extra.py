@@ -22,8 +22,6 @@ import datetime
 import sys
 import urllib.parse
 
-from hotels.models import Room
-
 from utility.misc import get_admin_options
 
 from work.models import Activity
@@ -45,47 +43,22 @@ class APIv1PutExtra(APIv1BaseView):
                                               minute=0,
                                               second=0,
                                               microsecond=0))
-        activity_query = Activity.objects.filter(
+        activity, _ = Activity.objects.get_or_create(
             contract_id=int(context['contract_id']),
             date=activity_date)
-        if activity_query:
-            # Look for existing activity
-            activity = activity_query[0]
-        else:
-            # No existing activity, create a new one
-            activity = Activity.objects.create(
-                contract_id=int(context['contract_id']),
-                date=activity_date)
         # Add Activity extra to activity
         context.update(get_admin_options(self.__class__.__name__,
                                          sys._getframe().f_code.co_name))
-        # Get the already used rooms for extras
-        extra_used_rooms = [room[0]
-                            for room
-                            in ActivityRoom.objects.filter(
-                                activity_id=activity.pk,
-                                service_id=int(context['extras_service_id']),
-                                room__building__extras=True)
-                            .values_list('room')]
-        # Get the all the existing rooms for extras
-        extra_rooms = [room[0]
-                       for room
-                       in Room.objects.filter(
-                           building__structure_id=context['structure_id'],
-                           building__extras=True)
-                       .order_by('name')
-                       .values_list('id')]
-        # Get the free rooms for extras
-        extra_free_rooms = list(set(extra_rooms) - set(extra_used_rooms))
-        if extra_free_rooms:
-            # Assign the ActivityRoom to the first available extra room
-            activity = ActivityRoom.objects.create(
-                activity_id=activity.pk,
-                room_id=extra_free_rooms[0],
-                service_id=int(context['extras_service_id']),
-                service_qty=int(context['service_qty']),
-                description=urllib.parse.unquote_plus(
-                    context['description'].replace('\\n', '\n')))
+        # Assign the ActivityRoom to the first available extra room
+        activity_room = ActivityRoom.objects.add_extra(
+            activity_id=activity.pk,
+            structure_id=int(context['structure_id']),
+            service_id=int(context['extras_service_id']),
+            service_qty=int(context['service_qty']),
+            description=urllib.parse.unquote_plus(
+                context['description'].replace('\\n', '\n')))
+        if activity_room:
+            activity = activity_room
             # Add closing status (to check for transmission errors)
             self.add_status(context)
         else:
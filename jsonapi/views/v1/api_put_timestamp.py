@@ -21,6 +21,8 @@
 import datetime
 import urllib.parse
 
+from utility.misc import insert_or_get
+
 from work.models import Timestamp
 
 from .api_base import APIv1BaseView
@@ -34,28 +36,21 @@ class APIv1PutTimestamp(APIv1BaseView):
         if 'description' not in context:
             context['description'] = ''
 
-        timestamp_query = Timestamp.objects.filter(
+        timestamp, created = insert_or_get(
+            model=Timestamp,
             contract_id=int(context['contract_id']),
             structure_id=int(context['structure_id']),
             direction_id=int(context['direction_id']),
             date=datetime.datetime.fromtimestamp(int(context['datetime'])),
-            time=datetime.datetime.fromtimestamp(int(context['datetime'])))
-        if timestamp_query:
-            # If the timestamp already exists reply with an EXISTING status
-            timestamp = timestamp_query[0]
-            context['status'] = 'EXISTING'
-        else:
-            # No existing timestamp
-            timestamp = Timestamp.objects.create(
-                contract_id=int(context['contract_id']),
-                structure_id=int(context['structure_id']),
-                direction_id=int(context['direction_id']),
-                date=datetime.datetime.fromtimestamp(int(context['datetime'])),
-                time=datetime.datetime.fromtimestamp(int(context['datetime'])),
-                description=urllib.parse.unquote_plus(
-                    context['description'].replace('\\n', '\n')))
+            time=datetime.datetime.fromtimestamp(int(context['datetime'])),
+            defaults={'description': urllib.parse.unquote_plus(
+                context['description'].replace('\\n', '\n'))})
+        if created:
             # Add closing status (to check for transmission errors)
             self.add_status(context)
+        else:
+            # If the timestamp already exists reply with an EXISTING status
+            context['status'] = 'EXISTING'
         # Return timestamp id
         context['timestamp_id'] = timestamp.pk
         return context
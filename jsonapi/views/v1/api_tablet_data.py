@@ -0,0 +1,256 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import datetime
+
+from django.db import models
+from django.utils import timezone
+
+from hotels.models import Room
+from hotels.models import Service
+from hotels.models import ServiceExtra
+
+from jsonapi.misc import api_command_cache
+from jsonapi.models import ApiChange
+
+from work.models import Contract
+from work.models import TimestampDirection
+
+from .api_base import APIv1BaseView
+
+
+class APIv1TabletDataView(APIv1BaseView):
+    """Base view to list the data for the selected tablet"""
+    login_with_tablet_id = True
+
+    def get_cursor(self):
+        """Return the cursor for the current changes journal position"""
+        return '{ID}-{TIME}'.format(ID=ApiChange.objects.get_last_id(),
+                                    TIME=int(timezone.now().timestamp()))
+
+    def get_buildings(self, structure_ids=None):
+        """List the tablet buildings with their related objects"""
+        queryset = self.tablet.buildings.select_related(
+            'structure__company',
+            'structure__brand',
+            'structure__location__region__country',
+            'location__region__country')
+        if structure_ids is not None:
+            queryset = queryset.filter(structure_id__in=structure_ids)
+        return list(queryset)
+
+    def get_structures(self, obj_buildings):
+        """
+        Return the structures dictionary and the set of the buildings
+        with some rooms, excluding the extras buildings
+        """
+        structures = {}
+        buildings_set = set()
+        # Load service extra and rooms for all the buildings at once
+        services_extra = self.group_by(
+            ServiceExtra.objects.filter(
+                structure_id__in={obj_building.structure_id
+                                  for obj_building in obj_buildings}
+                ).values('id', 'service_id', 'price', 'structure_id'),
+            'structure_id')
+        rooms_per_building = self.group_by(
+            Room.objects.filter(
+                building_id__in=[obj_building.id
+                                 for obj_building in obj_buildings]
+                ).values('id', 'name', 'building_id', 'room_type__name',
+                         'bed_type__name'),
+            'building_id')
+        for obj_building in obj_buildings:
+            obj_structure = obj_building.structure
+            if obj_structure.name not in structures:
+                # Add new structure if doesn't exist
+                obj_location = obj_structure.location
+                obj_region = obj_location.region
+                obj_country = obj_region.country
+                structure = {'structure': {'id': obj_structure.id,
+                                           'name': obj_structure.name
+                                           },
+                             'company': {'id': obj_structure.company.pk,
+                                         'name': obj_structure.company.name
+                                         },
+                             'brand': {'id': obj_structure.brand.pk,
+                                       'name': obj_structure.brand.name
+                                       },
+                             'location': {'id': obj_location.pk,
+                                          'name': obj_location.name,
+                                          'address': obj_structure.address,
+                                          'region': {'id': obj_region.pk,
+                                                     'name': obj_region.name
+                                                     },
+                                          'country': {'id': obj_country.pk,
+                                                      'name': obj_country.name
+                                                      },
+                                          },
+                             'buildings': [],
+                             'extras': [],
+                             'service_extra': [],
+                             }
+                # Add service extra to structure
+                for obj_extra in services_extra.get(obj_structure.id, []):
+                    service_extra = {'id': obj_extra['id'],
+                                     'service_id': obj_extra['service_id'],
+                                     'price': float(obj_extra['price'])}
+                    structure['service_extra'].append(service_extra)
+                structures[obj_structure.name] = structure
+            # Add buildings to the structure
+            structure = structures[obj_building.structure.name]
+            buildings = structure['buildings']
+            extras = structure['extras']
+            obj_location = obj_building.location
+            obj_region = obj_location.region
+            obj_country = obj_region.country
+            rooms = rooms_per_building.get(obj_building.id)
+            if rooms:
+                building = {'building': {'id': obj_building.id,
+                                         'name': obj_building.name,
+                                         },
+                            'location': {'id': obj_location.pk,
+                                         'name': obj_location.name,
+                                         'address': obj_structure.address,
+                                         'region': {'id': obj_region.pk,
+                                                    'name': obj_region.name
+                                                    },
+                                         'country': {'id': obj_country.pk,
+                                                     'name': obj_country.name
+                                                     },
+                                         },
+                            'rooms': [{'room': {'id': room['id'],
+                                                'name': room['name']
+                                                },
+                                       'room_type': room['room_type__name'],
+                                       'bed_type': room['bed_type__name'],
+                                       }
+                                      for room in rooms],
+                            }
+                if not obj_building.extras:
+                    buildings_set.add(obj_building.id)
+                    buildings.append(building)
+                else:
+                    extras.append(building)
+        return structures, buildings_set
+
+    def get_buildings_set(self):
+        """Return the set of the tablet buildings used for the contracts"""
+        return set(self.tablet.buildings.filter(
+            extras=False,
+            room__isnull=False).values_list('id', flat=True))
+
+    def get_contracts(self, building_ids, buildings_set, contract_ids=None):
+        """List the active contracts for the tablet buildings"""
+        contracts = []
+        queryset = Contract.objects.filter(
+                # Include only contracts with some buildings
+                models.Q(buildings__in=building_ids),
+                # Include only enabled contracts
+                models.Q(enabled=True),
+                # Include only started contracts
+                models.Q(start_date__lte=datetime.date.today()),
+                # Include only not expired contracts
+                (models.Q(end_date__isnull=True) |
+                 models.Q(end_date__gte=datetime.date.today()))
+            ).select_related('employee',
+                             'company',
+                             'contract_type',
+                             'job_type').distinct()
+        if contract_ids is not None:
+            queryset = queryset.filter(pk__in=contract_ids)
+        obj_contracts = list(queryset)
+        # Load the buildings for all the contracts at once
+        contracts_buildings = self.group_by(
+            Contract.buildings.through.objects.filter(
+                contract_id__in=[obj_contract.pk
+                                 for obj_contract in obj_contracts]
+                ).order_by('building__structure__name',
+                           'building__name').values('contract_id',
+                                                    'building_id'),
+            'contract_id')
+        for obj_contract in obj_contracts:
+            obj_employee = obj_contract.employee
+            obj_contract_type = obj_contract.contract_type
+            contract = {'contract': {'id': obj_contract.pk,
+                                     'guid': obj_contract.guid,
+                                     'start': obj_contract.start_date,
+                                     'end': obj_contract.end_date
+                                     if obj_contract.end_date is not None
+                                     else '2099-12-31',
+                                     'enabled': obj_contract.enabled,
+                                     'active': obj_contract.active()
+                                     },
+                        'employee': {'id': obj_employee.pk,
+                                     'first_name': obj_employee.first_name,
+                                     'last_name': obj_employee.last_name,
+                                     'gender': obj_employee.gender
+                                     },
+                        'company': {'id': obj_contract.company.pk,
+                                    'name': obj_contract.company.name
+                                    },
+                        'type': {'id': obj_contract_type.pk,
+                                 'name': obj_contract_type.name,
+                                 'daily': obj_contract_type.daily_hours,
+                                 'weekly': obj_contract_type.weekly_hours,
+                                 },
+                        'job': {'id': obj_contract.job_type.pk,
+                                'name': obj_contract.job_type.name,
+                                },
+                        'buildings': [building['building_id']
+                                      for building
+                                      in contracts_buildings.get(
+                                          obj_contract.pk, [])
+                                      if building['building_id']
+                                      in buildings_set]
+                        }
+            contracts.append(contract)
+        return contracts
+
+    def get_services(self, service_ids=None):
+        """List the room services"""
+        queryset = Service.objects.filter(room_service=True)
+        if service_ids is not None:
+            queryset = queryset.filter(pk__in=service_ids)
+        return queryset.values('id', 'name', 'extra_service', 'show_in_app')
+
+    def get_timestamp_directions(self, direction_ids=None):
+        """List the timestamp directions"""
+        queryset = TimestampDirection.objects.exclude(id=0)
+        if direction_ids is not None:
+            queryset = queryset.filter(pk__in=direction_ids)
+        return queryset.values('id', 'name', 'description', 'short_code',
+                               'type_enter', 'type_exit')
+
+    def get_commands(self, command_ids=None):
+        """List the active commands for the tablet"""
+        commands = api_command_cache.get_commands(tablet_id=self.tablet.pk,
+                                                  now=timezone.now())
+        if command_ids is not None:
+            commands = [command for command in commands
+                        if command['id'] in command_ids]
+        return commands
+
+    def group_by(self, values, field):
+        """Group a list of dictionaries by a field, preserving the order"""
+        results = {}
+        for item in values:
+            results.setdefault(item[field], []).append(item)
+        return results
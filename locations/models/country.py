@@ -18,11 +18,7 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 ##
 
-import csv
-import io
-
 from django.db import models
-from django.contrib import messages
 from django.shortcuts import render, redirect
 from django.urls import path
 from django.utils.translation import pgettext_lazy
@@ -31,6 +27,7 @@ from .continent import Continent
 from .language import Language
 
 from utility.forms import CSVImportForm
+from utility.misc import CSVForeignKey, CSVImporter
 from utility.models import BaseModel, BaseModelAdmin
 
 
@@ -75,59 +72,39 @@ class CountryAdmin(BaseModelAdmin):
         return urls
 
     def import_csv(self, request):
-        def append_error(type_name, item):
-            """Append an error message to the messages list"""
-            error_message = pgettext_lazy(
-                'Country',
-                'Unexpected {TYPE} "{ITEM}"'.format(TYPE=type_name,
-                                                    ITEM=item))
-            if error_message not in error_messages:
-                error_messages.append(error_message)
-                self.message_user(request, error_message, messages.ERROR)
-
         if request.method == "POST":
-            # Preload continents
-            continents = {}
-            for item in Continent.objects.all():
-                continents[item.name] = item
-            # Preload languages
-            languages = {}
-            for item in Language.objects.all():
-                languages[item.name] = item
-            # Load CSV file content
-            csv_file = io.TextIOWrapper(
-                request.FILES['csv_file'].file,
-                encoding=request.POST['encoding'])
-            reader = csv.DictReader(
-                csv_file,
-                delimiter=request.POST['delimiter'])
-            # Load data from CSV
-            error_messages = []
-            countries = []
+            # Resolve continents and languages
+            continents = CSVForeignKey(queryset=Continent.objects.all(),
+                                       type_name='continent',
+                                       field='name')
+            languages = CSVForeignKey(queryset=Language.objects.all(),
+                                      type_name='language',
+                                      field='name')
             country_language = {}
-            for row in reader:
-                if row['CONTINENT'] not in continents:
-                    append_error('continent', row['CONTINENT'])
-                elif row['LANGUAGE'] not in languages:
-                    append_error('language', row['LANGUAGE'])
-                else:
-                    # If no error create a new Country object
-                    country = Country(name=row['NAME'],
-                                      description=row['DESCRIPTION'],
-                                      capital=row['CAPITAL'],
-                                      continent=continents[row['CONTINENT']])
-                    country_language[row['NAME']] = row['LANGUAGE']
-                    countries.append(country)
-            # Save data only if there were not errors
-            if not error_messages:
-                Country.objects.bulk_create(countries)
-                self.message_user(request, pgettext_lazy(
-                    'Country',
-                    'Your CSV file has been imported'))
-                # Add language in each country
+
+            def create_country(row):
+                """Create a new Country object"""
+                country = Country(name=row['NAME'],
+                                  description=row['DESCRIPTION'],
+                                  capital=row['CAPITAL'],
+                                  continent=continents.get(row['CONTINENT']))
+                country_language[row['NAME']] = languages.get(row['LANGUAGE'])
+                return country
+
+            def set_languages(countries):
+                """Add language in each country"""
                 for country in countries:
                     country.languages.set(
-                        (languages[country_language[country.name]], ))
+                        (country_language[country.name], ))
+
+            # Load data from CSV
+            importer = CSVImporter(model=Country)
+            importer.import_file(file=request.FILES['csv_file'].file,
+                                 encoding=request.POST['encoding'],
+                                 delimiter=request.POST['delimiter'],
+                                 create_object=create_country,
+                                 after_save=set_languages)
+            importer.message_user(self, request)
             return redirect('..')
         return render(request,
                       'utility/import_csv/form.html',
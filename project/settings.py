@@ -169,6 +169,27 @@ ADMIN_URL = 'admin/'
 
 WORK_URL = 'work/'
 
+# Render the PDF reports using background jobs
+REPORT_JOBS_ENABLED = True
+# Seconds to wait before checking again the report jobs
+REPORT_JOBS_POLL_INTERVAL = 5
+# Days to keep the report jobs and their results
+REPORT_JOBS_MAX_AGE = 7
+# Seconds before failing the running report jobs of the interrupted workers
+REPORT_JOBS_TIMEOUT = 3600
+# Directory for the report jobs results, outside of the public MEDIA_ROOT
+REPORT_JOBS_PATH = os.path.join(BASE_DIR, 'reports')
+# Cache the rendered reports until their data changes
+REPORT_CACHE_ENABLED = True
+# Directory for the cached reports
+REPORT_CACHE_PATH = os.path.join(BASE_DIR, 'reports_cache')
+# Maximum size in bytes for the cached reports
+REPORT_CACHE_MAX_SIZE = 500 * 1024 * 1024
+# Processes for rendering the PDF reports sections, 0 to use every CPU
+XHTML2PDF_PROCESSES = 0
+# Sections rendered by each process before replacing it
+XHTML2PDF_SECTIONS_PER_PROCESS = 20
+
 EXPLORER_URL = 'admin/explorer/'
 EXPLORER_CONNECTIONS = {'default': 'default'}
 EXPLORER_DEFAULT_CONNECTION = 'default'
@@ -177,6 +198,33 @@ LOGIN_REDIRECT_URL = '/'
 
 API_URL = 'api/'
 
+# API logs are written in batches from a background thread
+API_LOG_ASYNC = True
+# Maximum number of API logs waiting to be written
+API_LOG_BUFFER_SIZE = 10000
+# Number of API logs written in a single query
+API_LOG_BATCH_SIZE = 100
+# Maximum seconds to wait before writing the pending API logs
+API_LOG_FLUSH_INTERVAL = 2.0
+# Action for a full buffer: block, drop_newest, drop_oldest or sync
+API_LOG_OVERFLOW_POLICY = 'drop_oldest'
+# Seconds to keep the tablets authentication data in cache
+API_TABLET_AUTH_CACHE_TIMEOUT = 60
+# Seconds to keep the v1/get responses in cache
+API_GET_CACHE_TIMEOUT = 3600
+# Maximum days for the v1/changes cursors before requiring a full reload
+API_CHANGES_MAX_AGE = 7
+# Minimum size in bytes for compressing the API responses
+API_COMPRESSION_MIN_SIZE = 1024
+# Seconds to keep the API commands in memory
+API_COMMANDS_CACHE_TIMEOUT = 300
+# Maximum seconds for the API caches above when the default cache is local
+# to each process (LocMemCache), as its invalidations are not seen by the
+# other processes; configure a shared CACHES backend for multiple processes
+API_LOCAL_CACHE_TIMEOUT = 10
+# Seconds to wait before saving the API commands uses
+API_COMMANDS_USES_FLUSH_INTERVAL = 30
+
 # Sessions
 SESSION_COOKIE_AGE = 20 * 60
 SESSION_SAVE_EVERY_REQUEST = True
@@ -19,3 +19,4 @@
 ##
 
 from .exportcsv_mixin import ExportCSVMixin                       # noqa: F401
+from .exportxlsx_mixin import ExportXLSXMixin                     # noqa: F401
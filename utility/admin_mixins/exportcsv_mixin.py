@@ -19,14 +19,21 @@
 ##
 
 import csv
-import operator
+import io
 
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.utils.translation import pgettext_lazy
 
+from .field_accessor import FieldAccessor
+
 
 class ExportCSVMixin(object):
     export_csv_fields_map = {}
+    # Number of rows fetched from the database for each chunk
+    export_csv_chunk_size = 2000
+    # Minimum size of the CSV data sent for each chunk
+    export_csv_buffer_size = 65536
+    _export_csv_accessors = None
 
     def __init__(self):
         """Add Export rows to CSV action to the Admin model"""
@@ -35,36 +42,66 @@ class ExportCSVMixin(object):
 
     def action_export_csv(self, request, queryset):
         """Export a queryset in CSV format"""
-        data = []
-        for row in queryset:
-            item = {}
-            for key in self.export_csv_fields_map.keys():
-                field = self.export_csv_fields_map[key]
-                item[field] = (operator.attrgetter(field)(row)
-                               if not callable(operator.attrgetter(field)(row))
-                               else operator.attrgetter(field)(row)())
-            data.append(item)
         # noinspection PyProtectedMember
         return self.do_export_data_to_csv(
-            data=data,
+            data=self.iter_export_csv(queryset),
             fields_map=self.export_csv_fields_map,
             filename=self.model._meta)
     action_export_csv.short_description = pgettext_lazy(
         'Utility',
         'Export selected rows to CSV')
 
+    def get_export_csv_accessors(self):
+        """Compile the export_csv_fields_map fields in accessors"""
+        fields = tuple(self.export_csv_fields_map.values())
+        if (self._export_csv_accessors is None or
+                self._export_csv_accessors[0] != fields):
+            # Compile the accessors again after fields changes
+            self._export_csv_accessors = (
+                fields,
+                [FieldAccessor(model=self.model, field=field)
+                 for field in fields])
+        return self._export_csv_accessors[1]
+
+    def iter_export_csv(self, queryset):
+        """Iterate the queryset rows as dict items"""
+        accessors = self.get_export_csv_accessors()
+        related = set(accessor.related
+                      for accessor in accessors
+                      if accessor.related)
+        if all(accessor.lookup for accessor in accessors):
+            # Load only the exported fields
+            queryset = queryset.select_related(None).only(
+                *(accessor.lookup for accessor in accessors))
+        if related:
+            # Load the related rows for every traversed relation
+            queryset = queryset.select_related(*related)
+        for row in queryset.iterator(chunk_size=self.export_csv_chunk_size):
+            yield dict([(accessor.field, accessor.get_value(row))
+                        for accessor in accessors])
+
     def do_export_data_to_csv(self, data, fields_map, filename):
-        """Export a list of dict items in CSV format"""
-        response = HttpResponse(content_type='text/csv')
+        """Export an iterable of dict items in CSV format"""
+        response = StreamingHttpResponse(
+            self.iter_csv_data(data=data, fields_map=fields_map),
+            content_type='text/csv')
         response['Content-Disposition'] = (
             'attachment; filename={FILENAME}.csv'.format(FILENAME=filename))
+        return response
+
+    def iter_csv_data(self, data, fields_map):
+        """Iterate the CSV data in chunks while the rows are written"""
+        buffer = io.StringIO()
         # Add UTF-8 BOM
-        response.write(u'\ufeff'.encode('utf8'))
-        writer = csv.writer(response, delimiter=';')
+        buffer.write(u'\ufeff')
+        writer = csv.writer(buffer, delimiter=';')
         # Write fields names row
         writer.writerow(fields_map.keys())
         # Write record rows
         for item in data:
             writer.writerow([item[field] for field in fields_map.values()])
-
-        return response
+            if buffer.tell() >= self.export_csv_buffer_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
@@ -0,0 +1,112 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import datetime
+import decimal
+import tempfile
+
+from django.http import FileResponse
+from django.utils import timezone
+from django.utils.translation import pgettext_lazy
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+
+class ExportXLSXMixin(object):
+    # Number formats for the typed cells
+    export_xlsx_formats = {datetime.datetime: 'yyyy-mm-dd hh:mm:ss',
+                           datetime.date: 'yyyy-mm-dd',
+                           datetime.time: 'hh:mm:ss',
+                           datetime.timedelta: '[h]:mm:ss'}
+
+    def __init__(self):
+        """Add Export rows to XLSX action to the Admin model"""
+        if xlsxwriter is None:
+            # Remove every XLSX action without the XlsxWriter module
+            self.__class__.actions = tuple(action
+                                           for action in self.actions
+                                           if not action.endswith('_xlsx'))
+        elif 'action_export_xlsx' not in self.actions:
+            self.__class__.actions = ('action_export_xlsx', *self.actions)
+
+    def action_export_xlsx(self, request, queryset):
+        """Export a queryset in XLSX format"""
+        # noinspection PyProtectedMember
+        return self.do_export_data_to_xlsx(
+            data=self.iter_export_csv(queryset),
+            fields_map=self.export_csv_fields_map,
+            filename=self.model._meta)
+    action_export_xlsx.short_description = pgettext_lazy(
+        'Utility',
+        'Export selected rows to XLSX')
+
+    def do_export_data_to_xlsx(self, data, fields_map, filename):
+        """Export an iterable of dict items in XLSX format"""
+        # The rows are written to temporary files instead of the memory
+        output = tempfile.TemporaryFile()
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+        worksheet = workbook.add_worksheet()
+        formats = dict([(value_type,
+                         workbook.add_format({'num_format': value}))
+                        for value_type, value
+                        in self.export_xlsx_formats.items()])
+        # Write fields names row
+        worksheet.write_row(0, 0,
+                            [str(field) for field in fields_map.keys()],
+                            workbook.add_format({'bold': True}))
+        # Write record rows
+        fields = list(fields_map.values())
+        for row, item in enumerate(data, 1):
+            for column, field in enumerate(fields):
+                self.write_xlsx_value(worksheet, row, column, item[field],
+                                      formats)
+        workbook.close()
+        output.seek(0)
+        response = FileResponse(
+            output,
+            content_type='application/vnd.openxmlformats-officedocument.'
+                         'spreadsheetml.sheet')
+        response['Content-Disposition'] = (
+            'attachment; filename={FILENAME}.xlsx'.format(FILENAME=filename))
+        return response
+
+    def write_xlsx_value(self, worksheet, row, column, value, formats):
+        """Write a value in a typed cell"""
+        if value is None:
+            pass
+        elif isinstance(value, bool):
+            worksheet.write_boolean(row, column, value)
+        elif isinstance(value, (int, float, decimal.Decimal)):
+            worksheet.write_number(row, column, value)
+        elif isinstance(value, datetime.datetime):
+            if timezone.is_aware(value):
+                # Excel doesn't support the timezones
+                value = timezone.make_naive(value)
+            worksheet.write_datetime(row, column, value,
+                                     formats[datetime.datetime])
+        elif isinstance(value, (datetime.date,
+                                datetime.time,
+                                datetime.timedelta)):
+            worksheet.write_datetime(row, column, value, formats[type(value)])
+        else:
+            worksheet.write_string(row, column, str(value))
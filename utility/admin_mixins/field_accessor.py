@@ -0,0 +1,65 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import operator
+
+from django.core.exceptions import FieldDoesNotExist
+
+
+class FieldAccessor(object):
+    def __init__(self, model, field):
+        """Compile a dotted field path of a model in an accessor"""
+        self.field = field
+        self.getter = operator.attrgetter(field)
+        # Lookup for select_related with the traversed relations
+        self.related = None
+        # Lookup for only, available when the path ends with a field
+        self.lookup = None
+        names = field.split('.')
+        related = []
+        for index, name in enumerate(names):
+            try:
+                model_field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                model_field = None
+            if (model_field is None or not model_field.concrete or
+                    model_field.many_to_many):
+                # Method, property or reverse relation
+                break
+            elif model_field.is_relation:
+                # Forward relation, follow the related model
+                related.append(name)
+                model = model_field.related_model
+            elif index == len(names) - 1:
+                # Last path item is a regular field
+                self.lookup = '__'.join(names)
+            else:
+                break
+        if related:
+            self.related = '__'.join(related)
+        # Only methods and properties can return callable values
+        self.get_value = (self.getter
+                          if self.lookup or len(related) == len(names)
+                          else self.get_callable_value)
+
+    def get_callable_value(self, row):
+        """Get the field value, calling it if it's callable"""
+        value = self.getter(row)
+        return value() if callable(value) else value
@@ -18,6 +18,7 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 ##
 
+from .cursor import CursorConverter                               # noqa: F401
 from .isodate import IsoDateConverter, IsoDateStrConverter        # noqa: F401
 from .isotime import IsoTimeConverter, IsoTimeStrConverter        # noqa: F401
 from .otpkey import OTPKeyConverter                               # noqa: F401
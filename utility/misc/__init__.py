@@ -20,12 +20,26 @@
 
 from .admin_models import get_admin_models                        # noqa: F401
 from .admin_options import get_admin_options                      # noqa: F401
+from .csv_importer import (CSVForeignKey,                         # noqa: F401
+                           CSVImporter,                           # noqa: F401
+                           CSVImportError)                        # noqa: F401
 from .dates import month_start, month_end                         # noqa: F401
 from .get_class_from_module import get_class_from_module          # noqa: F401
 from .get_full_host import get_full_host                          # noqa: F401
+from .insert_or_get import (bulk_insert_or_ignore,                # noqa: F401
+                            insert_or_get)                        # noqa: F401
+from .on_commit_keys import on_commit_keys                        # noqa: F401
 from .qrcode_image import QRCodeImage                             # noqa: F401
+from .report_cache import (ReportCache,                           # noqa: F401
+                           cache_report,                          # noqa: F401
+                           report_cache)                          # noqa: F401
+from .report_job_storage import (ReportJobStorage,                # noqa: F401
+                                 get_report_job_path)             # noqa: F401
 from .reverse_with_query import reverse_with_query                # noqa: F401
 from .uri import URI                                              # noqa: F401
 from .xhtml2pdf import (xhtml2pdf_link_callback,                  # noqa: F401
                         xhtml2pdf_render_from_html,               # noqa: F401
-                        xhtml2pdf_render_from_template_response)  # noqa: F401
+                        xhtml2pdf_render_from_sections,           # noqa: F401
+                        xhtml2pdf_render_from_template_response,  # noqa: F401
+                        xhtml2pdf_render_from_template_sections,  # noqa: F401
+                        xhtml2pdf_render_pdf)                     # noqa: F401
@@ -0,0 +1,185 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import collections
+import csv
+import io
+import logging
+
+from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, models, router, transaction
+from django.utils.translation import pgettext_lazy
+
+from .report_cache import report_cache
+
+logger = logging.getLogger(__name__)
+
+
+class CSVImportError(Exception):
+    def __init__(self, type_name, item):
+        """Error for unexpected values in a CSV row"""
+        super().__init__(pgettext_lazy(
+            'Utility',
+            'Unexpected {TYPE} "{ITEM}"').format(TYPE=type_name,
+                                                 ITEM=item))
+
+
+class CSVForeignKey(object):
+    def __init__(self, queryset, type_name, field=None, cache_size=1000):
+        """
+        Resolve the CSV values in model objects using a bounded cache,
+        if field is None the values are compared with the objects string
+        representation, preloading every object of the queryset
+        """
+        self.queryset = queryset
+        self.type_name = type_name
+        self.field = field
+        self.cache_size = cache_size
+        self.cache = collections.OrderedDict()
+        if field is None:
+            for item in queryset:
+                self.cache[str(item)] = item
+
+    def get(self, value):
+        """Get the object for the value or raise CSVImportError"""
+        if value in self.cache:
+            # Move the value at the end of the least recently used
+            self.cache.move_to_end(value)
+            obj = self.cache[value]
+        elif self.field is None:
+            obj = None
+        else:
+            obj = self.queryset.filter(**{self.field: value}).first()
+            # Cache also the missing objects
+            self.cache[value] = obj
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        if obj is None:
+            raise CSVImportError(self.type_name, value)
+        return obj
+
+
+class CSVImporter(object):
+    def __init__(self, model, batch_size=500, ignore_conflicts=False):
+        """Import the CSV rows in transactional chunks"""
+        self.model = model
+        self.batch_size = batch_size
+        self.ignore_conflicts = ignore_conflicts
+        self.database = router.db_for_write(model)
+        # List of errors with line number and message
+        self.errors = []
+        self.rows = 0
+        self.imported = 0
+        # Number of rows skipped for conflicts with the existing rows
+        self.skipped = 0
+
+    def import_file(self, file, encoding, delimiter, create_object,
+                    after_save=None):
+        """
+        Import the rows of a CSV file, create_object returns a new object
+        for a row and after_save is called with each saved chunk
+        """
+        reader = csv.DictReader(io.TextIOWrapper(file, encoding=encoding),
+                                delimiter=delimiter)
+        chunk = []
+        for row in reader:
+            self.rows += 1
+            try:
+                chunk.append((reader.line_num, create_object(row)))
+            except (CSVImportError, ValidationError, ValueError) as error:
+                self.errors.append((reader.line_num, error))
+            if len(chunk) >= self.batch_size:
+                self.save_chunk(chunk, after_save)
+                chunk = []
+        if chunk:
+            self.save_chunk(chunk, after_save)
+
+    def save_chunk(self, chunk, after_save):
+        """Save a chunk of objects, saving each object after errors"""
+        try:
+            with transaction.atomic(using=self.database):
+                inserted = self.save_objects([obj for line, obj in chunk],
+                                             after_save)
+            self.imported += inserted
+            self.skipped += len(chunk) - inserted
+        except (DatabaseError, ValidationError, ValueError, TypeError):
+            # Save each object to find the wrong rows
+            for line, obj in chunk:
+                try:
+                    with transaction.atomic(using=self.database):
+                        inserted = self.save_objects([obj], after_save)
+                    self.imported += inserted
+                    self.skipped += 1 - inserted
+                except (DatabaseError, ValidationError, ValueError,
+                        TypeError) as error:
+                    self.errors.append((line, error))
+        logger.info('Imported %d of %d %s rows, skipped %d rows',
+                    self.imported, self.rows, self.model._meta.model_name,
+                    self.skipped)
+
+    def save_objects(self, objects, after_save):
+        """
+        Save the objects in the current transaction and return the number
+        of inserted rows
+        """
+        manager = self.model.objects.using(self.database)
+        if self.ignore_conflicts:
+            # The conflicting rows are skipped, count the newer rows instead
+            last_pk = manager.aggregate(
+                last_pk=models.Max('pk'))['last_pk'] or 0
+        manager.bulk_create(objects,
+                            batch_size=self.batch_size,
+                            ignore_conflicts=self.ignore_conflicts)
+        # The bulk inserts don't send the signals
+        report_cache.invalidate(self.model._meta.label)
+        if after_save:
+            after_save(objects)
+        return (manager.filter(pk__gt=last_pk).count()
+                if self.ignore_conflicts else len(objects))
+
+    def message_user(self, model_admin, request, max_errors=20):
+        """Report the import results using the admin messages"""
+        self.errors.sort(key=lambda item: item[0])
+        for line, error in self.errors[:max_errors]:
+            model_admin.message_user(request, pgettext_lazy(
+                'Utility',
+                'Line {LINE}: {ERROR}').format(
+                    LINE=line,
+                    ERROR=('; '.join(error.messages)
+                           if isinstance(error, ValidationError)
+                           else error)),
+                messages.ERROR)
+        if len(self.errors) > max_errors:
+            model_admin.message_user(request, pgettext_lazy(
+                'Utility',
+                '{COUNT} more rows with errors').format(
+                    COUNT=len(self.errors) - max_errors),
+                messages.ERROR)
+        if self.skipped:
+            model_admin.message_user(request, pgettext_lazy(
+                'Utility',
+                '{COUNT} existing rows skipped').format(COUNT=self.skipped),
+                messages.INFO)
+        model_admin.message_user(request, pgettext_lazy(
+            'Utility',
+            'Your CSV file has been imported: {IMPORTED} of {ROWS} '
+            'rows').format(IMPORTED=self.imported, ROWS=self.rows),
+            messages.WARNING if self.errors else messages.SUCCESS)
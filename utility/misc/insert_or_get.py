@@ -0,0 +1,63 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+from django.db import IntegrityError, connections, router, transaction
+
+from .report_cache import report_cache
+
+
+def insert_or_get(model, defaults=None, **kwargs):
+    """
+    Insert a new object or get the existing object in case of conflicts
+    on the unique fields, return a tuple with the object and a boolean
+    value to identify a newly created object
+    """
+    database = router.db_for_write(model)
+    obj = model(**kwargs, **(defaults or {}))
+    created = False
+    try:
+        # Use a savepoint to recover from the failed insert
+        with transaction.atomic(using=database):
+            obj.save(force_insert=True, using=database)
+            created = True
+    except IntegrityError:
+        if created:
+            # The error was raised after the insert by the commit callbacks
+            raise
+        return model.objects.using(database).get(**kwargs), False
+    return obj, True
+
+
+def bulk_insert_or_ignore(model, objects):
+    """Insert the objects ignoring the conflicts on the unique fields"""
+    database = router.db_for_write(model)
+    if connections[database].features.supports_ignore_conflicts:
+        model.objects.using(database).bulk_create(objects,
+                                                  ignore_conflicts=True)
+        # The bulk inserts don't send the signals
+        report_cache.invalidate(model._meta.label)
+    else:
+        # Insert each object using a savepoint to skip the existing ones
+        for obj in objects:
+            try:
+                with transaction.atomic(using=database):
+                    obj.save(force_insert=True, using=database)
+            except IntegrityError:
+                pass
@@ -0,0 +1,53 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import logging
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, transaction
+
+logger = logging.getLogger(__name__)
+# Keys waiting for each function and database in the current thread
+pending_keys = threading.local()
+
+
+def on_commit_keys(function, keys, using=None):
+    """
+    Collect the keys and call function with all of them after the current
+    transaction is committed, the errors are logged without raising them
+    after the data was already committed
+    """
+    if not hasattr(pending_keys, 'functions'):
+        pending_keys.functions = {}
+    name = (using or DEFAULT_DB_ALIAS, function)
+    pending_keys.functions.setdefault(name, set()).update(keys)
+
+    def callback():
+        # The first committed callback takes every collected key, the
+        # keys of the rolled back transactions are only computed again
+        keys = pending_keys.functions.pop(name, None)
+        if keys:
+            try:
+                function(keys)
+            except DatabaseError:
+                logger.exception('Unable to process %d keys for %r',
+                                 len(keys), function)
+
+    transaction.on_commit(callback, using)
@@ -0,0 +1,197 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import functools
+import hashlib
+import json
+import os
+import os.path
+import uuid
+
+from django.conf import settings
+from django.db import models
+from django.db.models.query import QuerySet
+from django.http import FileResponse
+from django.utils import translation
+
+from .admin_options import get_admin_options
+
+
+class ReportCache(object):
+    def __init__(self, path, max_size):
+        """Cache the rendered reports on disk using their content hash"""
+        self.path = path
+        self.max_size = max_size
+
+    def get_filename(self, key, extension):
+        """Return the cache file name for a key"""
+        return os.path.join(self.path, '{KEY}.{EXTENSION}'.format(
+            KEY=key, EXTENSION=extension))
+
+    def get_version(self, label):
+        """
+        Get the data version stamp of a model, the bulk changes without
+        signals must call invalidate
+        """
+        try:
+            with open(self.get_filename(label, 'version')) as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def invalidate(self, label):
+        """Change the data version stamp of a model"""
+        os.makedirs(self.path, exist_ok=True)
+        filename = self.get_filename(label, 'version')
+        with open(filename + '.tmp', 'w') as file:
+            file.write(uuid.uuid4().hex)
+        os.replace(filename + '.tmp', filename)
+
+    def get_key(self, *values):
+        """Get the hash key for the values"""
+        return hashlib.sha256(json.dumps(values,
+                                         default=str,
+                                         sort_keys=True).encode(
+                                             'utf-8')).hexdigest()
+
+    def get_response(self, key):
+        """Get a cached response"""
+        filename = self.get_filename(key, 'data')
+        try:
+            with open(self.get_filename(key, 'json')) as file:
+                headers = json.load(file)
+            response = FileResponse(open(filename, 'rb'),
+                                    content_type=headers['Content-Type'])
+        except FileNotFoundError:
+            return None
+        for header, value in headers.items():
+            response[header] = value
+        # Update the last used time
+        os.utime(filename)
+        return response
+
+    def set_response(self, key, response):
+        """Save a response in the cache and return it"""
+        os.makedirs(self.path, exist_ok=True)
+        headers = dict((header, response[header])
+                       for header in ('Content-Type', 'Content-Disposition')
+                       if response.has_header(header))
+        if response.streaming:
+            # Write the streaming content while it's sent
+            response.streaming_content = self.write_chunks(
+                key, headers, response.streaming_content)
+        else:
+            for _ in self.write_chunks(key, headers, (response.content, )):
+                pass
+        return response
+
+    def write_chunks(self, key, headers, content):
+        """Write the content chunks and the headers, yielding each chunk"""
+        filename = self.get_filename(key, 'data')
+        temporary_filename = '{FILENAME}.{ID}.tmp'.format(
+            FILENAME=filename, ID=uuid.uuid4().hex)
+        try:
+            with open(temporary_filename, 'wb') as file:
+                for chunk in content:
+                    file.write(chunk)
+                    yield chunk
+            with open(self.get_filename(key, 'json'), 'w') as file:
+                json.dump(headers, file)
+            os.replace(temporary_filename, filename)
+        finally:
+            # Remove the partial files for interrupted responses
+            if os.path.exists(temporary_filename):
+                os.unlink(temporary_filename)
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used reports over the maximum size"""
+        files = []
+        total_size = 0
+        for entry in os.scandir(self.path):
+            if entry.name.endswith('.data'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+        for _, size, filename in sorted(files):
+            if total_size <= self.max_size:
+                break
+            for extension in ('data', 'json'):
+                try:
+                    os.unlink('{FILENAME}.{EXTENSION}'.format(
+                        FILENAME=filename[:-5], EXTENSION=extension))
+                except FileNotFoundError:
+                    pass
+            total_size -= size
+
+
+report_cache = ReportCache(path=settings.REPORT_CACHE_PATH,
+                           max_size=settings.REPORT_CACHE_MAX_SIZE)
+
+
+def cache_report(*labels):
+    """
+    Cache the ModelAdmin method responses until the data of the models
+    changes
+    """
+    def invalidate_report_cache(sender, **kwargs):
+        """Change the data version stamp after the models changes"""
+        report_cache.invalidate(sender._meta.label)
+
+    for label in labels:
+        for signal in (models.signals.post_save, models.signals.post_delete):
+            signal.connect(invalidate_report_cache,
+                           sender=label,
+                           weak=False,
+                           dispatch_uid='report_cache.{LABEL}'.format(
+                               LABEL=label))
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(model_admin, request, *args, **kwargs):
+            if not settings.REPORT_CACHE_ENABLED:
+                return method(model_admin, request, *args, **kwargs)
+            key = report_cache.get_key(
+                model_admin.model._meta.label,
+                method.__name__,
+                # Selected objects for the admin actions
+                [sorted(arg.values_list('pk', flat=True))
+                 if isinstance(arg, QuerySet) else arg
+                 for arg in args],
+                # Arguments from the URL patterns
+                kwargs,
+                get_admin_options(model_admin.__class__.__name__,
+                                  method.__name__),
+                [report_cache.get_version(label) for label in labels],
+                translation.get_language(),
+                request.user.pk)
+            response = report_cache.get_response(key)
+            if response is None:
+                response = method(model_admin, request, *args, **kwargs)
+                if hasattr(response, 'render'):
+                    response.render()
+                messages = getattr(request, '_messages', None)
+                # Skip redirects, errors and pages showing the messages
+                if (response.status_code == 200 and
+                        not getattr(messages, 'used', False)):
+                    response = report_cache.set_response(key, response)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,46 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import os.path
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.functional import cached_property
+
+
+class ReportJobStorage(FileSystemStorage):
+    @cached_property
+    def base_location(self):
+        """Save the report jobs results outside the public media files"""
+        return self._value_or_setting(self._location,
+                                      settings.REPORT_JOBS_PATH)
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == 'REPORT_JOBS_PATH':
+            self.__dict__.pop('base_location', None)
+            self.__dict__.pop('location', None)
+
+
+def get_report_job_path(instance, filename):
+    """Return a random file name for the report job result"""
+    return '{NAME}{EXTENSION}'.format(NAME=uuid.uuid4().hex,
+                                      EXTENSION=os.path.splitext(filename)[1])
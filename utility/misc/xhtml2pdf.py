@@ -19,13 +19,16 @@
 ##
 
 import io
+import multiprocessing
 import os.path
 
 from django.conf import settings
 from django.http import HttpResponse
+from django.template.response import TemplateResponse
 from django.utils.translation import pgettext_lazy
 
 from xhtml2pdf import pisa
+from xhtml2pdf.pdf import pisaPDF
 
 
 def xhtml2pdf_link_callback(uri, rel):
@@ -78,3 +81,47 @@ def xhtml2pdf_render_from_template_response(response, filename):
     return xhtml2pdf_render_from_html(
         html=response.render().content.decode('utf-8'),
         filename=filename)
+
+
+def xhtml2pdf_render_pdf(html):
+    """
+    Convert a HTML text in PDF data
+    """
+    output = io.BytesIO()
+    pisa.CreatePDF(src=io.StringIO(html),
+                   dest=output,
+                   link_callback=xhtml2pdf_link_callback)
+    return output.getvalue()
+
+
+def xhtml2pdf_render_from_sections(htmls, filename):
+    """
+    Convert multiple HTML texts in PDF using a pool of processes and join
+    the resulting documents
+    """
+    response = HttpResponse(content_type='application/pdf')
+    if filename:
+        response['Content-Disposition'] = ('attachment; filename="%s"' %
+                                           filename)
+    document = pisaPDF()
+    with multiprocessing.Pool(
+            processes=settings.XHTML2PDF_PROCESSES or None,
+            maxtasksperchild=settings.XHTML2PDF_SECTIONS_PER_PROCESS) as pool:
+        for data in pool.imap(xhtml2pdf_render_pdf, htmls):
+            document.addFromString(data)
+    response.write(document.getvalue())
+    return response
+
+
+def xhtml2pdf_render_from_template_sections(request, template, context,
+                                            sections, filename):
+    """
+    Convert a template in PDF rendering a section for each context update
+    """
+    return xhtml2pdf_render_from_sections(
+        htmls=[TemplateResponse(request,
+                                template,
+                                dict(context, **section)).render(
+                                    ).content.decode('utf-8')
+               for section in sections],
+        filename=filename)
@@ -21,7 +21,7 @@
 from django.contrib import admin
 from django.db import models
 
-from utility.admin_mixins import ExportCSVMixin
+from utility.admin_mixins import ExportCSVMixin, ExportXLSXMixin
 
 
 class BaseModel(models.Model):
@@ -34,7 +34,7 @@ class BaseModel(models.Model):
         abstract = True
 
 
-class BaseModelAdmin(admin.ModelAdmin, ExportCSVMixin):
+class BaseModelAdmin(admin.ModelAdmin, ExportCSVMixin, ExportXLSXMixin):
 
     def __init__(self, model, admin_site):
         """Base Admin model for each other model in the application"""
@@ -42,5 +42,7 @@ class BaseModelAdmin(admin.ModelAdmin, ExportCSVMixin):
         # If ModelAdmin ordering is missing apply the ordering of the model
         if not self.ordering:
             self.ordering = model._meta.ordering
+        # Add Export rows to XLSX action
+        ExportXLSXMixin.__init__(self)
         # Add Export rows to CSV action
         ExportCSVMixin.__init__(self)
@@ -0,0 +1,82 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import os
+import shutil
+import tempfile
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import SimpleTestCase
+
+from utility.misc import ReportCache
+
+
+class ReportCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        self.cache = ReportCache(path=self.path, max_size=1000)
+
+    def test_version(self):
+        self.assertIsNone(self.cache.get_version('work.Activity'))
+        self.cache.invalidate('work.Activity')
+        version = self.cache.get_version('work.Activity')
+        self.assertIsNotNone(version)
+        self.cache.invalidate('work.Activity')
+        self.assertNotEqual(self.cache.get_version('work.Activity'), version)
+
+    def test_response(self):
+        key = self.cache.get_key('report', [1, 2])
+        self.assertEqual(key, self.cache.get_key('report', [1, 2]))
+        self.assertNotEqual(key, self.cache.get_key('report', [1, 3]))
+        self.assertIsNone(self.cache.get_response(key))
+        response = HttpResponse(b'data', content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename=report.csv'
+        self.cache.set_response(key, response)
+        response = self.cache.get_response(key)
+        self.assertEqual(b''.join(response.streaming_content), b'data')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'],
+                         'attachment; filename=report.csv')
+
+    def test_streaming_response(self):
+        key = self.cache.get_key('report')
+        response = self.cache.set_response(key, StreamingHttpResponse(
+            iter((b'first', b'second')), content_type='text/csv'))
+        # The response is saved only after the whole content is sent
+        self.assertIsNone(self.cache.get_response(key))
+        self.assertEqual(b''.join(response.streaming_content),
+                         b'firstsecond')
+        response = self.cache.get_response(key)
+        self.assertEqual(b''.join(response.streaming_content),
+                         b'firstsecond')
+
+    def test_evict(self):
+        keys = [self.cache.get_key(index) for index in range(3)]
+        for index, key in enumerate(keys):
+            self.cache.set_response(key, HttpResponse(b'x' * 40))
+            # Set a distinct last used time for each report
+            os.utime(self.cache.get_filename(key, 'data'), (index, index))
+        self.cache.max_size = 100
+        self.cache.evict()
+        # The least recently used reports exceeding the size are removed
+        self.assertIsNone(self.cache.get_response(keys[0]))
+        self.assertIsNotNone(self.cache.get_response(keys[1]))
+        self.assertIsNotNone(self.cache.get_response(keys[2]))
@@ -0,0 +1,43 @@
+# Generated by Django 2.2.10 on 2026-10-18 09:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0047_api_change'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='adminexportcsvmap',
+            name='model',
+            field=models.CharField(choices=[('ActivityAdmin', 'ActivityAdmin'), ('ActivityInLinesAdmin', 'ActivityInLinesAdmin'), ('ActivityRoomAdmin', 'ActivityRoomAdmin'), ('AdminExportCSVMapAdmin', 'AdminExportCSVMapAdmin'), ('AdminListDisplayAdmin', 'AdminListDisplayAdmin'), ('AdminListDisplayLinkAdmin', 'AdminListDisplayLinkAdmin'), ('AdminListFilterAdmin', 'AdminListFilterAdmin'), ('AdminOptionAdmin', 'AdminOptionAdmin'), ('AdminSearchableAdmin', 'AdminSearchableAdmin'), ('ApiChangeAdmin', 'ApiChangeAdmin'), ('ApiCommandAdmin', 'ApiCommandAdmin'), ('ApiCommandTypeAdmin', 'ApiCommandTypeAdmin'), ('ApiContextTypeAdmin', 'ApiContextTypeAdmin'), ('ApiLogAdmin', 'ApiLogAdmin'), ('BedTypeAdmin', 'BedTypeAdmin'), ('BrandAdmin', 'BrandAdmin'), ('BuildingAdmin', 'BuildingAdmin'), ('CompanyAdmin', 'CompanyAdmin'), ('ContinentAdmin', 'ContinentAdmin'), ('ContractAdmin', 'ContractAdmin'), ('ContractTypeAdmin', 'ContractTypeAdmin'), ('CountryAdmin', 'CountryAdmin'), ('EmployeeAdmin', 'EmployeeAdmin'), ('EquipmentAdmin', 'EquipmentAdmin'), ('EquipmentDetailAdmin', 'EquipmentDetailAdmin'), ('EquipmentDirectionAdmin', 'EquipmentDirectionAdmin'), ('EquipmentItemAdmin', 'EquipmentItemAdmin'), ('EquipmentTypeAdmin', 'EquipmentTypeAdmin'), ('HomeSectionAdmin', 'HomeSectionAdmin'), ('JobTypeAdmin', 'JobTypeAdmin'), ('LanguageAdmin', 'LanguageAdmin'), ('LocationAdmin', 'LocationAdmin'), ('LoginAdmin', 'LoginAdmin'), ('PositionAdmin', 'PositionAdmin'), ('RegionAdmin', 'RegionAdmin'), ('RegionAliasAdmin', 'RegionAliasAdmin'), ('ReportJobAdmin', 'ReportJobAdmin'), ('RoomAdmin', 'RoomAdmin'), ('RoomTypeAdmin', 'RoomTypeAdmin'), ('ServiceAdmin', 'ServiceAdmin'), ('ServiceExtraAdmin', 'ServiceExtraAdmin'), ('ServiceTypeAdmin', 'ServiceTypeAdmin'), ('StructureAdmin', 'StructureAdmin'), ('TabletAdmin', 'TabletAdmin'), ('TimestampAdmin', 'TimestampAdmin'), ('TimestampDirectionAdmin', 'TimestampDirectionAdmin')], max_length=255, verbose_name='model'),
+        ),
+        migrations.AlterField(
+            model_name='adminlistdisplay',
+            name='model',
+            field=models.CharField(choices=[('ActivityAdmin', 'ActivityAdmin'), ('ActivityInLinesAdmin', 'ActivityInLinesAdmin'), ('ActivityRoomAdmin', 'ActivityRoomAdmin'), ('AdminExportCSVMapAdmin', 'AdminExportCSVMapAdmin'), ('AdminListDisplayAdmin', 'AdminListDisplayAdmin'), ('AdminListDisplayLinkAdmin', 'AdminListDisplayLinkAdmin'), ('AdminListFilterAdmin', 'AdminListFilterAdmin'), ('AdminOptionAdmin', 'AdminOptionAdmin'), ('AdminSearchableAdmin', 'AdminSearchableAdmin'), ('ApiChangeAdmin', 'ApiChangeAdmin'), ('ApiCommandAdmin', 'ApiCommandAdmin'), ('ApiCommandTypeAdmin', 'ApiCommandTypeAdmin'), ('ApiContextTypeAdmin', 'ApiContextTypeAdmin'), ('ApiLogAdmin', 'ApiLogAdmin'), ('BedTypeAdmin', 'BedTypeAdmin'), ('BrandAdmin', 'BrandAdmin'), ('BuildingAdmin', 'BuildingAdmin'), ('CompanyAdmin', 'CompanyAdmin'), ('ContinentAdmin', 'ContinentAdmin'), ('ContractAdmin', 'ContractAdmin'), ('ContractTypeAdmin', 'ContractTypeAdmin'), ('CountryAdmin', 'CountryAdmin'), ('EmployeeAdmin', 'EmployeeAdmin'), ('EquipmentAdmin', 'EquipmentAdmin'), ('EquipmentDetailAdmin', 'EquipmentDetailAdmin'), ('EquipmentDirectionAdmin', 'EquipmentDirectionAdmin'), ('EquipmentItemAdmin', 'EquipmentItemAdmin'), ('EquipmentTypeAdmin', 'EquipmentTypeAdmin'), ('HomeSectionAdmin', 'HomeSectionAdmin'), ('JobTypeAdmin', 'JobTypeAdmin'), ('LanguageAdmin', 'LanguageAdmin'), ('LocationAdmin', 'LocationAdmin'), ('LoginAdmin', 'LoginAdmin'), ('PositionAdmin', 'PositionAdmin'), ('RegionAdmin', 'RegionAdmin'), ('RegionAliasAdmin', 'RegionAliasAdmin'), ('ReportJobAdmin', 'ReportJobAdmin'), ('RoomAdmin', 'RoomAdmin'), ('RoomTypeAdmin', 'RoomTypeAdmin'), ('ServiceAdmin', 'ServiceAdmin'), ('ServiceExtraAdmin', 'ServiceExtraAdmin'), ('ServiceTypeAdmin', 'ServiceTypeAdmin'), ('StructureAdmin', 'StructureAdmin'), ('TabletAdmin', 'TabletAdmin'), ('TimestampAdmin', 'TimestampAdmin'), ('TimestampDirectionAdmin', 'TimestampDirectionAdmin')], max_length=255, verbose_name='model'),
+        ),
+        migrations.AlterField(
+            model_name='adminlistdisplaylink',
+            name='model',
+            field=models.CharField(choices=[('ActivityAdmin', 'ActivityAdmin'), ('ActivityInLinesAdmin', 'ActivityInLinesAdmin'), ('ActivityRoomAdmin', 'ActivityRoomAdmin'), ('AdminExportCSVMapAdmin', 'AdminExportCSVMapAdmin'), ('AdminListDisplayAdmin', 'AdminListDisplayAdmin'), ('AdminListDisplayLinkAdmin', 'AdminListDisplayLinkAdmin'), ('AdminListFilterAdmin', 'AdminListFilterAdmin'), ('AdminOptionAdmin', 'AdminOptionAdmin'), ('AdminSearchableAdmin', 'AdminSearchableAdmin'), ('ApiChangeAdmin', 'ApiChangeAdmin'), ('ApiCommandAdmin', 'ApiCommandAdmin'), ('ApiCommandTypeAdmin', 'ApiCommandTypeAdmin'), ('ApiContextTypeAdmin', 'ApiContextTypeAdmin'), ('ApiLogAdmin', 'ApiLogAdmin'), ('BedTypeAdmin', 'BedTypeAdmin'), ('BrandAdmin', 'BrandAdmin'), ('BuildingAdmin', 'BuildingAdmin'), ('CompanyAdmin', 'CompanyAdmin'), ('ContinentAdmin', 'ContinentAdmin'), ('ContractAdmin', 'ContractAdmin'), ('ContractTypeAdmin', 'ContractTypeAdmin'), ('CountryAdmin', 'CountryAdmin'), ('EmployeeAdmin', 'EmployeeAdmin'), ('EquipmentAdmin', 'EquipmentAdmin'), ('EquipmentDetailAdmin', 'EquipmentDetailAdmin'), ('EquipmentDirectionAdmin', 'EquipmentDirectionAdmin'), ('EquipmentItemAdmin', 'EquipmentItemAdmin'), ('EquipmentTypeAdmin', 'EquipmentTypeAdmin'), ('HomeSectionAdmin', 'HomeSectionAdmin'), ('JobTypeAdmin', 'JobTypeAdmin'), ('LanguageAdmin', 'LanguageAdmin'), ('LocationAdmin', 'LocationAdmin'), ('LoginAdmin', 'LoginAdmin'), ('PositionAdmin', 'PositionAdmin'), ('RegionAdmin', 'RegionAdmin'), ('RegionAliasAdmin', 'RegionAliasAdmin'), ('ReportJobAdmin', 'ReportJobAdmin'), ('RoomAdmin', 'RoomAdmin'), ('RoomTypeAdmin', 'RoomTypeAdmin'), ('ServiceAdmin', 'ServiceAdmin'), ('ServiceExtraAdmin', 'ServiceExtraAdmin'), ('ServiceTypeAdmin', 'ServiceTypeAdmin'), ('StructureAdmin', 'StructureAdmin'), ('TabletAdmin', 'TabletAdmin'), ('TimestampAdmin', 'TimestampAdmin'), ('TimestampDirectionAdmin', 'TimestampDirectionAdmin')], max_length=255, verbose_name='model'),
+        ),
+        migrations.AlterField(
+            model_name='adminlistfilter',
+            name='model',
+            field=models.CharField(choices=[('ActivityAdmin', 'ActivityAdmin'), ('ActivityInLinesAdmin', 'ActivityInLinesAdmin'), ('ActivityRoomAdmin', 'ActivityRoomAdmin'), ('AdminExportCSVMapAdmin', 'AdminExportCSVMapAdmin'), ('AdminListDisplayAdmin', 'AdminListDisplayAdmin'), ('AdminListDisplayLinkAdmin', 'AdminListDisplayLinkAdmin'), ('AdminListFilterAdmin', 'AdminListFilterAdmin'), ('AdminOptionAdmin', 'AdminOptionAdmin'), ('AdminSearchableAdmin', 'AdminSearchableAdmin'), ('ApiChangeAdmin', 'ApiChangeAdmin'), ('ApiCommandAdmin', 'ApiCommandAdmin'), ('ApiCommandTypeAdmin', 'ApiCommandTypeAdmin'), ('ApiContextTypeAdmin', 'ApiContextTypeAdmin'), ('ApiLogAdmin', 'ApiLogAdmin'), ('BedTypeAdmin', 'BedTypeAdmin'), ('BrandAdmin', 'BrandAdmin'), ('BuildingAdmin', 'BuildingAdmin'), ('CompanyAdmin', 'CompanyAdmin'), ('ContinentAdmin', 'ContinentAdmin'), ('ContractAdmin', 'ContractAdmin'), ('ContractTypeAdmin', 'ContractTypeAdmin'), ('CountryAdmin', 'CountryAdmin'), ('EmployeeAdmin', 'EmployeeAdmin'), ('EquipmentAdmin', 'EquipmentAdmin'), ('EquipmentDetailAdmin', 'EquipmentDetailAdmin'), ('EquipmentDirectionAdmin', 'EquipmentDirectionAdmin'), ('EquipmentItemAdmin', 'EquipmentItemAdmin'), ('EquipmentTypeAdmin', 'EquipmentTypeAdmin'), ('HomeSectionAdmin', 'HomeSectionAdmin'), ('JobTypeAdmin', 'JobTypeAdmin'), ('LanguageAdmin', 'LanguageAdmin'), ('LocationAdmin', 'LocationAdmin'), ('LoginAdmin', 'LoginAdmin'), ('PositionAdmin', 'PositionAdmin'), ('RegionAdmin', 'RegionAdmin'), ('RegionAliasAdmin', 'RegionAliasAdmin'), ('ReportJobAdmin', 'ReportJobAdmin'), ('RoomAdmin', 'RoomAdmin'), ('RoomTypeAdmin', 'RoomTypeAdmin'), ('ServiceAdmin', 'ServiceAdmin'), ('ServiceExtraAdmin', 'ServiceExtraAdmin'), ('ServiceTypeAdmin', 'ServiceTypeAdmin'), ('StructureAdmin', 'StructureAdmin'), ('TabletAdmin', 'TabletAdmin'), ('TimestampAdmin', 'TimestampAdmin'), ('TimestampDirectionAdmin', 'TimestampDirectionAdmin')], max_length=255, verbose_name='model'),
+        ),
+        migrations.AlterField(
+            model_name='adminsearchable',
+            name='model',
+            field=models.CharField(choices=[('ActivityAdmin', 'ActivityAdmin'), ('ActivityInLinesAdmin', 'ActivityInLinesAdmin'), ('ActivityRoomAdmin', 'ActivityRoomAdmin'), ('AdminExportCSVMapAdmin', 'AdminExportCSVMapAdmin'), ('AdminListDisplayAdmin', 'AdminListDisplayAdmin'), ('AdminListDisplayLinkAdmin', 'AdminListDisplayLinkAdmin'), ('AdminListFilterAdmin', 'AdminListFilterAdmin'), ('AdminOptionAdmin', 'AdminOptionAdmin'), ('AdminSearchableAdmin', 'AdminSearchableAdmin'), ('ApiChangeAdmin', 'ApiChangeAdmin'), ('ApiCommandAdmin', 'ApiCommandAdmin'), ('ApiCommandTypeAdmin', 'ApiCommandTypeAdmin'), ('ApiContextTypeAdmin', 'ApiContextTypeAdmin'), ('ApiLogAdmin', 'ApiLogAdmin'), ('BedTypeAdmin', 'BedTypeAdmin'), ('BrandAdmin', 'BrandAdmin'), ('BuildingAdmin', 'BuildingAdmin'), ('CompanyAdmin', 'CompanyAdmin'), ('ContinentAdmin', 'ContinentAdmin'), ('ContractAdmin', 'ContractAdmin'), ('ContractTypeAdmin', 'ContractTypeAdmin'), ('CountryAdmin', 'CountryAdmin'), ('EmployeeAdmin', 'EmployeeAdmin'), ('EquipmentAdmin', 'EquipmentAdmin'), ('EquipmentDetailAdmin', 'EquipmentDetailAdmin'), ('EquipmentDirectionAdmin', 'EquipmentDirectionAdmin'), ('EquipmentItemAdmin', 'EquipmentItemAdmin'), ('EquipmentTypeAdmin', 'EquipmentTypeAdmin'), ('HomeSectionAdmin', 'HomeSectionAdmin'), ('JobTypeAdmin', 'JobTypeAdmin'), ('LanguageAdmin', 'LanguageAdmin'), ('LocationAdmin', 'LocationAdmin'), ('LoginAdmin', 'LoginAdmin'), ('PositionAdmin', 'PositionAdmin'), ('RegionAdmin', 'RegionAdmin'), ('RegionAliasAdmin', 'RegionAliasAdmin'), ('ReportJobAdmin', 'ReportJobAdmin'), ('RoomAdmin', 'RoomAdmin'), ('RoomTypeAdmin', 'RoomTypeAdmin'), ('ServiceAdmin', 'ServiceAdmin'), ('ServiceExtraAdmin', 'ServiceExtraAdmin'), ('ServiceTypeAdmin', 'ServiceTypeAdmin'), ('StructureAdmin', 'StructureAdmin'), ('TabletAdmin', 'TabletAdmin'), ('TimestampAdmin', 'TimestampAdmin'), ('TimestampDirectionAdmin', 'TimestampDirectionAdmin')], max_length=255, verbose_name='model'),
+        ),
+        migrations.AlterField(
+            model_name='adminsearchable',
+            name='ref_model',
+            field=models.CharField(choices=[('ActivityAdmin', 'ActivityAdmin'), ('ActivityInLinesAdmin', 'ActivityInLinesAdmin'), ('ActivityRoomAdmin', 'ActivityRoomAdmin'), ('AdminExportCSVMapAdmin', 'AdminExportCSVMapAdmin'), ('AdminListDisplayAdmin', 'AdminListDisplayAdmin'), ('AdminListDisplayLinkAdmin', 'AdminListDisplayLinkAdmin'), ('AdminListFilterAdmin', 'AdminListFilterAdmin'), ('AdminOptionAdmin', 'AdminOptionAdmin'), ('AdminSearchableAdmin', 'AdminSearchableAdmin'), ('ApiChangeAdmin', 'ApiChangeAdmin'), ('ApiCommandAdmin', 'ApiCommandAdmin'), ('ApiCommandTypeAdmin', 'ApiCommandTypeAdmin'), ('ApiContextTypeAdmin', 'ApiContextTypeAdmin'), ('ApiLogAdmin', 'ApiLogAdmin'), ('BedTypeAdmin', 'BedTypeAdmin'), ('BrandAdmin', 'BrandAdmin'), ('BuildingAdmin', 'BuildingAdmin'), ('CompanyAdmin', 'CompanyAdmin'), ('ContinentAdmin', 'ContinentAdmin'), ('ContractAdmin', 'ContractAdmin'), ('ContractTypeAdmin', 'ContractTypeAdmin'), ('CountryAdmin', 'CountryAdmin'), ('EmployeeAdmin', 'EmployeeAdmin'), ('EquipmentAdmin', 'EquipmentAdmin'), ('EquipmentDetailAdmin', 'EquipmentDetailAdmin'), ('EquipmentDirectionAdmin', 'EquipmentDirectionAdmin'), ('EquipmentItemAdmin', 'EquipmentItemAdmin'), ('EquipmentTypeAdmin', 'EquipmentTypeAdmin'), ('HomeSectionAdmin', 'HomeSectionAdmin'), ('JobTypeAdmin', 'JobTypeAdmin'), ('LanguageAdmin', 'LanguageAdmin'), ('LocationAdmin', 'LocationAdmin'), ('LoginAdmin', 'LoginAdmin'), ('PositionAdmin', 'PositionAdmin'), ('RegionAdmin', 'RegionAdmin'), ('RegionAliasAdmin', 'RegionAliasAdmin'), ('ReportJobAdmin', 'ReportJobAdmin'), ('RoomAdmin', 'RoomAdmin'), ('RoomTypeAdmin', 'RoomTypeAdmin'), ('ServiceAdmin', 'ServiceAdmin'), ('ServiceExtraAdmin', 'ServiceExtraAdmin'), ('ServiceTypeAdmin', 'ServiceTypeAdmin'), ('StructureAdmin', 'StructureAdmin'), ('TabletAdmin', 'TabletAdmin'), ('TimestampAdmin', 'TimestampAdmin'), ('TimestampDirectionAdmin', 'TimestampDirectionAdmin')], max_length=255, verbose_name='referenced model'),
+        ),
+    ]
@@ -23,13 +23,16 @@ from django.contrib import admin
 from .models import (Activity, ActivityAdmin,
                      ActivityInLinesProxy, ActivityInLinesAdmin,
                      ActivityRoom, ActivityRoomAdmin,
+                     ActivityStat, ActivityStatAdmin,
                      Contract, ContractAdmin,
                      ContractType, ContractTypeAdmin,
                      Employee, EmployeeAdmin,
                      JobType, JobTypeAdmin,
                      Login, LoginAdmin,
+                     ReportJob, ReportJobAdmin,
                      Tablet, TabletAdmin,
                      Timestamp, TimestampAdmin,
+                     TimestampDay, TimestampDayAdmin,
                      TimestampDirection, TimestampDirectionAdmin)
 
 
@@ -37,11 +40,14 @@ from .models import (Activity, ActivityAdmin,
 admin.site.register(Activity, ActivityAdmin)
 admin.site.register(ActivityInLinesProxy, ActivityInLinesAdmin)
 admin.site.register(ActivityRoom, ActivityRoomAdmin)
+admin.site.register(ActivityStat, ActivityStatAdmin)
 admin.site.register(Contract, ContractAdmin)
 admin.site.register(ContractType, ContractTypeAdmin)
 admin.site.register(Employee, EmployeeAdmin)
 admin.site.register(JobType, JobTypeAdmin)
 admin.site.register(Login, LoginAdmin)
+admin.site.register(ReportJob, ReportJobAdmin)
 admin.site.register(Tablet, TabletAdmin)
 admin.site.register(Timestamp, TimestampAdmin)
+admin.site.register(TimestampDay, TimestampDayAdmin)
 admin.site.register(TimestampDirection, TimestampDirectionAdmin)
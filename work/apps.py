@@ -25,3 +25,7 @@ from django.utils.translation import pgettext_lazy
 class WorkConfig(AppConfig):
     name = 'work'
     verbose_name = pgettext_lazy('WorkConfig', 'Work')
+
+    def ready(self):
+        # Connect signals
+        from . import signals  # noqa: F401
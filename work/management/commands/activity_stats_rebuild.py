@@ -0,0 +1,43 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from work.models import ActivityStat
+
+
+class Command(BaseCommand):
+    help = 'Compute again the statistics of the activities months'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from',
+                            type=datetime.date.fromisoformat,
+                            help='First month to compute (YYYY-MM-DD)')
+        parser.add_argument('--date-to',
+                            type=datetime.date.fromisoformat,
+                            help='Last month to compute (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        count = ActivityStat.objects.rebuild(date_from=options['date_from'],
+                                             date_to=options['date_to'])
+        self.stdout.write('Computed {COUNT} activity statistics'.format(
+            COUNT=count))
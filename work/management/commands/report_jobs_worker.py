@@ -0,0 +1,55 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from work.models import ReportJob
+
+
+class Command(BaseCommand):
+    help = 'Render the reports of the pending report jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once',
+                            action='store_true',
+                            help='Exit when there are no more pending jobs')
+        parser.add_argument('--interval',
+                            type=float,
+                            default=settings.REPORT_JOBS_POLL_INTERVAL,
+                            help='Seconds to wait for new jobs')
+
+    def handle(self, *args, **options):
+        while True:
+            job = ReportJob.objects.get_next_job()
+            if job:
+                job.run()
+                self.stdout.write('Report job {ID} {STATUS}: {NAME}'.format(
+                    ID=job.pk,
+                    STATUS=job.status,
+                    NAME=job.name))
+            else:
+                # Clean the old jobs while there's nothing to do
+                ReportJob.objects.delete_expired()
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
@@ -0,0 +1,39 @@
+# Generated by Django 2.2.10 on 2026-10-18 09:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('work', '0041_contract_salary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, verbose_name='name')),
+                ('model', models.CharField(max_length=255, verbose_name='model')),
+                ('method', models.CharField(max_length=255, verbose_name='method')),
+                ('arguments', models.TextField(verbose_name='arguments')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=30, verbose_name='status')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('started', models.DateTimeField(blank=True, null=True, verbose_name='started')),
+                ('completed', models.DateTimeField(blank=True, null=True, verbose_name='completed')),
+                ('result', models.FileField(blank=True, upload_to='reports/', verbose_name='result')),
+                ('error', models.TextField(blank=True, verbose_name='error')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='user')),
+            ],
+            options={
+                'verbose_name': 'Report job',
+                'verbose_name_plural': 'Report jobs',
+                'db_table': 'work_report_jobs',
+                'ordering': ['-id'],
+            },
+        ),
+    ]
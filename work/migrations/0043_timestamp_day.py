@@ -0,0 +1,34 @@
+# Generated by Django 2.2.10 on 2026-10-18 09:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0065_company_sdi_code'),
+        ('work', '0042_report_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimestampDay',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True, verbose_name='date')),
+                ('pairs', models.PositiveIntegerField(verbose_name='pairs')),
+                ('duration', models.DurationField(verbose_name='duration')),
+                ('anomalies', models.PositiveIntegerField(verbose_name='anomalies')),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='work.Contract', verbose_name='contract')),
+                ('structure', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='hotels.Structure', verbose_name='structure')),
+            ],
+            options={
+                'verbose_name': 'Timestamp day',
+                'verbose_name_plural': 'Timestamp days',
+                'db_table': 'work_timestamp_days',
+                'ordering': ['contract', 'date', 'structure'],
+                'unique_together': {('contract', 'structure', 'date')},
+            },
+        ),
+    ]
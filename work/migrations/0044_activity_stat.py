@@ -0,0 +1,34 @@
+# Generated by Django 2.2.10 on 2026-10-18 09:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0065_company_sdi_code'),
+        ('work', '0043_timestamp_day'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(db_index=True, verbose_name='month')),
+                ('rooms', models.PositiveIntegerField(verbose_name='rooms')),
+                ('quantity', models.PositiveIntegerField(verbose_name='quantity')),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='work.Contract', verbose_name='contract')),
+                ('service_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='hotels.ServiceType', verbose_name='service type')),
+                ('structure', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='hotels.Structure', verbose_name='structure')),
+            ],
+            options={
+                'verbose_name': 'Activity statistic',
+                'verbose_name_plural': 'Activity statistics',
+                'db_table': 'work_activity_stats',
+                'ordering': ['contract', 'month', 'structure', 'service_type'],
+                'unique_together': {('contract', 'structure', 'service_type', 'month')},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 2.2.10 on 2026-10-18 09:36
+
+import datetime
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def initialize_current_contracts(apps, schema_editor):
+    Contract = apps.get_model('work', 'Contract')
+    Employee = apps.get_model('work', 'Employee')
+    today = datetime.date.today()
+    Employee.objects.update(current_contract=models.Subquery(
+        Contract.objects.filter(
+            models.Q(end_date__isnull=True) | models.Q(end_date__gte=today),
+            employee=models.OuterRef('pk'),
+            enabled=True,
+            start_date__lte=today).values('pk')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('work', '0044_activity_stat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='current_contract',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='work.Contract', verbose_name='active contract'),
+        ),
+        migrations.RunPython(initialize_current_contracts,
+                             reverse_code=migrations.RunPython.noop),
+    ]
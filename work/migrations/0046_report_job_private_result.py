@@ -0,0 +1,24 @@
+# Generated by Django 2.2.10 on 2026-10-18 09:52
+
+from django.db import migrations, models
+import utility.misc.report_job_storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('work', '0045_employee_current_contract'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='language',
+            field=models.CharField(blank=True, max_length=15, verbose_name='language'),
+        ),
+        migrations.AlterField(
+            model_name='reportjob',
+            name='result',
+            field=models.FileField(blank=True, storage=utility.misc.report_job_storage.ReportJobStorage(), upload_to=utility.misc.report_job_storage.get_report_job_path, verbose_name='result'),
+        ),
+    ]
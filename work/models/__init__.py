@@ -21,12 +21,16 @@
 from .activity import Activity, ActivityAdmin                     # noqa: F401
 from .activity import ActivityInLinesProxy, ActivityInLinesAdmin  # noqa: F401
 from .activity_room import ActivityRoom, ActivityRoomAdmin        # noqa: F401
+from .activity_stat import ActivityStat, ActivityStatAdmin        # noqa: F401
 from .contract import Contract, ContractAdmin                     # noqa: F401
 from .contract_type import ContractType, ContractTypeAdmin        # noqa: F401
 from .employee import Employee, EmployeeAdmin                     # noqa: F401
 from .job_type import JobType, JobTypeAdmin                       # noqa: F401
 from .login import Login, LoginAdmin                              # noqa: F401
+from .report_job import (ReportJob, ReportJobAdmin,              # noqa: F401
+                         report_job)                              # noqa: F401
 from .tablet import Tablet, TabletAdmin                           # noqa: F401
 from .timestamp import Timestamp, TimestampAdmin                  # noqa: F401
+from .timestamp_day import TimestampDay, TimestampDayAdmin        # noqa: F401
 from .timestamp_direction import (TimestampDirection,             # noqa: F401
                                   TimestampDirectionAdmin)        # noqa: F401
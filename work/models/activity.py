@@ -20,6 +20,7 @@
 import collections
 import datetime
 from collections import defaultdict
+import itertools
 import sys
 
 from django.db import models
@@ -29,14 +30,22 @@ from django.utils.translation import pgettext_lazy
 
 from . import activity_room
 from .contract import Contract
+from .report_job import report_job
 
 from hotels.models import Service, ServiceType, Structure
 
-from utility.misc import (get_admin_options,
+from utility.misc import (cache_report, get_admin_options,
                           month_start, month_end,
-                          xhtml2pdf_render_from_template_response)
+                          xhtml2pdf_render_from_template_response,
+                          xhtml2pdf_render_from_template_sections)
 from utility.models import BaseModel, BaseModelAdmin
 
+# Models used by the cached reports
+REPORT_MODELS = ('hotels.Building', 'hotels.Company', 'hotels.Room',
+                 'hotels.Service', 'hotels.ServiceType', 'hotels.Structure',
+                 'work.Activity', 'work.ActivityRoom', 'work.Contract',
+                 'work.Employee')
+
 
 class Activity(BaseModel):
     contract = models.ForeignKey('Contract',
@@ -76,59 +85,103 @@ class ActivityAdmin(BaseModelAdmin):
     def get_urls(self):
         urls = [
             path('<int:activity_id>/export_monthly', self.export_monthly),
+            path('<int:activity_id>/export_monthly_xlsx',
+                 self.export_monthly_xlsx),
+            path('<int:activity_id>/export_monthly_company',
+                 self.export_monthly_company),
+            path('<int:activity_id>/export_monthly_company_xlsx',
+                 self.export_monthly_company_xlsx),
         ] + super().get_urls()
         return urls
 
+    @cache_report(*REPORT_MODELS)
     def export_monthly(self, request, activity_id):
+        # Export data to CSV format while the days are processed
+        fields_map, data = self.get_export_monthly(activity_id)
+        return self.do_export_data_to_csv(
+            data=data,
+            fields_map=fields_map,
+            filename='export_activities_monthly')
+
+    @cache_report(*REPORT_MODELS)
+    def export_monthly_xlsx(self, request, activity_id):
+        # Export data to XLSX format while the days are processed
+        fields_map, data = self.get_export_monthly(activity_id)
+        return self.do_export_data_to_xlsx(
+            data=data,
+            fields_map=fields_map,
+            filename='export_activities_monthly')
+
+    @cache_report(*REPORT_MODELS)
+    def export_monthly_company(self, request, activity_id):
+        # Export data to CSV format for every contract of the company
+        fields_map, data = self.get_export_monthly(activity_id,
+                                                   whole_company=True)
+        return self.do_export_data_to_csv(
+            data=data,
+            fields_map=fields_map,
+            filename='export_activities_monthly_company')
+
+    @cache_report(*REPORT_MODELS)
+    def export_monthly_company_xlsx(self, request, activity_id):
+        # Export data to XLSX format for every contract of the company
+        fields_map, data = self.get_export_monthly(activity_id,
+                                                   whole_company=True)
+        return self.do_export_data_to_xlsx(
+            data=data,
+            fields_map=fields_map,
+            filename='export_activities_monthly_company')
+
+    def get_export_monthly(self, activity_id, whole_company=False):
+        """
+        Get the fields map and the activities for each day of the activity
+        month, for the activity contract or for every contract of its company
+        """
         # Get dates from selected activity
-        activity_ref = Activity.objects.get(pk=activity_id)
+        activity_ref = Activity.objects.select_related('contract').get(
+            pk=activity_id)
         date_min = month_start(activity_ref.date)
         date_max = month_end(activity_ref.date)
+        if whole_company:
+            contracts_filter = models.Q(
+                contract__company_id=activity_ref.contract.company_id)
+        else:
+            contracts_filter = models.Q(contract_id=activity_ref.contract_id)
+        activities = Activity.objects.filter(contracts_filter,
+                                             date__gte=date_min,
+                                             date__lte=date_max)
+        service_types = list(ServiceType.objects.filter(
+            show_in_reports=True).order_by('order'))
+        # Count the rooms for each contract, date and service type
+        counts = defaultdict(dict)
+        for contract_id, date, service_type_id, count in (
+                activity_room.ActivityRoom.objects.filter(
+                    activity__in=activities,
+                    service__service_type__in=service_types)
+                .values_list('activity__contract_id',
+                             'activity__date',
+                             'service__service_type_id')
+                .annotate(count=models.Count('id'))
+                .order_by()):
+            counts[contract_id, date][service_type_id] = count
+        contracts = Contract.objects.filter(
+            pk__in=activities.values('contract_id')).select_related(
+            'company', 'employee')
 
-        # Annotate count for each service type
-        activities = Activity.objects.filter(
-            contract=activity_ref.contract,
-            date__gte=date_min,
-            date__lte=date_max).order_by('date')
-        service_types = (ServiceType.objects.filter(show_in_reports=True)
-                         .order_by('order'))
-        for service_type in service_types:
-            # Prepare services for export
-            ActivityDayExport.fields_map[service_type.name] = (
-                'count_{TYPE}'.format(TYPE=service_type.name))
-            # Maybe too little readable!
-            # Add a field called count_SERVICE_TYPE__NAME consisting of
-            # the count of the ActivityRoom rows with the same Service Type id
-            # For example:
-            # .annotate(count_other=models.Count('activityroom', filter=
-            #           models.Q(activityroom__service__service_type_id=
-            #                    service_type.pk)))
-            dict_sub_filter = {'activityroom__service__service_type_id':
-                               service_type.pk}
-            dict_annotate = {'count_{TYPE}'.format(TYPE=service_type.name):
-                             models.Count('activityroom', filter=models.Q(
-                                **dict_sub_filter))}
-            activities = activities.annotate(**dict_annotate)
-        # Loop over days
-        results = []
-        for day in range(date_min.toordinal(), date_max.toordinal() + 1):
-            activity_export = ActivityDayExport(contract=activity_ref.contract,
-                                                service_types=service_types)
-            # Get the daily activity
-            activity = activities.filter(date=datetime.date.fromordinal(day))
-            if activity:
-                # Add each service counts
-                for service_type in service_types:
-                    count_name = 'count_{TYPE}'.format(TYPE=service_type.name)
-                    activity_export.counts[count_name] = getattr(activity[0],
-                                                                 count_name)
-            results.append(activity_export.extract(
-                date=datetime.date.fromordinal(day)))
-        # Export data to CSV format
-        return self.do_export_data_to_csv(
-            data=results,
-            fields_map=ActivityDayExport.fields_map,
-            filename='export_activities_monthly')
+        # Loop over contracts and days
+        def iter_days():
+            """Iterate the activities for each contract and day"""
+            for contract in contracts:
+                for day in range(date_min.toordinal(),
+                                 date_max.toordinal() + 1):
+                    date = datetime.date.fromordinal(day)
+                    activity_export = ActivityDayExport(
+                        contract=contract,
+                        service_types=service_types,
+                        counts=counts.get((contract.pk, date), {}))
+                    yield activity_export.extract(date=date)
+
+        return ActivityDayExport.get_fields_map(service_types), iter_days()
 
 
 class ActivityInLinesProxy(Activity):
@@ -156,32 +209,36 @@ class ActivityInLinesAdmin(BaseModelAdmin):
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
     def get_daily_activities(self, request, queryset):
-        queryset = queryset.order_by('date', 'contract')
+        queryset = queryset.order_by('date', 'contract').select_related(
+            'contract__company', 'contract__employee')
+        # Load the rooms of every activity using a single query
+        services = defaultdict(list)
+        totals = defaultdict(lambda: defaultdict(int))
+        grand_totals = defaultdict(int)
+        for activityroom in activity_room.ActivityRoom.objects.filter(
+                activity__in=queryset.values('pk')).select_related(
+                'room', 'room__building', 'service').order_by(
+                'activity_id', 'room__building__name', 'room__name'):
+            services[activityroom.activity_id].append({
+                'building': activityroom.room.building.name,
+                'room': activityroom.room.name,
+                'service': activityroom.service.name,
+                'service_id': activityroom.service_id,
+                'description': activityroom.description
+                })
+            totals[activityroom.activity_id][activityroom.service.name] += 1
+            grand_totals[activityroom.service.name] += 1
         # Cycle each unique date/contract
         results = []
-        grand_totals = defaultdict(int)
         for activity in queryset:
-            services = []
-            totals = defaultdict(int)
-            for activityroom in activity_room.ActivityRoom.objects.filter(
-                    activity=activity).select_related(
-                    'room', 'room__building', 'service').order_by(
-                    'room__building__name', 'room__name'):
-                services.append({'building': activityroom.room.building.name,
-                                 'room': activityroom.room.name,
-                                 'service': activityroom.service.name,
-                                 'service_id': activityroom.service_id,
-                                 'description': activityroom.description
-                                 })
-                totals[activityroom.service.name] += 1
-                grand_totals[activityroom.service.name] += 1
             results.append({'company': activity.contract.company,
                             'employee': activity.contract.employee,
                             'date': activity.date,
                             'activity': str(activity),
-                            'services': services,
+                            'services': services[activity.pk],
                             'totals': sorted(['%s: %d' % (i[0], i[1])
-                                              for i in totals.items()])
+                                              for i
+                                              in totals[activity.pk].items()])
                             })
         # Export data
         context = dict(
@@ -194,6 +251,7 @@ class ActivityInLinesAdmin(BaseModelAdmin):
         )
         return context
 
+    @cache_report(*REPORT_MODELS)
     def action_daily_activities_html(self, request, queryset):
         context = self.get_daily_activities(request, queryset)
         # Add report preferences from AdminOptions
@@ -207,16 +265,36 @@ class ActivityInLinesAdmin(BaseModelAdmin):
         'Activity',
         'Daily activities (HTML)')
 
+    @cache_report(*REPORT_MODELS)
+    @report_job
     def action_daily_activities_pdf(self, request, queryset):
         context = self.get_daily_activities(request, queryset)
         # Add report preferences from AdminOptions
         context.update(get_admin_options(self.__class__.__name__,
                                          sys._getframe().f_code.co_name))
-        response = xhtml2pdf_render_from_template_response(
-            response=TemplateResponse(request,
-                                      'work/activities_daily/pdf.html',
-                                      context),
-            filename='')
+        sections = []
+        if context.get('split_sections') == '1':
+            # Render a section for each employee using multiple processes
+            sections = [{'results': list(results), 'grand_totals': None}
+                        for _, results in itertools.groupby(
+                            sorted(context['results'],
+                                   key=lambda item: item['employee'].pk),
+                            key=lambda item: item['employee'].pk)]
+        if sections:
+            # The grand totals are shown only after the last section
+            sections[-1]['grand_totals'] = context['grand_totals']
+            response = xhtml2pdf_render_from_template_sections(
+                request=request,
+                template='work/activities_daily/pdf.html',
+                context=context,
+                sections=sections,
+                filename='')
+        else:
+            response = xhtml2pdf_render_from_template_response(
+                response=TemplateResponse(request,
+                                          'work/activities_daily/pdf.html',
+                                          context),
+                filename='')
         return response
     action_daily_activities_pdf.short_description = pgettext_lazy(
         'Activity',
@@ -232,42 +310,42 @@ class ActivityInLinesAdmin(BaseModelAdmin):
         results = {}
         totals = {}
         details = {}
-        structures = []
         for day in range(date_min.toordinal(), date_max.toordinal() + 1):
             results[str(day)] = defaultdict(int)
             totals[str(day)] = 0
             details[str(day)] = []
         # Add grand totals
         grand_totals = defaultdict(int)
+        services = {}
+        structures = set()
+        # Get totals for each activity using a single grouped query
+        for total in activity_room.ActivityRoom.objects.filter(
+                activity__in=queryset.values('pk')).values(
+                'activity__date', 'activity_id', 'service_id',
+                'service__name', 'room__building__structure_id',
+                'description').annotate(
+                count=models.Count('service_id')).order_by(
+                'activity__date', 'activity_id', 'service_id'):
+            day = str(total['activity__date'].toordinal())
+            services[total['service_id']] = total['service__name']
+            structures.add(total['room__building__structure_id'])
+            # Add description, if any
+            if total['description']:
+                details[day].append(total['description'])
+            results[day][total['service_id']] += total['count']
+            totals[day] += total['count']
+            grand_totals[total['service_id']] += total['count']
+            grand_totals['totals'] += total['count']
         # Get every used service
         ServiceNM = collections.namedtuple('Service', 'id name')
-        services = [ServiceNM(service[0], service[1])
-                    for service in activity_room.ActivityRoom.objects.filter(
-                    activity_id__in=queryset.values_list('id')).values_list(
-                    'service_id', 'service__name').order_by(
-                    'service_id').distinct()]
-        # Cycle each unique date
-        for activity in queryset:
-            day = activity.date.toordinal()
-            # Get totals for each activity
-            for total in activity_room.ActivityRoom.objects.filter(
-                    activity=activity).values(
-                    'service_id', 'room__building__structure_id',
-                    'description').annotate(
-                    count=models.Count('service_id')).order_by('service_id'):
-                structures.append(total['room__building__structure_id'])
-                # Add description, if any
-                if total['description']:
-                    details[str(day)].append(total['description'])
-                results[str(day)][total['service_id']] += total['count']
-                totals[str(day)] += total['count']
-                grand_totals[total['service_id']] += total['count']
-                grand_totals['totals'] += total['count']
+        services = [ServiceNM(service_id, services[service_id])
+                    for service_id in sorted(services)]
         # Prepare structures
         StructureNM = collections.namedtuple('Service', 'name company')
         structures = [StructureNM(structure.name, structure.company.name)
                       for structure
-                      in Structure.objects.filter(id__in=structures).all()]
+                      in Structure.objects.filter(
+                          id__in=structures).select_related('company')]
         # Export data
         context = dict(
             # Include common variables for rendering the admin template
@@ -289,6 +367,7 @@ class ActivityInLinesAdmin(BaseModelAdmin):
         )
         return context
 
+    @cache_report(*REPORT_MODELS)
     def action_monthly_activities_html(self, request, queryset):
         context = self.get_monthly_activities(request, queryset)
         # Add report preferences from AdminOptions
@@ -307,6 +386,8 @@ class ActivityInLinesAdmin(BaseModelAdmin):
     action_monthly_activities_html.short_description = (
         'Monthly activities (HTML)')
 
+    @cache_report(*REPORT_MODELS)
+    @report_job
     def action_monthly_activities_pdf(self, request, queryset):
         context = self.get_monthly_activities(request, queryset)
         # Add report preferences from AdminOptions
@@ -337,14 +418,20 @@ class ActivityDayExport(object):
                   'ROLL_NUMBER': 'roll_number',
                   }
 
-    def __init__(self, contract, service_types):
+    def __init__(self, contract, service_types, counts):
         self.contract = contract
-        self.services = []
-        # Initialize services counts to zero
-        self.counts = {}
+        self.service_types = service_types
+        # Services counts for each service type id
+        self.counts = counts
+
+    @classmethod
+    def get_fields_map(cls, service_types):
+        """Get the fields map with a column for each service type"""
+        fields_map = cls.fields_map.copy()
         for service_type in service_types:
-            self.services.append(service_type.name)
-            self.counts['count_{TYPE}'.format(TYPE=service_type.name)] = 0
+            fields_map[service_type.name] = 'count_{TYPE}'.format(
+                TYPE=service_type.name)
+        return fields_map
 
     def extract(self, date):
         results = {'date': date,
@@ -354,5 +441,7 @@ class ActivityDayExport(object):
                    'roll_number': self.contract.roll_number,
                    }
         # Append services counts
-        results = dict(results, **self.counts)
+        for service_type in self.service_types:
+            results['count_{TYPE}'.format(TYPE=service_type.name)] = (
+                self.counts.get(service_type.pk, 0))
         return results
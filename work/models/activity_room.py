@@ -18,7 +18,7 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 ##
 
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.contrib import admin
 from django.utils.translation import pgettext_lazy
 
@@ -31,7 +31,44 @@ from hotels.models import Room
 from utility.models import BaseModel, BaseModelAdmin
 
 
+class ActivityRoomManager(models.Manager):
+    def add_extra(self, activity_id, structure_id, service_id, service_qty,
+                  description, attempts=10):
+        """
+        Add an ActivityRoom using the first free extra room by name for the
+        structure, return None if there are no available extra rooms
+        """
+        for attempt in range(attempts):
+            room_id = Room.objects.filter(
+                building__structure_id=structure_id,
+                building__extras=True).exclude(
+                    pk__in=self.filter(activity_id=activity_id,
+                                       service_id=service_id).values(
+                                           'room_id')).order_by(
+                    'name', 'id').values_list('id', flat=True).first()
+            if room_id is None:
+                # No available extra rooms to work with
+                return None
+            try:
+                # Use a savepoint to recover from the failed insert
+                with transaction.atomic():
+                    return self.create(activity_id=activity_id,
+                                       room_id=room_id,
+                                       service_id=service_id,
+                                       service_qty=service_qty,
+                                       description=description)
+            except IntegrityError:
+                # Try again only if the room was taken by a concurrent request
+                if (attempt == attempts - 1 or
+                        not self.filter(activity_id=activity_id,
+                                        room_id=room_id,
+                                        service_id=service_id).exists()):
+                    raise
+
+
 class ActivityRoom(BaseModel):
+    # Define custom manager
+    objects = ActivityRoomManager()
 
     activity = models.ForeignKey('Activity',
                                  on_delete=models.PROTECT,
@@ -0,0 +1,191 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import collections
+import datetime
+import functools
+import operator
+
+from django.db import connections, models, transaction
+from django.db.models.functions import ExtractYear, TruncMonth
+from django.utils.translation import pgettext_lazy
+
+from . import activity, activity_room
+
+from utility.misc import month_end, month_start, on_commit_keys
+from utility.models import BaseModel, BaseModelAdmin
+
+
+class ActivityStatManager(models.Manager):
+    def iter_stats(self, queryset):
+        """Count the activity rooms for each contract/structure/month/type"""
+        for values in queryset.annotate(
+                month=TruncMonth('activity__date')).values(
+                'activity__contract_id', 'room__building__structure_id',
+                'service__service_type_id', 'month').annotate(
+                rooms=models.Count('id'),
+                quantity=models.Sum('service_qty')).order_by():
+            yield ActivityStat(
+                contract_id=values['activity__contract_id'],
+                structure_id=values['room__building__structure_id'],
+                service_type_id=values['service__service_type_id'],
+                month=values['month'],
+                rooms=values['rooms'],
+                quantity=values['quantity'])
+
+    def refresh(self, keys):
+        """Compute again the months for the (contract id, date) keys"""
+        months = collections.defaultdict(set)
+        for contract_id, date in keys:
+            if isinstance(date, datetime.datetime):
+                date = date.date()
+            months[month_start(date)].add(contract_id)
+        if not months:
+            return 0
+        query = functools.reduce(operator.or_, (
+            models.Q(month=month, contract_id__in=contracts)
+            for month, contracts in months.items()))
+        rooms_query = functools.reduce(operator.or_, (
+            models.Q(activity__date__gte=month,
+                     activity__date__lte=month_end(month),
+                     activity__contract_id__in=contracts)
+            for month, contracts in months.items()))
+        with transaction.atomic():
+            if connections[self.db].features.has_select_for_update:
+                # Wait for the other refreshes of the same contracts
+                list(self.model.contract.field.related_model.objects.filter(
+                    pk__in=set().union(*months.values())).order_by(
+                        'pk').select_for_update().values_list('pk',
+                                                              flat=True))
+            self.filter(query).delete()
+            return len(self.bulk_create(self.iter_stats(
+                activity_room.ActivityRoom.objects.filter(rooms_query))))
+
+    def refresh_on_commit(self, keys):
+        """Compute again the months for the keys after the transaction"""
+        on_commit_keys(self.refresh, keys)
+
+    def refresh_activities(self, activity_ids):
+        """Compute again the months of the activities"""
+        return self.refresh(activity.Activity.objects.filter(
+            pk__in=activity_ids).values_list('contract_id', 'date'))
+
+    def refresh_activities_on_commit(self, activity_ids):
+        """Compute again the activities months after the transaction"""
+        on_commit_keys(self.refresh_activities, activity_ids)
+
+    def refresh_rooms_on_commit(self, **filters):
+        """Compute again the months of the filtered activity rooms"""
+        self.refresh_on_commit(
+            activity_room.ActivityRoom.objects.filter(**filters).annotate(
+                month=TruncMonth('activity__date')).values_list(
+                'activity__contract_id', 'month').distinct())
+
+    def rebuild(self, date_from=None, date_to=None):
+        """Compute again every month or the months in the dates range"""
+        query = models.Q()
+        rooms_query = models.Q()
+        if date_from:
+            query &= models.Q(month__gte=month_start(date_from))
+            rooms_query &= models.Q(activity__date__gte=month_start(date_from))
+        if date_to:
+            query &= models.Q(month__lte=month_end(date_to))
+            rooms_query &= models.Q(activity__date__lte=month_end(date_to))
+        with transaction.atomic():
+            self.filter(query).delete()
+            return len(self.bulk_create(self.iter_stats(
+                activity_room.ActivityRoom.objects.filter(rooms_query)),
+                batch_size=2000))
+
+    def get_totals(self, fields, **filters):
+        """Sum the rooms and the quantities grouped by fields"""
+        return self.filter(**filters).values(*fields).annotate(
+            total_rooms=models.Sum('rooms'),
+            total_quantity=models.Sum('quantity')).order_by(*fields)
+
+    def get_monthly_totals(self, year,
+                           fields=('contract', 'service_type'), **filters):
+        """Sum the rooms and the quantities for each month of the year"""
+        return self.get_totals(('month', *fields),
+                               month__year=year,
+                               **filters)
+
+    def get_yearly_totals(self, fields=('contract', 'service_type'),
+                          **filters):
+        """Sum the rooms and the quantities for each year"""
+        return self.annotate(year=ExtractYear('month')).filter(
+            **filters).values('year', *fields).annotate(
+            total_rooms=models.Sum('rooms'),
+            total_quantity=models.Sum('quantity')).order_by('year', *fields)
+
+
+class ActivityStat(BaseModel):
+    # Define custom manager
+    objects = ActivityStatManager()
+
+    contract = models.ForeignKey('Contract',
+                                 on_delete=models.CASCADE,
+                                 verbose_name=pgettext_lazy('ActivityStat',
+                                                            'contract'))
+    structure = models.ForeignKey('hotels.Structure',
+                                  on_delete=models.CASCADE,
+                                  verbose_name=pgettext_lazy('ActivityStat',
+                                                             'structure'))
+    service_type = models.ForeignKey('hotels.ServiceType',
+                                     on_delete=models.CASCADE,
+                                     verbose_name=pgettext_lazy(
+                                         'ActivityStat',
+                                         'service type'))
+    month = models.DateField(db_index=True,
+                             verbose_name=pgettext_lazy('ActivityStat',
+                                                        'month'))
+    rooms = models.PositiveIntegerField(
+        verbose_name=pgettext_lazy('ActivityStat', 'rooms'))
+    quantity = models.PositiveIntegerField(
+        verbose_name=pgettext_lazy('ActivityStat', 'quantity'))
+
+    class Meta:
+        # Define the database table
+        db_table = 'work_activity_stats'
+        ordering = ['contract', 'month', 'structure', 'service_type']
+        unique_together = ('contract', 'structure', 'service_type', 'month')
+        verbose_name = pgettext_lazy('ActivityStat', 'Activity statistic')
+        verbose_name_plural = pgettext_lazy('ActivityStat',
+                                            'Activity statistics')
+
+    def __str__(self):
+        return '{CONTRACT} {STRUCTURE} {SERVICE_TYPE} {MONTH}'.format(
+            CONTRACT=self.contract,
+            STRUCTURE=self.structure,
+            SERVICE_TYPE=self.service_type,
+            MONTH=self.month.strftime('%Y-%m'))
+
+
+class ActivityStatAdmin(BaseModelAdmin):
+    date_hierarchy = 'month'
+    list_select_related = ('contract', 'contract__employee', 'structure',
+                           'service_type')
+    ordering = ['-month', 'contract', 'structure', 'service_type']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
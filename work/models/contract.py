@@ -35,8 +35,11 @@ from django.urls import path
 from django.utils.safestring import mark_safe
 from django.utils.translation import pgettext_lazy
 
+from .report_job import report_job
+
 from utility.admin import AdminTextInputFilter
-from utility.misc import QRCodeImage, URI, xhtml2pdf_render_from_html
+from utility.misc import (QRCodeImage, URI, report_cache,
+                          xhtml2pdf_render_from_html)
 from utility.models import BaseModel, BaseModelAdmin
 
 from website.models import AdminOption
@@ -52,6 +55,18 @@ class ContractManager(models.Manager):
                 (models.Q(end_date__isnull=True) |
                  models.Q(end_date__gte=datetime.date.today())))
 
+    def refresh_active_contracts(self, employee_ids=None):
+        """Save the active contract of every employee or of employee_ids"""
+        employees = self.model.employee.field.related_model.objects.all()
+        if employee_ids is not None:
+            employees = employees.filter(pk__in=employee_ids)
+        count = employees.update(current_contract=models.Subquery(
+            self.filter(self.get_active_contracts_query(),
+                        employee=models.OuterRef('pk')).values('pk')[:1]))
+        # The bulk updates don't send the signals
+        report_cache.invalidate(employees.model._meta.label)
+        return count
+
 
 class Contract(BaseModel):
     # Define custom manager
@@ -326,6 +341,7 @@ class ContractAdmin(BaseModelAdmin):
         return self.qrcode(None, instance.id, 'template')
     qrcode_field.short_description = pgettext_lazy('Contract', 'QR Code')
 
+    @report_job
     def idcard(self, request, contract_id):
         """
         Create an ID card in PDF format
@@ -348,6 +364,7 @@ class ContractAdmin(BaseModelAdmin):
         response = xhtml2pdf_render_from_html(
             html=html, filename='id_card {ID}.pdf'.format(ID=contract_id))
         return response
+    idcard.short_description = pgettext_lazy('Contract', 'ID Card')
 
     def status(self, instance):
         """Invert the locked status for display purposes"""
@@ -18,13 +18,11 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 ##
 
-import csv
-import io
 import os.path
 
 from django.db import models
 from django.conf import settings
-from django.contrib import admin, messages
+from django.contrib import admin
 from django.core.exceptions import ValidationError
 from django.shortcuts import render, redirect
 from django.template import loader
@@ -41,7 +39,7 @@ from locations.models import Country, Location
 from utility.admin import AdminTextInputFilter
 from utility.admin_widgets import AdminImageWidget_128x128
 from utility.forms import CSVImportForm
-from utility.misc import reverse_with_query
+from utility.misc import CSVForeignKey, CSVImporter, reverse_with_query
 from utility.models import BaseModel, BaseModelAdmin
 
 
@@ -142,6 +140,15 @@ class Employee(BaseModel):
     locked = models.BooleanField(default=False,
                                  verbose_name=pgettext_lazy('Employee',
                                                             'locked'))
+    current_contract = models.ForeignKey('Contract',
+                                         on_delete=models.SET_NULL,
+                                         null=True,
+                                         blank=True,
+                                         editable=False,
+                                         related_name='+',
+                                         verbose_name=pgettext_lazy(
+                                             'Employee',
+                                             'active contract'))
 
     class Meta:
         # Define the database table
@@ -189,8 +196,7 @@ class Employee(BaseModel):
         )
 
     def get_active_contract(self):
-        contracts = self.get_active_contracts(self.pk)
-        return contracts[0] if contracts else None
+        return self.current_contract
 
 
 class EmployeeFirstNameInputFilter(AdminTextInputFilter):
@@ -260,15 +266,11 @@ class EmployeeAdmin(BaseModelAdmin):
 
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
-        # Add subquery for active contract
-        contracts = self.model.get_active_contracts(None,
-                                                    models.OuterRef('pk'))
-        # Add annotated fields for contract id and company
+        # Add annotated fields for active contract id and company
         queryset = queryset.annotate(
             _country=models.F('birth_location__region__country'),
-            _contract_id=models.Subquery(contracts.values('pk')[:1]),
-            _contract_company=models.Subquery(
-                contracts.values('company__name')[:1]),
+            _contract_id=models.F('current_contract'),
+            _contract_company=models.F('current_contract__company__name'),
         )
         return queryset
 
@@ -279,75 +281,42 @@ class EmployeeAdmin(BaseModelAdmin):
         return urls
 
     def import_csv(self, request):
-        def append_error(type_name, item):
-            """Append an error message to the messages list"""
-            error_message = pgettext_lazy('Employee',
-                                          'Unexpected {TYPE} "{ITEM}"').format(
-                                              TYPE=type_name,
-                                              ITEM=item)
-            if error_message not in error_messages:
-                error_messages.append(error_message)
-                self.message_user(request, error_message, messages.ERROR)
-
         if request.method == 'POST':
-            # Preload locations
-            locations = {}
-            for item in Location.objects.all():
-                locations[str(item)] = item
-            # Load CSV file content
-            csv_file = io.TextIOWrapper(
-                request.FILES['csv_file'].file,
-                encoding=request.POST['encoding'])
-            reader = csv.DictReader(
-                csv_file,
-                delimiter=request.POST['delimiter'])
+            # Resolve locations using their names
+            locations = CSVForeignKey(queryset=Location.objects.all(),
+                                      type_name='location')
             # Load data from CSV
-            error_messages = []
-            employees = []
-            for row in reader:
-                if row['BIRTH LOCATION'] not in locations:
-                    append_error('location', row['BIRTH LOCATION'])
-                elif row['LOCATION'] not in locations:
-                    append_error('location', row['LOCATION'])
-                elif row['PERMIT LOCATION'] not in locations:
-                    append_error('location', row['PERMIT LOCATION'])
-                else:
-                    # If no error create a new Employee object
-                    employees.append(Employee(first_name=row['FIRST NAME'],
-                                              last_name=row['LAST NAME'],
-                                              description=row['DESCRIPTION'],
-                                              gender=row['GENDER'],
-                                              birth_date=(row['BIRTH DATE']
-                                                          if row['BIRTH DATE']
-                                                          else None),
-                                              birth_location=locations[
-                                                  row['BIRTH LOCATION']],
-                                              address=row['ADDRESS'],
-                                              location=locations[
-                                                  row['LOCATION']],
-                                              postal_code=row['POSTAL CODE'],
-                                              phone1=row['PHONE1'],
-                                              phone2=row['PHONE2'],
-                                              email=row['EMAIL'],
-                                              vat_number=row['VAT NUMBER'],
-                                              tax_code=row['TAX CODE'],
-                                              permit=row['PERMIT'],
-                                              permit_location=locations[
-                                                  row['PERMIT LOCATION']],
-                                              permit_date=(
-                                                  row['PERMIT DATE']
-                                                  if row['PERMIT DATE']
-                                                  else None),
-                                              permit_expiration=(
-                                                  row['PERMIT EXPIRATION']
-                                                  if row['PERMIT EXPIRATION']
-                                                  else None)))
-            # Save data only if there were not errors
-            if not error_messages:
-                Employee.objects.bulk_create(employees)
-                self.message_user(request, pgettext_lazy(
-                    'Employee',
-                    'Your CSV file has been imported'))
+            importer = CSVImporter(model=Employee)
+            importer.import_file(
+                file=request.FILES['csv_file'].file,
+                encoding=request.POST['encoding'],
+                delimiter=request.POST['delimiter'],
+                create_object=lambda row: Employee(
+                    first_name=row['FIRST NAME'],
+                    last_name=row['LAST NAME'],
+                    description=row['DESCRIPTION'],
+                    gender=row['GENDER'],
+                    birth_date=(row['BIRTH DATE']
+                                if row['BIRTH DATE']
+                                else None),
+                    birth_location=locations.get(row['BIRTH LOCATION']),
+                    address=row['ADDRESS'],
+                    location=locations.get(row['LOCATION']),
+                    postal_code=row['POSTAL CODE'],
+                    phone1=row['PHONE1'],
+                    phone2=row['PHONE2'],
+                    email=row['EMAIL'],
+                    vat_number=row['VAT NUMBER'],
+                    tax_code=row['TAX CODE'],
+                    permit=row['PERMIT'],
+                    permit_location=locations.get(row['PERMIT LOCATION']),
+                    permit_date=(row['PERMIT DATE']
+                                 if row['PERMIT DATE']
+                                 else None),
+                    permit_expiration=(row['PERMIT EXPIRATION']
+                                       if row['PERMIT EXPIRATION']
+                                       else None)))
+            importer.message_user(self, request)
             return redirect('..')
         return render(request,
                       'utility/import_csv/form.html',
@@ -0,0 +1,313 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import datetime
+import functools
+import json
+import mimetypes
+import os.path
+import traceback
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.files.base import ContentFile
+from django.db import models
+from django.db.models.query import QuerySet
+from django.http import FileResponse, Http404, HttpRequest
+from django.shortcuts import redirect
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils import translation
+from django.utils.html import format_html
+from django.utils.translation import pgettext_lazy
+
+from utility.misc import ReportJobStorage, get_report_job_path
+from utility.models import BaseModel, BaseModelAdmin
+
+
+class ReportJobManager(models.Manager):
+    def add_job(self, request, model_admin, method, arguments,
+                keywords=None):
+        """Add a new report job for a ModelAdmin method"""
+        if arguments and isinstance(arguments[0], QuerySet):
+            # Save the selected objects for the admin actions
+            arguments = {'ids': list(arguments[0].values_list('pk',
+                                                              flat=True))}
+        else:
+            arguments = {'args': list(arguments)}
+        # Save the arguments from the URL patterns
+        arguments['kwargs'] = keywords or {}
+        return self.create(
+            user=request.user,
+            # Other decorators can wrap the method with the description
+            name=str(getattr(getattr(model_admin, method.__name__),
+                             'short_description',
+                             method.__name__)),
+            model=model_admin.model._meta.label,
+            method=method.__name__,
+            arguments=json.dumps(arguments),
+            language=getattr(request, 'LANGUAGE_CODE',
+                             settings.LANGUAGE_CODE))
+
+    def fail_stale_jobs(self):
+        """Mark as failed the running jobs of the interrupted workers"""
+        now = timezone.now()
+        return self.filter(
+            status=ReportJob.STATUS_RUNNING,
+            started__lt=now - datetime.timedelta(
+                seconds=settings.REPORT_JOBS_TIMEOUT)).update(
+                    status=ReportJob.STATUS_FAILED,
+                    completed=now,
+                    error='The report job timed out')
+
+    def get_next_job(self):
+        """Get the next pending job and mark it as running"""
+        self.fail_stale_jobs()
+        for job in self.filter(status=ReportJob.STATUS_PENDING).order_by(
+                'id')[:10]:
+            # Another worker could have already started the job
+            if self.filter(pk=job.pk,
+                           status=ReportJob.STATUS_PENDING).update(
+                               status=ReportJob.STATUS_RUNNING,
+                               started=timezone.now()):
+                job.refresh_from_db()
+                return job
+        return None
+
+    def delete_expired(self):
+        """Delete the expired jobs and their results"""
+        for job in self.filter(created__lt=timezone.now() - datetime.timedelta(
+                days=settings.REPORT_JOBS_MAX_AGE)).exclude(
+                    status=ReportJob.STATUS_RUNNING):
+            job.result.delete(save=False)
+            job.delete()
+
+
+class ReportJob(BaseModel):
+    # Define custom manager
+    objects = ReportJobManager()
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,
+                             blank=True,
+                             null=True,
+                             on_delete=models.SET_NULL,
+                             verbose_name=pgettext_lazy('ReportJob', 'user'))
+    name = models.CharField(max_length=255,
+                            verbose_name=pgettext_lazy('ReportJob', 'name'))
+    model = models.CharField(max_length=255,
+                             verbose_name=pgettext_lazy('ReportJob', 'model'))
+    method = models.CharField(max_length=255,
+                              verbose_name=pgettext_lazy('ReportJob',
+                                                         'method'))
+    arguments = models.TextField(verbose_name=pgettext_lazy('ReportJob',
+                                                            'arguments'))
+    language = models.CharField(max_length=15,
+                                blank=True,
+                                verbose_name=pgettext_lazy('ReportJob',
+                                                           'language'))
+    status = models.CharField(max_length=30,
+                              default=STATUS_PENDING,
+                              choices=((STATUS_PENDING,
+                                        pgettext_lazy('ReportJob',
+                                                      'Pending')),
+                                       (STATUS_RUNNING,
+                                        pgettext_lazy('ReportJob',
+                                                      'Running')),
+                                       (STATUS_COMPLETED,
+                                        pgettext_lazy('ReportJob',
+                                                      'Completed')),
+                                       (STATUS_FAILED,
+                                        pgettext_lazy('ReportJob',
+                                                      'Failed'))),
+                              verbose_name=pgettext_lazy('ReportJob',
+                                                         'status'))
+    created = models.DateTimeField(auto_now_add=True,
+                                   verbose_name=pgettext_lazy('ReportJob',
+                                                              'created'))
+    started = models.DateTimeField(blank=True,
+                                   null=True,
+                                   verbose_name=pgettext_lazy('ReportJob',
+                                                              'started'))
+    completed = models.DateTimeField(blank=True,
+                                     null=True,
+                                     verbose_name=pgettext_lazy('ReportJob',
+                                                                'completed'))
+    result = models.FileField(blank=True,
+                              storage=ReportJobStorage(),
+                              upload_to=get_report_job_path,
+                              verbose_name=pgettext_lazy('ReportJob',
+                                                         'result'))
+    error = models.TextField(blank=True,
+                             verbose_name=pgettext_lazy('ReportJob', 'error'))
+
+    class Meta:
+        # Define the database table
+        db_table = 'work_report_jobs'
+        ordering = ['-id']
+        verbose_name = pgettext_lazy('ReportJob', 'Report job')
+        verbose_name_plural = pgettext_lazy('ReportJob', 'Report jobs')
+
+    def __str__(self):
+        return '{NAME} ({STATUS})'.format(NAME=self.name,
+                                          STATUS=self.get_status_display())
+
+    def get_request(self):
+        """Prepare a request for the job user"""
+        request = HttpRequest()
+        request.method = 'GET'
+        request.META['SCRIPT_NAME'] = ''
+        request.META['SERVER_NAME'] = 'localhost'
+        request.META['SERVER_PORT'] = '80'
+        request.user = self.user
+        request.LANGUAGE_CODE = translation.get_language()
+        request.report_job = self
+        return request
+
+    def get_result_filename(self):
+        """Return the file name for downloading the result"""
+        return '{ID}_{METHOD}{EXTENSION}'.format(
+            ID=self.pk,
+            METHOD=self.method,
+            EXTENSION=os.path.splitext(self.result.name)[1])
+
+    def render(self):
+        """Render the report using the job user and save its result"""
+        model = admin.site._registry[
+            next(model for model in admin.site._registry
+                 if model._meta.label == self.model)]
+        request = self.get_request()
+        arguments = json.loads(self.arguments)
+        if 'ids' in arguments:
+            # Admin action with the selected objects
+            args = (model.get_queryset(request).filter(
+                pk__in=arguments['ids']), )
+        else:
+            args = arguments['args']
+        response = getattr(model, self.method)(
+            request, *args, **arguments.get('kwargs', {}))
+        if hasattr(response, 'render'):
+            response.render()
+        self.result.save(
+            name='{METHOD}{EXTENSION}'.format(
+                METHOD=self.method,
+                EXTENSION=mimetypes.guess_extension(
+                    response['Content-Type'].split(';')[0]) or ''),
+            content=ContentFile(b''.join(response.streaming_content)
+                                if response.streaming
+                                else response.content),
+            save=False)
+
+    def run(self):
+        """Render the report and save its result"""
+        if self.user is None:
+            # The permissions of a deleted user cannot be checked
+            self.error = 'The report job user was deleted'
+            self.status = self.STATUS_FAILED
+        else:
+            try:
+                with translation.override(self.language or
+                                          settings.LANGUAGE_CODE):
+                    self.render()
+                self.status = self.STATUS_COMPLETED
+            except Exception:
+                self.error = traceback.format_exc()
+                self.status = self.STATUS_FAILED
+        self.completed = timezone.now()
+        self.save()
+
+
+def report_job(method):
+    """Render the ModelAdmin method output using a background report job"""
+    @functools.wraps(method)
+    def wrapper(model_admin, request, *args, **kwargs):
+        if (not settings.REPORT_JOBS_ENABLED or
+                getattr(request, 'report_job', None)):
+            # Render the report immediately
+            return method(model_admin, request, *args, **kwargs)
+        job = ReportJob.objects.add_job(request=request,
+                                        model_admin=model_admin,
+                                        method=wrapper,
+                                        arguments=args,
+                                        keywords=kwargs)
+        model_admin.message_user(request, pgettext_lazy(
+            'ReportJob',
+            'The report "{NAME}" has been queued').format(NAME=job.name))
+        return redirect('admin:work_reportjob_changelist')
+    return wrapper
+
+
+class ReportJobAdmin(BaseModelAdmin):
+    change_list_template = 'work/report_jobs/change_list.html'
+    readonly_fields = ('id', 'user', 'name', 'model', 'method', 'arguments',
+                       'language', 'status', 'created', 'started', 'completed',
+                       'download', 'error')
+    exclude = ('result', )
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request).select_related('user')
+        # Show only the user jobs
+        if not request.user.is_superuser:
+            queryset = queryset.filter(user=request.user)
+        return queryset
+
+    def get_urls(self):
+        urls = [
+            path('<int:job_id>/download/',
+                 self.admin_site.admin_view(self.download_result)),
+        ] + super().get_urls()
+        return urls
+
+    def changelist_view(self, request, extra_context=None):
+        ReportJob.objects.fail_stale_jobs()
+        # Reload the page while some jobs are still in progress
+        extra_context = dict(
+            extra_context or {},
+            refresh=self.get_queryset(request).filter(
+                status__in=(ReportJob.STATUS_PENDING,
+                            ReportJob.STATUS_RUNNING)).exists(),
+            refresh_interval=settings.REPORT_JOBS_POLL_INTERVAL)
+        return super().changelist_view(request, extra_context)
+
+    def download(self, instance):
+        if instance.status == ReportJob.STATUS_COMPLETED and instance.result:
+            return format_html('<a href="{URL}">{TEXT}</a>',
+                               URL=reverse('admin:work_reportjob_changelist') +
+                               '{ID}/download/'.format(ID=instance.pk),
+                               TEXT=pgettext_lazy('ReportJob', 'Download'))
+        return ''
+    download.short_description = pgettext_lazy('ReportJob', 'Download')
+
+    def download_result(self, request, job_id):
+        """Download the result of a completed job"""
+        job = self.get_queryset(request).filter(
+            pk=job_id, status=ReportJob.STATUS_COMPLETED).first()
+        if not job or not job.result:
+            raise Http404
+        return FileResponse(job.result.open('rb'),
+                            as_attachment=True,
+                            filename=job.get_result_filename())
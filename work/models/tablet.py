@@ -66,9 +66,13 @@ class Tablet(BaseModel):
     def __str__(self):
         return 'Tablet {ID}'.format(ID=self.id)
 
+    def get_totp_key(self):
+        """Return the base32 TOTP key derived from the GUID"""
+        return base64.b32encode(self.guid.hex.encode()).decode('utf-8')
+
     def check_password(self, password):
-        key = base64.b32encode(self.guid.hex.encode()).decode('utf-8')
-        return pyotp.TOTP(key).verify(password, valid_window=1)
+        return pyotp.TOTP(self.get_totp_key()).verify(password,
+                                                      valid_window=1)
 
 
 class TabletAdmin(BaseModelAdmin):
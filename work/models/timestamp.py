@@ -18,29 +18,42 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 ##
 
+import array
 import collections
-import csv
 import datetime
-import io
+import itertools
 import locale
+import operator
 import sys
 
 from django.db import models
-from django.contrib import admin, messages
+from django.db.models.functions import FirstValue
+from django.contrib import admin
 from django.shortcuts import render, redirect
 from django.template.response import TemplateResponse
 from django.urls import path
 from django.utils.translation import pgettext_lazy
 
 from .contract import Contract
+from .report_job import report_job
 from .timestamp_direction import TimestampDirection
+from .timestamp_day import TimestampDay
+
+from hotels.models import Structure
 
 from utility.admin_widgets import AdminTimeWidget
 from utility.forms import CSVImportForm
-from utility.misc import (get_admin_options,
-                          xhtml2pdf_render_from_template_response)
+from utility.misc import (CSVForeignKey, CSVImporter, cache_report,
+                          get_admin_options,
+                          xhtml2pdf_render_from_template_response,
+                          xhtml2pdf_render_from_template_sections)
 from utility.models import BaseModel, BaseModelAdmin
 
+# Models used by the cached reports
+REPORT_MODELS = ('hotels.Company', 'hotels.Structure',
+                 'work.Contract', 'work.Employee',
+                 'work.Timestamp', 'work.TimestampDirection')
+
 
 class Timestamp(BaseModel):
     contract = models.ForeignKey('Contract',
@@ -95,9 +108,11 @@ class TimestampAdmin(BaseModelAdmin, AdminTimeWidget):
     readonly_fields = ('id', )
     radio_fields = {'direction': admin.HORIZONTAL}
     actions = ('action_timestamps_hours_csv',
+               'action_timestamps_hours_xlsx',
                'action_timestamps_hours_html',
                'action_timestamps_hours_pdf',
                'action_timestamps_days_csv',
+               'action_timestamps_days_xlsx',
                'action_timestamps_days_html',
                'action_timestamps_days_pdf')
     ordering = ['-date', '-time', 'contract']
@@ -133,85 +148,40 @@ class TimestampAdmin(BaseModelAdmin, AdminTimeWidget):
                 'employee', 'company')
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
-    def get_timestamps_hours(self, request, queryset):
-        queryset = queryset.order_by('date', 'contract', 'time')
-        # Save TimestampDirection keys for enter and exit
-        direction_enter = TimestampDirection.get_enter_direction().pk
-        direction_exit = TimestampDirection.get_exit_direction().pk
-        # Cycle each unique date/contract
-        last_date = None
-        last_contract_id = None
-        results = []
-        for timestamp in queryset:
-            # Skip duplicated date/contract_id
-            if (timestamp.date == last_date and
-                    timestamp.contract_id == last_contract_id):
-                continue
-            # Save unique date/contract_id
-            last_date = timestamp.date
-            last_contract_id = timestamp.contract_id
-            timestamp_export = TimestampHoursExport(timestamp)
-            # Process only Enter/Exit timestamps
-            for item in queryset.filter(date=last_date,
-                                        contract_id=last_contract_id,
-                                        direction__in=(direction_enter,
-                                                       direction_exit)):
-                if item.direction_id == direction_enter:
-                    if timestamp_export.exit_time:
-                        # Timestamp with a previous exit
-                        results.append(timestamp_export.extract())
-                        # Create new timestamp
-                        timestamp_export = TimestampHoursExport(timestamp)
-                    elif timestamp_export.enter_time:
-                        # Timestamp with multiple enter
-                        results.append(timestamp_export.extract())
-                        # Create new timestamp
-                        timestamp_export = TimestampHoursExport(timestamp)
-                    timestamp_export.enter_time = item.time
-                    timestamp_export.enter_description = item.description
-                else:
-                    if timestamp_export.exit_time:
-                        # Timestamp with multiple exit
-                        results.append(timestamp_export.extract())
-                        # Create new timestamp
-                        timestamp_export = TimestampHoursExport(timestamp)
-                    timestamp_export.exit_time = item.time
-                    timestamp_export.exit_description = item.description
-            # Export timestamp only if valid
-            if timestamp_export.is_valid():
-                results.append(timestamp_export.extract())
-            # Process only different timestamps
-            for item in queryset.filter(date=last_date,
-                                        contract_id=last_contract_id).exclude(
-                                            direction__in=(direction_enter,
-                                                           direction_exit)):
-                timestamp_export = TimestampHoursExport(timestamp)
-                timestamp_export.other_time = item.time
-                timestamp_export.other_description = item.direction.description
+    def iter_timestamps_hours(self, queryset):
+        """Pair the timestamps hours in a single pass"""
+        return TimestampHoursExport.iter_hours(queryset)
 
-                results.append(timestamp_export.extract())
+    def get_timestamps_hours(self, request, queryset):
         # Export data
         context = dict(
             # Include common variables for rendering the admin template
             self.admin_site.each_context(request),
-            results=results
+            results=list(self.iter_timestamps_hours(queryset))
         )
         return context
 
     def action_timestamps_hours_csv(self, request, queryset):
-        # Export data to CSV format
-        context = self.get_timestamps_hours(request, queryset)
-        # Add report preferences from AdminOptions
-        context.update(get_admin_options(self.__class__.__name__,
-                                         sys._getframe().f_code.co_name))
+        # Export data to CSV format while the timestamps are paired
         return self.do_export_data_to_csv(
-            data=context['results'],
+            data=self.iter_timestamps_hours(queryset),
             fields_map=TimestampHoursExport.fields_map,
             filename='timestamps_hours')
     action_timestamps_hours_csv.short_description = pgettext_lazy(
         'Timestamp',
         'Timestamps hours (CSV)')
 
+    def action_timestamps_hours_xlsx(self, request, queryset):
+        # Export data to XLSX format while the timestamps are paired
+        return self.do_export_data_to_xlsx(
+            data=self.iter_timestamps_hours(queryset),
+            fields_map=TimestampHoursExport.fields_map,
+            filename='timestamps_hours')
+    action_timestamps_hours_xlsx.short_description = pgettext_lazy(
+        'Timestamp',
+        'Timestamps hours (XLSX)')
+
+    @cache_report(*REPORT_MODELS)
     def action_timestamps_hours_html(self, request, queryset):
         context = self.get_timestamps_hours(request, queryset)
         # Add report preferences from AdminOptions
@@ -230,6 +200,8 @@ class TimestampAdmin(BaseModelAdmin, AdminTimeWidget):
         'Timestamp',
         'Timestamps hours (HTML)')
 
+    @cache_report(*REPORT_MODELS)
+    @report_job
     def action_timestamps_hours_pdf(self, request, queryset):
         context = self.get_timestamps_hours(request, queryset)
         # Add report preferences from AdminOptions
@@ -240,53 +212,82 @@ class TimestampAdmin(BaseModelAdmin, AdminTimeWidget):
         context['visible_columns'] = (
             [column.strip() for column in visible_columns.split(',')]
             if visible_columns else None)
-        response = xhtml2pdf_render_from_template_response(
-            response=TemplateResponse(request,
-                                      'work/timestamps_hours/pdf.html',
-                                      context),
-            filename='')
+        sections = []
+        if context.get('split_sections') == '1':
+            # Render a section for each employee using multiple processes
+            sections = [{'results': list(results)}
+                        for _, results in itertools.groupby(
+                            sorted(context['results'],
+                                   key=operator.itemgetter('contract_id')),
+                            key=operator.itemgetter('contract_id'))]
+        if sections:
+            response = xhtml2pdf_render_from_template_sections(
+                request=request,
+                template='work/timestamps_hours/pdf.html',
+                context=context,
+                sections=sections,
+                filename='')
+        else:
+            response = xhtml2pdf_render_from_template_response(
+                response=TemplateResponse(request,
+                                          'work/timestamps_hours/pdf.html',
+                                          context),
+                filename='')
         return response
     action_timestamps_hours_pdf.short_description = pgettext_lazy(
         'Timestamp',
         'Timestamps hours (PDF)')
 
     def get_timestamps_days(self, request, queryset):
-        queryset = queryset.order_by('structure', 'contract', 'date', 'time')
+        queryset = queryset.order_by()
         # Get minimum and maximum dates
         range_dates = queryset.aggregate(models.Min('date'),
                                          models.Max('date'))
         date_min = range_dates['date__min']
         date_max = range_dates['date__max']
+        ordinals = range(date_min.toordinal(), date_max.toordinal() + 1)
         # Save TimestampDirection keys for enter and exit
         direction_enter = TimestampDirection.get_enter_direction()
         direction_exit = TimestampDirection.get_exit_direction()
-        # Cycle each unique date/contract
-        saved_contract_id = None
-        results = []
-        for timestamp in queryset:
-            saved_date = None
-            # Skip duplicated contract_id
-            if timestamp.contract_id == saved_contract_id:
-                continue
-            # Save unique contract_id
-            saved_contract_id = timestamp.contract_id
-            timestamp_export = TimestampDaysExport(timestamp)
-            for item in queryset.filter(contract_id=saved_contract_id):
-                # Skip duplicated date
-                if item.date == saved_date:
-                    continue
-                saved_date = item.date
-                # Use enter short code for exit direction
-                timestamp_direction = (
-                    direction_enter
-                    if item.direction_id == direction_exit.pk
-                    else item.direction)
-                timestamp_export.dates[item.date.toordinal()] = (
-                    timestamp_direction.short_code)
-            results.append(timestamp_export.extract(
-                date_min=date_min,
-                date_max=date_max,
-                working_short_code=direction_enter.short_code))
+        # Short codes for each direction, the index 0 is used for no data
+        short_codes = [None]
+        directions_index = {}
+        for direction_id, short_code in (
+                TimestampDirection.objects.values_list('id', 'short_code')):
+            directions_index[direction_id] = len(short_codes)
+            short_codes.append(short_code)
+        # Use enter short code for exit direction
+        directions_index[direction_exit.pk] = (
+            directions_index[direction_enter.pk])
+        # Build the contracts x days matrix using the first direction of
+        # each contract and date
+        matrix = {}
+        for contract_id, date, direction_id in queryset.annotate(
+                first_direction=models.Window(
+                    expression=FirstValue('direction'),
+                    partition_by=[models.F('contract'), models.F('date')],
+                    order_by=models.F('time').asc())).values_list(
+                        'contract', 'date', 'first_direction').distinct(
+                        ).iterator():
+            if contract_id not in matrix:
+                matrix[contract_id] = array.array('H', [0]) * len(ordinals)
+            matrix[contract_id][date.toordinal() - date_min.toordinal()] = (
+                directions_index[direction_id])
+        # Get unique structure/contract rows
+        rows = queryset.order_by('structure', 'contract').values_list(
+            'structure', 'contract').distinct()
+        structures = Structure.objects.select_related('company').in_bulk(
+            set(row[0] for row in rows))
+        contracts = Contract.objects.select_related('employee').in_bulk(
+            matrix.keys())
+        # Rows are extracted only while the results are iterated
+        results = (TimestampDaysExport(structure=structures[structure_id],
+                                       contract=contracts[contract_id],
+                                       days=matrix[contract_id]).extract(
+                       ordinals=ordinals,
+                       short_codes=short_codes,
+                       working_index=directions_index[direction_enter.pk])
+                   for structure_id, contract_id in rows)
         # Export data
         Direction = collections.namedtuple('Direction', 'short_code name')
         context = dict(
@@ -294,11 +295,9 @@ class TimestampAdmin(BaseModelAdmin, AdminTimeWidget):
             self.admin_site.each_context(request),
             results=results,
             # Ordinals are the numeric days, used for keys
-            ordinals=range(date_min.toordinal(), date_max.toordinal() + 1),
+            ordinals=ordinals,
             # Dates are the date objects
-            dates=[datetime.date.fromordinal(day)
-                   for day
-                   in range(date_min.toordinal(), date_max.toordinal() + 1)],
+            dates=[datetime.date.fromordinal(day) for day in ordinals],
             # Directions for final report data
             directions=[Direction(item[0], item[1])
                         for item in (TimestampDirection.objects.exclude(
@@ -315,17 +314,36 @@ class TimestampAdmin(BaseModelAdmin, AdminTimeWidget):
                                          sys._getframe().f_code.co_name))
         return self.do_export_data_to_csv(
             data=context['results'],
-            fields_map=dict(
-                **TimestampDaysExport.fields_map,
-                **dict([(datetime.date.fromordinal(day).strftime(
-                        # Format dates headers
-                        context.get('format_date', '%F')), day)
-                        for day in context['ordinals']])),
+            fields_map=self.get_timestamps_days_fields_map(context),
             filename='timestamps_days')
     action_timestamps_days_csv.short_description = pgettext_lazy(
         'Timestamp',
         'Timestamps days (CSV)')
 
+    def action_timestamps_days_xlsx(self, request, queryset):
+        # Export data to XLSX format
+        context = self.get_timestamps_days(request, queryset)
+        # Add report preferences from AdminOptions
+        context.update(get_admin_options(self.__class__.__name__,
+                                         sys._getframe().f_code.co_name))
+        return self.do_export_data_to_xlsx(
+            data=context['results'],
+            fields_map=self.get_timestamps_days_fields_map(context),
+            filename='timestamps_days')
+    action_timestamps_days_xlsx.short_description = pgettext_lazy(
+        'Timestamp',
+        'Timestamps days (XLSX)')
+
+    def get_timestamps_days_fields_map(self, context):
+        # Add a column for each day to the exported fields
+        return dict(
+            **TimestampDaysExport.fields_map,
+            **dict([(datetime.date.fromordinal(day).strftime(
+                    # Format dates headers
+                    context.get('format_date', '%F')), day)
+                    for day in context['ordinals']]))
+
+    @cache_report(*REPORT_MODELS)
     def action_timestamps_days_html(self, request, queryset):
         context = self.get_timestamps_days(request, queryset)
         # Add report preferences from AdminOptions
@@ -355,6 +373,8 @@ class TimestampAdmin(BaseModelAdmin, AdminTimeWidget):
         'Timestamp',
         'Timestamps days (HTML)')
 
+    @cache_report(*REPORT_MODELS)
+    @report_job
     def action_timestamps_days_pdf(self, request, queryset):
         context = self.get_timestamps_days(request, queryset)
         # Add report preferences from AdminOptions
@@ -376,65 +396,60 @@ class TimestampAdmin(BaseModelAdmin, AdminTimeWidget):
         if context.get('format_date'):
             context['dates'] = [date.strftime(context['format_date'])
                                 for date in context['dates']]
-        response = xhtml2pdf_render_from_template_response(
-            response=TemplateResponse(request,
-                                      'work/timestamps_days/pdf.html',
-                                      context),
-            filename='')
+        sections = []
+        if context.get('split_sections') == '1':
+            # Render a section for each structure using multiple processes
+            sections = [{'results': list(results), 'directions': None}
+                        for _, results in itertools.groupby(
+                            context['results'],
+                            key=lambda item: item['structure'].pk)]
+        if sections:
+            # The directions are shown only after the last section
+            sections[-1]['directions'] = context['directions']
+            response = xhtml2pdf_render_from_template_sections(
+                request=request,
+                template='work/timestamps_days/pdf.html',
+                context=context,
+                sections=sections,
+                filename='')
+        else:
+            response = xhtml2pdf_render_from_template_response(
+                response=TemplateResponse(request,
+                                          'work/timestamps_days/pdf.html',
+                                          context),
+                filename='')
         return response
     action_timestamps_days_pdf.short_description = pgettext_lazy(
         'Timestamp',
         'Timestamps days (PDF)')
 
     def import_csv(self, request):
-        def append_error(type_name, item):
-            """Append an error message to the messages list"""
-            error_message = pgettext_lazy(
-                'Timestamp',
-                'Unexpected {TYPE} "{ITEM}"').format(TYPE=type_name,
-                                                     ITEM=item)
-            if error_message not in error_messages:
-                error_messages.append(error_message)
-                self.message_user(request, error_message, messages.ERROR)
-
         if request.method == 'POST':
-            # Preload contracts
-            contracts = {}
-            for item in Contract.objects.all():
-                contracts[str(item.id)] = item
-            # Preload timestamp directions
-            directions = {}
-            for item in TimestampDirection.objects.all():
-                directions[str(item)] = item
-            # Load CSV file content
-            csv_file = io.TextIOWrapper(
-                request.FILES['csv_file'].file,
-                encoding=request.POST['encoding'])
-            reader = csv.DictReader(
-                csv_file,
-                delimiter=request.POST['delimiter'])
-            # Load data from CSV
-            error_messages = []
-            timestamps = []
-            for row in reader:
-                if row['DIRECTION'] not in directions:
-                    append_error('direction', row['DIRECTION'])
-                elif row['CONTRACT'] not in contracts:
-                    append_error('contract', row['CONTRACT'])
-                else:
-                    # If no error create a new Timestamp object
-                    timestamps.append(Timestamp(
-                        contract=contracts[row['CONTRACT']],
-                        direction=directions[row['DIRECTION']],
-                        date=row['DATE'],
-                        time=row['TIME'],
-                        description=row['DESCRIPTION']))
-            # Save data only if there were not errors
-            if not error_messages:
-                Timestamp.objects.bulk_create(timestamps)
-                self.message_user(request, pgettext_lazy(
-                    'Timestamp',
-                    'Your CSV file has been imported'))
+            # Resolve contracts and timestamp directions
+            contracts = CSVForeignKey(queryset=Contract.objects.all(),
+                                      type_name='contract',
+                                      field='id')
+            directions = CSVForeignKey(
+                queryset=TimestampDirection.objects.all(),
+                type_name='direction',
+                field='name')
+            # Load data from CSV, skipping the existing timestamps
+            importer = CSVImporter(model=Timestamp, ignore_conflicts=True)
+            importer.import_file(
+                file=request.FILES['csv_file'].file,
+                encoding=request.POST['encoding'],
+                delimiter=request.POST['delimiter'],
+                create_object=lambda row: Timestamp(
+                    contract=contracts.get(row['CONTRACT']),
+                    direction=directions.get(row['DIRECTION']),
+                    date=row['DATE'],
+                    time=row['TIME'],
+                    description=row['DESCRIPTION']),
+                # Compute again the days of the imported timestamps
+                after_save=lambda objects: (
+                    TimestampDay.objects.refresh_on_commit(
+                        (obj.contract_id, obj.date) for obj in objects)))
+            importer.message_user(self, request)
             return redirect('..')
         return render(request,
                       'utility/import_csv/form.html',
@@ -456,6 +471,58 @@ class TimestampHoursExport(object):
                   'NOTES': 'notes',
                   }
 
+    @classmethod
+    def iter_hours(cls, queryset):
+        """Pair the timestamps hours in a single pass"""
+        queryset = queryset.select_related(
+            'contract__employee', 'structure__company', 'direction').order_by(
+            'date', 'contract', 'time')
+        # Save TimestampDirection keys for enter and exit
+        direction_enter = TimestampDirection.get_enter_direction().pk
+        direction_exit = TimestampDirection.get_exit_direction().pk
+        # Cycle each unique date/contract
+        for _, items in itertools.groupby(
+                queryset.iterator(),
+                key=operator.attrgetter('date', 'contract_id')):
+            # The first timestamp is used for every row of the date/contract
+            timestamp = next(items)
+            timestamp_export = cls(timestamp)
+            others = []
+            for item in itertools.chain((timestamp, ), items):
+                if item.direction_id == direction_enter:
+                    if timestamp_export.exit_time:
+                        # Timestamp with a previous exit
+                        yield timestamp_export.extract()
+                        # Create new timestamp
+                        timestamp_export = cls(timestamp)
+                    elif timestamp_export.enter_time:
+                        # Timestamp with multiple enter
+                        yield timestamp_export.extract()
+                        # Create new timestamp
+                        timestamp_export = cls(timestamp)
+                    timestamp_export.enter_time = item.time
+                    timestamp_export.enter_description = item.description
+                elif item.direction_id == direction_exit:
+                    if timestamp_export.exit_time:
+                        # Timestamp with multiple exit
+                        yield timestamp_export.extract()
+                        # Create new timestamp
+                        timestamp_export = cls(timestamp)
+                    timestamp_export.exit_time = item.time
+                    timestamp_export.exit_description = item.description
+                else:
+                    # Different timestamps are exported after enter/exit
+                    others.append(item)
+            # Export timestamp only if valid
+            if timestamp_export.is_valid():
+                yield timestamp_export.extract()
+            # Process only different timestamps
+            for item in others:
+                timestamp_export = cls(timestamp)
+                timestamp_export.other_time = item.time
+                timestamp_export.other_description = item.direction.description
+                yield timestamp_export.extract()
+
     def __init__(self, timestamp):
         self.date = timestamp.date
         self.contract = timestamp.contract
@@ -514,23 +581,21 @@ class TimestampDaysExport(object):
                   'WORKING DAYS': 'working_days',
                   }
 
-    def __init__(self, timestamp):
-        self.contract = timestamp.contract
-        self.structure = timestamp.structure
-        self.dates = {}
+    def __init__(self, structure, contract, days):
+        self.contract = contract
+        self.structure = structure
+        # Short codes indexes for each day
+        self.days = days
 
     def is_valid(self):
-        return any((self.dates.keys(), ))
+        return any(self.days)
 
-    def extract(self, date_min, date_max, working_short_code):
-        results = dict([(day, self.dates.get(day))
-                        for day in range(date_min.toordinal(),
-                                         date_max.toordinal() + 1)])
+    def extract(self, ordinals, short_codes, working_index):
+        results = dict(zip(ordinals, map(short_codes.__getitem__, self.days)))
         results['company'] = self.structure.company
         results['structure'] = self.structure
         results['contract_id'] = self.contract.pk
         results['employee'] = self.contract.employee
         results['roll_number'] = self.contract.roll_number
-        results['working_days'] = list(self.dates.values()).count(
-            working_short_code)
+        results['working_days'] = self.days.count(working_index)
         return results
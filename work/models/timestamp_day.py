@@ -0,0 +1,158 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import collections
+import datetime
+import functools
+import itertools
+import operator
+
+from django.db import connections, models, transaction
+from django.utils.translation import pgettext_lazy
+
+from . import timestamp
+
+from utility.misc import on_commit_keys
+from utility.models import BaseModel, BaseModelAdmin
+
+
+class TimestampDayManager(models.Manager):
+    def iter_days(self, queryset):
+        """Sum the paired timestamps hours for each contract/structure/day"""
+        for (date, contract_id), items in itertools.groupby(
+                timestamp.TimestampHoursExport.iter_hours(queryset),
+                key=operator.itemgetter('date', 'contract_id')):
+            days = collections.OrderedDict()
+            for item in items:
+                if item['other']:
+                    # Skip the different timestamps (holiday, etc)
+                    continue
+                day = days.get(item['structure'].pk)
+                if not day:
+                    day = TimestampDay(contract_id=contract_id,
+                                       structure_id=item['structure'].pk,
+                                       date=date,
+                                       pairs=0,
+                                       duration=datetime.timedelta(),
+                                       anomalies=0)
+                    days[day.structure_id] = day
+                if item['notes']:
+                    # Missing enter or exit time
+                    day.anomalies += 1
+                else:
+                    day.pairs += 1
+                    day.duration += item['duration']
+            yield from days.values()
+
+    def save_days(self, queryset, batch_size=2000):
+        """Compute and save the days for the timestamps queryset"""
+        count = 0
+        days = self.iter_days(queryset)
+        while True:
+            batch = list(itertools.islice(days, batch_size))
+            if not batch:
+                break
+            self.bulk_create(batch)
+            count += len(batch)
+        return count
+
+    def refresh(self, keys):
+        """Compute again the days for the (contract id, date) keys"""
+        dates = collections.defaultdict(set)
+        for contract_id, date in keys:
+            dates[date].add(contract_id)
+        if not dates:
+            return 0
+        query = functools.reduce(operator.or_, (
+            models.Q(date=date, contract_id__in=contracts)
+            for date, contracts in dates.items()))
+        with transaction.atomic():
+            if connections[self.db].features.has_select_for_update:
+                # Wait for the other refreshes of the same contracts
+                list(self.model.contract.field.related_model.objects.filter(
+                    pk__in=set().union(*dates.values())).order_by(
+                        'pk').select_for_update().values_list('pk',
+                                                              flat=True))
+            self.filter(query).delete()
+            return self.save_days(timestamp.Timestamp.objects.filter(query))
+
+    def refresh_on_commit(self, keys):
+        """Compute again the days for the keys after the transaction"""
+        on_commit_keys(self.refresh, keys)
+
+    def rebuild(self, date_from=None, date_to=None):
+        """Compute again every day or the days in the dates range"""
+        query = models.Q()
+        if date_from:
+            query &= models.Q(date__gte=date_from)
+        if date_to:
+            query &= models.Q(date__lte=date_to)
+        with transaction.atomic():
+            self.filter(query).delete()
+            return self.save_days(timestamp.Timestamp.objects.filter(query))
+
+
+class TimestampDay(BaseModel):
+    # Define custom manager
+    objects = TimestampDayManager()
+
+    contract = models.ForeignKey('Contract',
+                                 on_delete=models.CASCADE,
+                                 verbose_name=pgettext_lazy('TimestampDay',
+                                                            'contract'))
+    structure = models.ForeignKey('hotels.Structure',
+                                  on_delete=models.CASCADE,
+                                  verbose_name=pgettext_lazy('TimestampDay',
+                                                             'structure'))
+    date = models.DateField(db_index=True,
+                            verbose_name=pgettext_lazy('TimestampDay',
+                                                       'date'))
+    pairs = models.PositiveIntegerField(
+        verbose_name=pgettext_lazy('TimestampDay', 'pairs'))
+    duration = models.DurationField(
+        verbose_name=pgettext_lazy('TimestampDay', 'duration'))
+    anomalies = models.PositiveIntegerField(
+        verbose_name=pgettext_lazy('TimestampDay', 'anomalies'))
+
+    class Meta:
+        # Define the database table
+        db_table = 'work_timestamp_days'
+        ordering = ['contract', 'date', 'structure']
+        unique_together = ('contract', 'structure', 'date')
+        verbose_name = pgettext_lazy('TimestampDay', 'Timestamp day')
+        verbose_name_plural = pgettext_lazy('TimestampDay', 'Timestamp days')
+
+    def __str__(self):
+        return '{CONTRACT} {STRUCTURE} {DATE}'.format(
+            CONTRACT=self.contract,
+            STRUCTURE=self.structure,
+            DATE=self.date)
+
+
+class TimestampDayAdmin(BaseModelAdmin):
+    date_hierarchy = 'date'
+    list_select_related = ('contract', 'contract__employee', 'structure')
+    ordering = ['-date', 'contract', 'structure']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
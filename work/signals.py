@@ -0,0 +1,142 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import (Activity, ActivityRoom, ActivityStat, Contract,
+                     Timestamp, TimestampDay)
+
+from hotels.models import Building, Room, Service
+
+
+@receiver(pre_save, sender=Timestamp)
+def save_timestamp_previous_day(sender, instance, raw, **kwargs):
+    """Save the previous contract and date of the changed timestamp"""
+    if instance.pk and not raw:
+        instance.previous_day = Timestamp.objects.filter(
+            pk=instance.pk).values_list('contract_id', 'date').first()
+
+
+@receiver(post_save, sender=Timestamp)
+@receiver(post_delete, sender=Timestamp)
+def refresh_timestamp_days(sender, instance, **kwargs):
+    """Compute again the worked hours of the changed timestamp days"""
+    if kwargs.get('raw'):
+        return
+    keys = [(instance.contract_id, instance.date)]
+    previous_day = getattr(instance, 'previous_day', None)
+    if previous_day:
+        keys.append(previous_day)
+    TimestampDay.objects.refresh_on_commit(keys)
+
+
+@receiver(pre_save, sender=Activity)
+def save_activity_previous_month(sender, instance, raw, **kwargs):
+    """Save the previous contract and date of the changed activity"""
+    if instance.pk and not raw:
+        instance.previous_month = Activity.objects.filter(
+            pk=instance.pk).values_list('contract_id', 'date').first()
+
+
+@receiver(post_save, sender=Activity)
+def refresh_activity_stats(sender, instance, created, raw, **kwargs):
+    """Compute again the statistics of the moved activity rooms"""
+    previous_month = getattr(instance, 'previous_month', None)
+    if (not created and not raw and previous_month and
+            previous_month != (instance.contract_id, instance.date)):
+        ActivityStat.objects.refresh_on_commit(
+            [previous_month, (instance.contract_id, instance.date)])
+
+
+@receiver(post_delete, sender=Activity)
+def refresh_deleted_activity_stats(sender, instance, **kwargs):
+    """Compute again the statistics of the deleted activity month"""
+    # The activity rooms deleted in the same transaction can't find it
+    ActivityStat.objects.refresh_on_commit(
+        [(instance.contract_id, instance.date)])
+
+
+@receiver(pre_save, sender=ActivityRoom)
+def save_activity_room_previous_activity(sender, instance, raw, **kwargs):
+    """Save the previous activity of the changed activity room"""
+    if instance.pk and not raw:
+        instance.previous_activity_id = ActivityRoom.objects.filter(
+            pk=instance.pk).values_list('activity_id', flat=True).first()
+
+
+@receiver(post_save, sender=ActivityRoom)
+@receiver(post_delete, sender=ActivityRoom)
+def refresh_activity_room_stats(sender, instance, **kwargs):
+    """Compute again the statistics of the changed activity room month"""
+    if kwargs.get('raw'):
+        return
+    activity_ids = {instance.activity_id,
+                    getattr(instance, 'previous_activity_id', None)}
+    activity_ids.discard(None)
+    ActivityStat.objects.refresh_activities_on_commit(activity_ids)
+
+
+@receiver(pre_save, sender=Building)
+@receiver(pre_save, sender=Room)
+@receiver(pre_save, sender=Service)
+def save_activity_stats_previous_group(sender, instance, raw, **kwargs):
+    """Save the previous structure or service type of the changed object"""
+    if instance.pk and not raw:
+        field = {Building: 'structure_id',
+                 Room: 'building_id',
+                 Service: 'service_type_id'}[sender]
+        instance.previous_group = sender.objects.filter(
+            pk=instance.pk).values_list(field, flat=True).first()
+
+
+@receiver(post_save, sender=Building)
+@receiver(post_save, sender=Room)
+@receiver(post_save, sender=Service)
+def refresh_activity_stats_group(sender, instance, raw, **kwargs):
+    """Compute again the statistics of the moved rooms or services"""
+    field, filters = {
+        Building: ('structure_id', {'room__building': instance.pk}),
+        Room: ('building_id', {'room': instance.pk}),
+        Service: ('service_type_id', {'service': instance.pk})}[sender]
+    previous_group = getattr(instance, 'previous_group', None)
+    if (not raw and previous_group is not None and
+            previous_group != getattr(instance, field)):
+        ActivityStat.objects.refresh_rooms_on_commit(**filters)
+
+
+@receiver(pre_save, sender=Contract)
+def save_contract_previous_employee(sender, instance, raw, **kwargs):
+    """Save the previous employee of the changed contract"""
+    if instance.pk and not raw:
+        instance.previous_employee_id = Contract.objects.filter(
+            pk=instance.pk).values_list('employee_id', flat=True).first()
+
+
+@receiver(post_save, sender=Contract)
+@receiver(post_delete, sender=Contract)
+def refresh_employee_active_contract(sender, instance, **kwargs):
+    """Save the active contract of the changed contract employees"""
+    if kwargs.get('raw'):
+        return
+    employee_ids = {instance.employee_id,
+                    getattr(instance, 'previous_employee_id', None)}
+    employee_ids.discard(None)
+    Contract.objects.refresh_active_contracts(employee_ids)
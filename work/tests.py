@@ -0,0 +1,558 @@
+##
+#     Project: Django Hotels
+# Description: A Django application to organize Hotels and Inns
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2018-2020 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import collections
+import datetime
+import io
+import re
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import zipfile
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from hotels.models import (BedType, Brand, Building, Company, Room, RoomType,
+                           Service, ServiceType, Structure)
+
+from locations.models import Continent, Country, Location, Position, Region
+
+from utility.misc import insert_or_get, report_cache
+
+from website.models import AdminOption
+
+from work.models import (Activity, ActivityRoom, ActivityStat, Contract,
+                         ContractType, Employee, JobType, ReportJob,
+                         Timestamp, TimestampDay, TimestampDirection)
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+
+def get_xlsx_strings(content):
+    """Return the text cells of the first sheet of a XLSX file"""
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        strings = (archive.read('xl/sharedStrings.xml').decode('utf-8')
+                   if 'xl/sharedStrings.xml' in archive.namelist() else '')
+    # The strings are saved inline or in the shared strings table
+    return re.findall(r'<t(?: [^>]*)?>([^<]*)</t>', sheet + strings)
+
+
+class WorkTestData(object):
+    def create_data(self):
+        """Create a company with a structure, some rooms and contracts"""
+        continent = Continent.objects.create(name='Europe')
+        country = Country.objects.create(name='Italy', continent=continent)
+        position = Position.objects.create(name='Rome')
+        region = Region.objects.create(name='Lazio',
+                                       country=country,
+                                       position=position)
+        self.location = Location.objects.create(name='Rome',
+                                                region=region,
+                                                province='RM')
+        self.company = Company.objects.create(name='Company')
+        self.structure = Structure.objects.create(
+            name='Structure',
+            company=self.company,
+            brand=Brand.objects.create(name='Brand'),
+            location=self.location)
+        self.building = Building.objects.create(name='Building',
+                                                structure=self.structure,
+                                                location=self.location)
+        room_type = RoomType.objects.create(name='Single')
+        bed_type = BedType.objects.create(name='Single')
+        self.rooms = [Room.objects.create(name='Room {INDEX}'.format(
+                                              INDEX=index),
+                                          building=self.building,
+                                          room_type=room_type,
+                                          bed_type=bed_type)
+                      for index in range(3)]
+        self.service_type = ServiceType.objects.create(name='Cleaning',
+                                                       order=1)
+        self.service = Service.objects.create(name='Cleaning',
+                                              room_service=True,
+                                              service_type=self.service_type)
+        self.contract_type = ContractType.objects.create(name='Full time',
+                                                         daily_hours=8,
+                                                         weekly_hours=40)
+        self.job_type = JobType.objects.create(name='Maid')
+        self.contracts = [self.create_contract(index) for index in range(2)]
+
+    def create_contract(self, index, **kwargs):
+        """Create a new employee with a contract"""
+        employee = Employee.objects.create(
+            first_name='Employee',
+            last_name=str(index),
+            birth_date=datetime.date(1980, 1, 1),
+            birth_location=self.location,
+            location=self.location,
+            permit_location=self.location,
+            tax_code='{INDEX}-{COUNT}'.format(
+                INDEX=index, COUNT=Employee.objects.count()))
+        values = dict(employee=employee,
+                      company=self.company,
+                      contract_type=self.contract_type,
+                      job_type=self.job_type,
+                      roll_number=str(index),
+                      start_date=datetime.date(2020, 1, 1),
+                      level=1,
+                      associated=False)
+        values.update(kwargs)
+        return Contract.objects.create(**values)
+
+    def create_activity(self, contract, date, rooms):
+        """Create an activity with some cleaned rooms"""
+        activity = Activity.objects.create(contract=contract, date=date)
+        for room in rooms:
+            ActivityRoom.objects.create(activity=activity,
+                                        room=room,
+                                        service=self.service)
+        return activity
+
+
+class ActivityExportMonthlyTest(WorkTestData, TestCase):
+    def setUp(self):
+        self.create_data()
+        self.activity = self.create_activity(self.contracts[0],
+                                             datetime.date(2020, 3, 2),
+                                             self.rooms[:2])
+        self.create_activity(self.contracts[1],
+                             datetime.date(2020, 3, 3),
+                             self.rooms)
+        self.client.force_login(User.objects.create_superuser(
+            'admin', 'admin@localhost', 'password'))
+        # Use an empty reports cache
+        cache_path = report_cache.path
+        report_cache.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, report_cache.path)
+        self.addCleanup(setattr, report_cache, 'path', cache_path)
+
+    def get_export(self, view):
+        """Request an export for the activity month"""
+        response = self.client.get('{URL}{ID}/{VIEW}'.format(
+            URL=reverse('admin:work_activity_changelist'),
+            ID=self.activity.pk,
+            VIEW=view))
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_export_monthly(self):
+        content = self.get_export('export_monthly').decode('utf-8')
+        self.assertIn('Cleaning', content)
+        # Only the activity contract is exported, a row for each day
+        self.assertEqual(content.count('Employee 0'), 31)
+        self.assertNotIn('Employee 1', content)
+        # The repeated export is read from the reports cache
+        self.assertEqual(self.get_export('export_monthly'), content.encode())
+
+    @override_settings(REPORT_CACHE_ENABLED=False)
+    def test_export_monthly_without_cache(self):
+        content = self.get_export('export_monthly').decode('utf-8')
+        self.assertEqual(content.count('Employee 0'), 31)
+
+    @unittest.skipIf(xlsxwriter is None, 'xlsxwriter is not installed')
+    def test_export_monthly_xlsx(self):
+        strings = get_xlsx_strings(self.get_export('export_monthly_xlsx'))
+        self.assertIn('Cleaning', strings)
+        self.assertEqual(strings.count('Employee 0'), 31)
+        self.assertNotIn('Employee 1', strings)
+
+    def test_export_monthly_company(self):
+        # Add a contract of another company
+        other = self.create_contract(9, company=Company.objects.create(
+            name='Other company'))
+        self.create_activity(other, datetime.date(2020, 3, 4), self.rooms)
+        content = self.get_export('export_monthly_company').decode('utf-8')
+        self.assertEqual(content.count('Employee 0'), 31)
+        self.assertEqual(content.count('Employee 1'), 31)
+        self.assertNotIn('Employee 9', content)
+
+    @unittest.skipIf(xlsxwriter is None, 'xlsxwriter is not installed')
+    def test_export_monthly_company_xlsx(self):
+        strings = get_xlsx_strings(
+            self.get_export('export_monthly_company_xlsx'))
+        self.assertEqual(strings.count('Employee 0'), 31)
+        self.assertEqual(strings.count('Employee 1'), 31)
+
+
+class ReportJobTest(WorkTestData, TestCase):
+    def setUp(self):
+        self.create_data()
+        self.user = User.objects.create_superuser('admin',
+                                                  'admin@localhost',
+                                                  'password')
+        self.client.force_login(self.user)
+        AdminOption.objects.create(section='ContractAdmin',
+                                   name='contract_id_card',
+                                   value='<p>{EMPLOYEE_LAST_NAME}</p>')
+        # Save the results in an empty directory
+        jobs_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, jobs_path)
+        settings_override = override_settings(REPORT_JOBS_ENABLED=True,
+                                              REPORT_JOBS_PATH=jobs_path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def get_idcard(self):
+        """Request the ID card of the first contract"""
+        return self.client.get('{URL}{ID}/idcard/'.format(
+            URL=reverse('admin:work_contract_changelist'),
+            ID=self.contracts[0].pk))
+
+    def test_idcard_job(self):
+        response = self.get_idcard()
+        self.assertRedirects(response,
+                             reverse('admin:work_reportjob_changelist'))
+        job = ReportJob.objects.get()
+        self.assertEqual(job.method, 'idcard')
+        self.assertEqual(job.user, self.user)
+        job = ReportJob.objects.get_next_job()
+        self.assertEqual(job.status, ReportJob.STATUS_RUNNING)
+        job.run()
+        self.assertEqual(job.status, ReportJob.STATUS_COMPLETED, job.error)
+        # The result is saved outside of the media files
+        self.assertTrue(job.result.path.startswith(
+            job.result.storage.location))
+        response = self.client.get('{URL}{ID}/download/'.format(
+            URL=reverse('admin:work_reportjob_changelist'),
+            ID=job.pk))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(
+            b'%PDF'))
+
+    @override_settings(REPORT_JOBS_ENABLED=False)
+    def test_idcard_without_job(self):
+        response = self.get_idcard()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertFalse(ReportJob.objects.exists())
+
+    def test_job_without_arguments(self):
+        request = self.client.get(
+            reverse('admin:work_reportjob_changelist')).wsgi_request
+        job = ReportJob.objects.add_job(
+            request=request,
+            model_admin=admin.site._registry[Contract],
+            method=admin.site._registry[Contract].idcard,
+            arguments=())
+        self.assertEqual(job.status, ReportJob.STATUS_PENDING)
+
+    def test_deleted_user_job(self):
+        self.get_idcard()
+        self.user.delete()
+        job = ReportJob.objects.get_next_job()
+        job.run()
+        self.assertEqual(job.status, ReportJob.STATUS_FAILED)
+
+    def test_stale_running_job(self):
+        self.get_idcard()
+        job = ReportJob.objects.get_next_job()
+        ReportJob.objects.filter(pk=job.pk).update(
+            started=timezone.now() - datetime.timedelta(days=1))
+        self.assertIsNone(ReportJob.objects.get_next_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJob.STATUS_FAILED)
+
+
+class TimestampDayTest(WorkTestData, TransactionTestCase):
+    def setUp(self):
+        self.create_data()
+        self.enter = TimestampDirection.objects.create(name='Enter',
+                                                       short_code='E',
+                                                       type_enter=True,
+                                                       type_exit=False)
+        self.exit = TimestampDirection.objects.create(name='Exit',
+                                                      short_code='X',
+                                                      type_enter=False,
+                                                      type_exit=True)
+
+    def add_timestamps(self, contract, date, times):
+        """Add the enter and exit timestamps for the day"""
+        for index, time in enumerate(times):
+            Timestamp.objects.create(
+                contract=contract,
+                structure=self.structure,
+                direction=self.exit if index % 2 else self.enter,
+                date=date,
+                time=time)
+
+    def get_days(self):
+        """Return the saved days values"""
+        return list(TimestampDay.objects.order_by(
+            'contract', 'date').values_list('contract', 'date', 'pairs',
+                                            'duration', 'anomalies'))
+
+    def test_refresh(self):
+        date = datetime.date(2020, 3, 2)
+        self.add_timestamps(self.contracts[0], date,
+                            (datetime.time(8), datetime.time(12),
+                             datetime.time(13)))
+        self.assertEqual(self.get_days(), [
+            (self.contracts[0].pk, date, 1, datetime.timedelta(hours=4), 1)])
+        # The rebuild computes the same days
+        TimestampDay.objects.rebuild()
+        self.assertEqual(self.get_days(), [
+            (self.contracts[0].pk, date, 1, datetime.timedelta(hours=4), 1)])
+        Timestamp.objects.filter(time=datetime.time(13)).delete()
+        self.assertEqual(self.get_days(), [
+            (self.contracts[0].pk, date, 1, datetime.timedelta(hours=4), 0)])
+
+    def test_refresh_once_per_transaction(self):
+        date = datetime.date(2020, 3, 2)
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                self.add_timestamps(self.contracts[0], date,
+                                    [datetime.time(hour)
+                                     for hour in range(6, 18)])
+        self.assertEqual(self.get_days(), [
+            (self.contracts[0].pk, date, 6, datetime.timedelta(hours=6), 0)])
+        self.assertEqual(len([query for query in queries.captured_queries
+                              if query['sql'].startswith(
+                                  'INSERT INTO "work_timestamp_days"')]), 1)
+
+    def test_refresh_rollback(self):
+        date = datetime.date(2020, 3, 2)
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                self.add_timestamps(self.contracts[0], date,
+                                    (datetime.time(8), ))
+                raise ValueError
+        self.add_timestamps(self.contracts[1], date,
+                            (datetime.time(8), datetime.time(9)))
+        self.assertEqual(self.get_days(), [
+            (self.contracts[1].pk, date, 1, datetime.timedelta(hours=1), 0)])
+
+    def test_timestamps_hours(self):
+        date = datetime.date(2020, 3, 2)
+        self.add_timestamps(self.contracts[0], date,
+                            (datetime.time(8), datetime.time(12),
+                             datetime.time(13)))
+        self.add_timestamps(self.contracts[1], date,
+                            (datetime.time(9), datetime.time(10)))
+        # The timestamps are read once with their related rows
+        with self.assertNumQueries(3):
+            rows = [(row['contract_id'], row['enter'], row['exit'],
+                     row['employee'].last_name)
+                    for row in admin.site._registry[
+                        Timestamp].iter_timestamps_hours(
+                            Timestamp.objects.all())]
+        self.assertEqual(rows, [
+            (self.contracts[0].pk, datetime.time(8), datetime.time(12), '0'),
+            (self.contracts[0].pk, datetime.time(13), datetime.time(13), '0'),
+            (self.contracts[1].pk, datetime.time(9), datetime.time(10), '1')])
+
+    def test_refresh_error_after_insert(self):
+        # The derived table errors don't change the inserted object status
+        with mock.patch.object(TimestampDay.objects, 'refresh',
+                               side_effect=IntegrityError):
+            with self.assertLogs('utility.misc.on_commit_keys', 'ERROR'):
+                timestamp, created = insert_or_get(
+                    model=Timestamp,
+                    contract=self.contracts[0],
+                    structure=self.structure,
+                    direction=self.enter,
+                    date=datetime.date(2020, 3, 2),
+                    time=datetime.time(8))
+        self.assertTrue(created)
+        self.assertTrue(Timestamp.objects.filter(pk=timestamp.pk).exists())
+
+
+class ActivityStatTest(WorkTestData, TransactionTestCase):
+    def setUp(self):
+        self.create_data()
+        self.other_structure = Structure.objects.create(
+            name='Other structure',
+            company=self.company,
+            brand=self.structure.brand,
+            location=self.location)
+        self.other_building = Building.objects.create(
+            name='Other building',
+            structure=self.other_structure,
+            location=self.location)
+        self.month = datetime.date(2020, 3, 1)
+
+    def get_stats(self):
+        """Return the saved statistics values"""
+        return list(ActivityStat.objects.order_by(
+            'contract_id', 'structure_id', 'service_type_id',
+            'month').values_list(
+            'contract', 'structure', 'service_type', 'month', 'rooms'))
+
+    def assertRebuilt(self):
+        """Check the saved statistics are the same of a full rebuild"""
+        stats = self.get_stats()
+        ActivityStat.objects.rebuild()
+        self.assertEqual(stats, self.get_stats())
+
+    def test_refresh(self):
+        activity = self.create_activity(self.contracts[0],
+                                        datetime.date(2020, 3, 2),
+                                        self.rooms)
+        self.assertEqual(self.get_stats(), [
+            (self.contracts[0].pk, self.structure.pk, self.service_type.pk,
+             self.month, 3)])
+        self.assertRebuilt()
+        ActivityRoom.objects.filter(room=self.rooms[0]).delete()
+        activity.date = datetime.date(2020, 4, 1)
+        activity.save()
+        self.assertEqual(self.get_stats(), [
+            (self.contracts[0].pk, self.structure.pk, self.service_type.pk,
+             datetime.date(2020, 4, 1), 2)])
+        self.assertRebuilt()
+
+    def test_refresh_once_per_transaction(self):
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                for day in range(1, 4):
+                    self.create_activity(self.contracts[0],
+                                         datetime.date(2020, 3, day),
+                                         self.rooms)
+        self.assertEqual(self.get_stats(), [
+            (self.contracts[0].pk, self.structure.pk, self.service_type.pk,
+             self.month, 9)])
+        self.assertEqual(len([query for query in queries.captured_queries
+                              if query['sql'].startswith(
+                                  'INSERT INTO "work_activity_stats"')]), 1)
+
+    def test_change_service_type(self):
+        self.create_activity(self.contracts[0],
+                             datetime.date(2020, 3, 2),
+                             self.rooms)
+        service_type = ServiceType.objects.create(name='Linen', order=2)
+        self.service.service_type = service_type
+        self.service.save()
+        self.assertEqual(self.get_stats(), [
+            (self.contracts[0].pk, self.structure.pk, service_type.pk,
+             self.month, 3)])
+        self.assertRebuilt()
+
+    def test_change_building_structure(self):
+        self.create_activity(self.contracts[0],
+                             datetime.date(2020, 3, 2),
+                             self.rooms)
+        self.building.structure = self.other_structure
+        self.building.save()
+        self.assertEqual(self.get_stats(), [
+            (self.contracts[0].pk, self.other_structure.pk,
+             self.service_type.pk, self.month, 3)])
+        self.assertRebuilt()
+
+    def test_change_room_building(self):
+        self.create_activity(self.contracts[0],
+                             datetime.date(2020, 3, 2),
+                             self.rooms)
+        self.rooms[0].building = self.other_building
+        self.rooms[0].save()
+        self.assertEqual(self.get_stats(), [
+            (self.contracts[0].pk, self.structure.pk, self.service_type.pk,
+             self.month, 2),
+            (self.contracts[0].pk, self.other_structure.pk,
+             self.service_type.pk, self.month, 1)])
+        self.assertRebuilt()
+
+    def test_action_change_building(self):
+        self.create_activity(self.contracts[0],
+                             datetime.date(2020, 3, 2),
+                             self.rooms)
+        self.client.force_login(User.objects.create_superuser(
+            username='admin', email='admin@localhost', password='admin'))
+        response = self.client.post(
+            reverse('admin:hotels_room_changelist'),
+            {'action': 'action_change_building',
+             'action_change_building': 'apply',
+             '_selected_action': [room.pk for room in self.rooms[:2]],
+             'building': self.other_building.pk})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.get_stats(), [
+            (self.contracts[0].pk, self.structure.pk, self.service_type.pk,
+             self.month, 1),
+            (self.contracts[0].pk, self.other_structure.pk,
+             self.service_type.pk, self.month, 2)])
+        self.assertRebuilt()
+
+
+class ActiveContractTest(WorkTestData, TestCase):
+    def setUp(self):
+        self.create_data()
+
+    def get_active_contracts(self):
+        """Return the saved active contract of each employee"""
+        return [employee.get_active_contract()
+                for employee in Employee.objects.order_by('pk')]
+
+    def test_contract_changes(self):
+        self.assertEqual(self.get_active_contracts(), self.contracts)
+        self.contracts[0].end_date = datetime.date(2020, 2, 1)
+        self.contracts[0].save()
+        self.assertEqual(self.get_active_contracts(),
+                         [None, self.contracts[1]])
+        # Both the previous and the new employee are updated
+        self.contracts[1].employee = self.contracts[0].employee
+        self.contracts[1].save()
+        self.assertEqual(self.get_active_contracts(),
+                         [self.contracts[1], None])
+        self.contracts[1].delete()
+        self.assertEqual(self.get_active_contracts(), [None, None])
+
+    def test_refresh_command(self):
+        self.create_contract(2, start_date=datetime.date.today() +
+                             datetime.timedelta(days=1))
+        Employee.objects.update(current_contract=None)
+        stdout = io.StringIO()
+        call_command('active_contracts_refresh', stdout=stdout)
+        self.assertEqual(stdout.getvalue().strip(), 'Refreshed 3 employees')
+        # The contracts not yet started are not active
+        self.assertEqual(self.get_active_contracts(),
+                         [*self.contracts, None])
+
+
+class ExportCSVTest(WorkTestData, TestCase):
+    def setUp(self):
+        self.create_data()
+
+    def test_export_csv(self):
+        model_admin = admin.site._registry[Contract]
+        fields_map = collections.OrderedDict((
+            ('ID', 'id'),
+            ('EMPLOYEE', 'employee.last_name'),
+            ('COMPANY', 'company.name')))
+        with mock.patch.object(model_admin, 'export_csv_fields_map',
+                               fields_map):
+            response = model_admin.action_export_csv(
+                request=None,
+                queryset=Contract.objects.order_by('pk'))
+            # The related objects are loaded in the same query
+            with self.assertNumQueries(1):
+                content = b''.join(response.streaming_content)
+        self.assertEqual(content.decode('utf-8-sig').splitlines(), [
+            'ID;EMPLOYEE;COMPANY',
+            '{ID};0;Company'.format(ID=self.contracts[0].pk),
+            '{ID};1;Company'.format(ID=self.contracts[1].pk)])